@@ -17,5 +17,77 @@ COLORS = {
 }
 
 REFRESH_INTERVAL = 5000 # 5 seconds
+# Adaptive polling: fast right after a switch or while link health is changing,
+# slower once nothing has changed for a while or the window is in the tray
+REFRESH_INTERVAL_FAST = 1000 # ms
+REFRESH_INTERVAL_STABLE = 15000 # ms
+REFRESH_INTERVAL_HIDDEN = 30000 # ms
+REFRESH_FAST_CYCLES = 5 # fast polls after a switch or a health change
+REFRESH_STABLE_CYCLES = 3 # unchanged polls before backing off to the stable interval
 SWITCH_WAIT_TIME = 1500  # 1.5 seconds
 LINK_VERIFICATION_TIMEOUT = 10 # seconds
+SWITCH_CONFIRM_TIMEOUT = 3 # seconds for the router to show the target route active and pinging
+SWITCH_CONFIRM_POLL = 100 # ms between route checks while waiting for the target to become active
+
+# Public IP lookup: providers are queried concurrently, first valid answer wins
+PUBLIC_IP_PROVIDERS = (
+    "https://api.ipify.org",
+    "https://icanhazip.com",
+    "https://ifconfig.me/ip",
+)
+PUBLIC_IP_TIMEOUT = 1 # seconds
+PUBLIC_IP_TTL = 60 # seconds; also dropped whenever the active link changes
+
+# Router API connection pool
+POOL_MAX_SIZE = 3 # concurrent API sessions per router
+POOL_ACQUIRE_TIMEOUT = 10 # seconds waiting for a free session
+POOL_KEEPALIVE_INTERVAL = 30 # seconds between keepalives on an idle session
+POOL_IDLE_TIMEOUT = 300 # seconds before an unused session is closed
+
+# Status cycle
+STATUS_CYCLE_DEADLINE = 3 # seconds; pings still pending after this are reported as timeout
+PROBE_CACHE_TTL = 300 # seconds a link's resolved ping source is trusted without a change event
+# Tiered probing: route flags and DHCP leases are read every cycle, but a link is
+# only pinged again after its interval or when those change. The refresh timer never
+# waits past a due ping, so PING_INTERVAL bounds how late a ping-only outage shows.
+PING_INTERVAL = 5 # seconds
+PING_INTERVAL_BY_LINK = {} # comment -> seconds, e.g. {"Link3_LTE": 300} for a metered backup
+
+# Ping targets: the first one is used for single pings, streams probe all of them
+PING_TARGETS = ("8.8.8.8",) # e.g. ("8.8.8.8", "1.1.1.1")
+# "single": one count=1 ping per link when due; "stream": a long-running ping per
+# link and target, giving loss %, min/avg/max and jitter over PROBE_WINDOW samples.
+# Links listed in PING_INTERVAL_BY_LINK stay on paced single pings in both modes.
+PING_MODE = "single"
+PROBE_STREAM_INTERVAL = 1 # seconds between echo requests of a stream
+PROBE_WINDOW = 30 # samples per link used for the stream statistics
+
+# Router change subscription (/listen)
+WATCH_RECONNECT_DELAY = 5 # seconds before re-subscribing after the session drops
+WATCH_DEBOUNCE = 200 # ms to coalesce a burst of route changes into one UI update
+
+# Router operation deadlines: when one runs out the socket is torn down, so a
+# router that stops answering mid-command can't hold a refresh cycle
+API_CONNECT_TIMEOUT = 3 # seconds for the TCP/TLS handshake
+API_LOGIN_TIMEOUT = 3 # seconds for the login exchange
+API_QUERY_TIMEOUT = 5 # seconds for each print/set command
+PING_DEADLINE_SLACK = 1 # seconds past STATUS_CYCLE_DEADLINE before the ping session is cut
+
+# Circuit breaker for an unreachable router: after this many consecutive failures
+# calls fail fast, retrying once per backoff window (doubles up to the maximum)
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_BASE_DELAY = 2 # seconds
+BREAKER_MAX_DELAY = 60 # seconds
+
+# Warm start: last discovery, ping resolution and status per host, shown right
+# after login as "stale" while the router is asked again
+WARM_CACHE_FILE = "warm_cache.json" # next to config.json
+WARM_CACHE_SAVE_INTERVAL = 60 # seconds between saves while running (plus one on exit)
+
+# Fleet mode (python -m app.fleet): many routers polled from one asyncio loop
+FLEET_FILE = "fleet.json" # router profiles, next to config.json
+FLEET_POLL_INTERVAL = 10 # seconds between the start of two fleet cycles
+FLEET_MAX_CONCURRENCY = 32 # routers polled at the same time
+FLEET_ROUTER_TIMEOUT = 10 # seconds for one router's connect + discovery + status
+FLEET_BACKOFF_BASE = 20 # seconds a failed router is skipped (doubles per failure)
+FLEET_BACKOFF_MAX = 300 # seconds
@@ -0,0 +1,209 @@
+"""Monitor sem interface gráfica: `python -m app.daemon`.
+
+Roda descoberta, status e pings só com o MikrotikService (sem Tk, bandeja
+ou PIL) e escreve uma linha JSON por ciclo na saída padrão e, com
+`--listen`, para quem se conectar na porta TCP local. O log vai para stderr
+e para o arquivo de sempre.
+
+Credenciais: MIKROTIK_HOST, MIKROTIK_USER, MIKROTIK_PASSWORD e MIKROTIK_SSL
+no ambiente (ou --host/--user/--ssl); o que faltar vem do config.json e do
+keyring, como no login da interface.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from app.config import settings
+from app.models.status import StatusSnapshot
+from app.services.logger_service import logger, setup_logger
+from app.services.mikrotik_service import MikrotikService
+from app.services.refresh_policy import RefreshPolicy
+
+
+class LineBroadcaster:
+    """Servidor TCP local que repassa cada linha de status a todos os clientes conectados."""
+
+    def __init__(self, host, port):
+        self._server = socket.create_server((host, port))
+        self._clients = []
+        self._lock = threading.Lock()
+        threading.Thread(target=self._accept, name='daemon-listen', daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            # A client that stops reading is dropped instead of blocking the loop
+            conn.settimeout(settings.API_QUERY_TIMEOUT)
+            with self._lock:
+                self._clients.append(conn)
+
+    def send(self, line):
+        data = (line + '\n').encode()
+        with self._lock:
+            for conn in list(self._clients):
+                try:
+                    conn.sendall(data)
+                except OSError:
+                    conn.close()
+                    self._clients.remove(conn)
+
+    def close(self):
+        self._server.close()
+        with self._lock:
+            for conn in self._clients:
+                conn.close()
+            self._clients.clear()
+
+
+def resolve_credentials(args):
+    """(host, user, password, use_ssl) dos argumentos, do ambiente ou do config.json + keyring."""
+    host = args.host or os.environ.get('MIKROTIK_HOST')
+    user = args.user or os.environ.get('MIKROTIK_USER')
+    password = os.environ.get('MIKROTIK_PASSWORD')
+    use_ssl = args.ssl or os.environ.get('MIKROTIK_SSL', '').lower() in ('1', 'true', 'yes')
+    if not (host and user and password is not None):
+        # keyring is only needed when the environment doesn't have everything
+        from app.utils.config_manager import ConfigManager
+        config = ConfigManager()
+        host = host or config.get_last_host()
+        user = user or config.get_last_user()
+        use_ssl = use_ssl or config.get_use_ssl()
+        if password is None and host and user:
+            password = config.get_password(host, user)
+    return host, user, password, use_ssl
+
+
+def status_line(host, status, error=None, public_ip=None):
+    """Linha JSON de um ciclo."""
+    record = {'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'host': host, **status.as_dict()}
+    if public_ip is not None:
+        record['public_ip'] = public_ip
+    if error is not None:
+        record['error'] = error
+    return json.dumps(record, ensure_ascii=False)
+
+
+def run(service, emit, once=False, network=None):
+    """Laço de monitoramento; retorna o código de saída."""
+    policy = RefreshPolicy()
+    wake = threading.Event()
+    links = None
+
+    def on_change(table, row):
+        # Route changes pushed by `listen` start a cycle right away
+        if table in (None, 'routes'):
+            wake.set()
+
+    while True:
+        if links is None:
+            try:
+                links = service.discover_links()
+                service.start_watching(on_change)
+            except Exception as e:
+                emit(json.dumps({'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'), 'host': service.host,
+                                 'error': f"discovery failed: {e}"}, ensure_ascii=False))
+                if once:
+                    return 1
+                time.sleep(settings.WATCH_RECONNECT_DELAY)
+                continue
+
+        error = None
+        try:
+            status = service.get_status(links)
+            # The mirror may have moved on while the pings were running
+            status = service.get_route_state(links, status) or status
+        except Exception as e:
+            status = StatusSnapshot.failed(links)
+            error = str(e)
+        policy.route_push = service.is_watching()
+        due = service.next_ping_in()
+        policy.ping_due_in = math.ceil(due * 1000) if due is not None else None
+        policy.observe(status)
+        emit(status_line(service.host, status, error, network.get_public_ip() if network else None))
+        if once:
+            return 0 if error is None else 1
+        if not links:
+            # Nothing was found; look again next cycle
+            links = None
+
+        wake.clear()
+        if wake.wait(policy.next_interval() / 1000):
+            # Let a burst of route changes settle, then sample fast for a while
+            time.sleep(settings.WATCH_DEBOUNCE / 1000)
+            policy.boost()
+
+
+def _terminate(signum, frame):
+    # systemd/docker stop: same clean shutdown as Ctrl+C
+    raise KeyboardInterrupt
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m app.daemon',
+                                     description="Monitor headless dos links do MikroTik (linhas JSON).")
+    parser.add_argument('--host', help="roteador (padrão: MIKROTIK_HOST ou o último usado)")
+    parser.add_argument('--user', help="usuário (padrão: MIKROTIK_USER ou o último usado)")
+    parser.add_argument('--ssl', action='store_true', help="usa api-ssl")
+    parser.add_argument('--port', type=int, help="porta da API, se não for a padrão")
+    parser.add_argument('--listen', metavar='[HOST:]PORT',
+                        help="também publica as linhas em uma porta TCP (padrão 127.0.0.1)")
+    parser.add_argument('--public-ip', action='store_true', help="inclui o IP público em cada linha")
+    parser.add_argument('--once', action='store_true', help="um ciclo só; código de saída 1 se falhar")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log INFO também no stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # The per-ping INFO lines still go to the log file; the console only gets problems
+    setup_logger(console_level=logging.INFO if args.verbose else logging.WARNING)
+
+    host, user, password, use_ssl = resolve_credentials(args)
+    if not (host and user and password is not None):
+        logger.error("No router credentials: set MIKROTIK_HOST/MIKROTIK_USER/MIKROTIK_PASSWORD "
+                     "or log in once through the GUI with 'Lembrar Senha'")
+        return 2
+
+    service = MikrotikService(host, user, password, use_ssl, port=args.port)
+    network = None
+    if args.public_ip:
+        from app.services.network_service import NetworkService
+        network = NetworkService(router_source=service.get_cloud_address)
+
+    broadcaster = None
+    if args.listen:
+        listen_host, _, listen_port = args.listen.rpartition(':')
+        broadcaster = LineBroadcaster(listen_host or '127.0.0.1', int(listen_port))
+
+    def emit(line):
+        print(line, flush=True)
+        if broadcaster is not None:
+            broadcaster.send(line)
+
+    signal.signal(signal.SIGTERM, _terminate)
+    logger.info(f"Headless monitor started for {host}")
+    try:
+        return run(service, emit, once=args.once, network=network)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        service.close()
+        if network is not None:
+            network.close()
+        if broadcaster is not None:
+            broadcaster.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
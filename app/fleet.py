@@ -0,0 +1,79 @@
+"""Modo frota: vários roteadores em uma janela só, `python -m app.fleet`.
+
+Os perfis vêm do fleet.json (FLEET_FILE, ou --profiles):
+
+    {"routers": [{"name": "Filial 01", "host": "10.1.0.1", "user": "monitor"}, ...]}
+
+Perfis sem "password" usam a senha salva no keyring para aquele usuário e
+host. Todos os roteadores são consultados de um único event loop, no
+máximo FLEET_MAX_CONCURRENCY por vez. Com `--headless` não abre janela e
+escreve uma linha JSON por roteador a cada ciclo, como o `app.daemon`.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+
+from app.config import settings
+from app.services.fleet_service import FleetMonitor, load_profiles
+from app.services.logger_service import logger, setup_logger
+
+
+def fleet_lines(snapshot):
+    """Uma linha JSON por roteador do ciclo."""
+    stamp = time.strftime('%Y-%m-%dT%H:%M:%S%z', time.localtime(snapshot.taken_at))
+    for router in snapshot.routers:
+        yield json.dumps({'time': stamp, **router.as_dict()}, ensure_ascii=False)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m app.fleet',
+                                     description="Monitor de vários roteadores MikroTik.")
+    parser.add_argument('--profiles', default=settings.FLEET_FILE,
+                        help=f"arquivo com os roteadores (padrão: {settings.FLEET_FILE})")
+    parser.add_argument('--concurrency', type=int,
+                        help=f"roteadores consultados ao mesmo tempo (padrão: {settings.FLEET_MAX_CONCURRENCY})")
+    parser.add_argument('--headless', action='store_true', help="sem janela; linhas JSON na saída padrão")
+    parser.add_argument('--once', action='store_true', help="com --headless, um ciclo só")
+    parser.add_argument('-v', '--verbose', action='store_true', help="log INFO também no stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logger(console_level=logging.INFO if args.verbose else logging.WARNING)
+
+    try:
+        profiles = load_profiles(args.profiles)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Could not read fleet profiles from {args.profiles}: {e}")
+        return 2
+    if not profiles:
+        logger.error(f"No routers in {args.profiles}")
+        return 2
+
+    monitor = FleetMonitor(profiles, concurrency=args.concurrency)
+    logger.info(f"Fleet monitor started for {len(profiles)} routers")
+
+    if not args.headless:
+        from app.ui.fleet_window import FleetWindow
+        FleetWindow(monitor).mainloop()
+        return 0
+
+    def emit(snapshot):
+        for line in fleet_lines(snapshot):
+            print(line, flush=True)
+
+    try:
+        asyncio.run(monitor.run(emit, once=args.once))
+    except KeyboardInterrupt:
+        return 0
+    if args.once:
+        return 0 if all(router.error is None for router in monitor.snapshot.routers) else 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
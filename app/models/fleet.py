@@ -0,0 +1,83 @@
+import time
+from dataclasses import dataclass
+from enum import Enum
+
+from app.models.status import StatusSnapshot
+
+
+class RouterHealth(Enum):
+    """Resumo de um roteador na visão da frota."""
+    OK = 'ok'
+    DEGRADED = 'degraded'    # answering, but some link is offline
+    DOWN = 'down'            # the last cycle failed
+    BACKOFF = 'backoff'      # failed recently; skipped until its backoff ends
+    PENDING = 'pending'      # not polled yet
+
+
+@dataclass(frozen=True, slots=True)
+class RouterProfile:
+    """Um roteador da frota. Sem `password`, a senha vem do keyring (como no login)."""
+    name: str
+    host: str
+    user: str
+    password: str | None = None
+    use_ssl: bool = False
+    port: int | None = None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('name') or data['host'], data['host'], data['user'], data.get('password'),
+                   data.get('use_ssl', False), data.get('port'))
+
+
+@dataclass(frozen=True, slots=True)
+class RouterStatus:
+    """Uma linha da frota: o último StatusSnapshot do roteador e como foi o último ciclo.
+
+    Depois de uma falha `status` continua sendo o último snapshot bom,
+    marcado como `stale`, para o detalhamento por link não sumir.
+    """
+    profile: RouterProfile
+    health: RouterHealth = RouterHealth.PENDING
+    status: StatusSnapshot | None = None
+    error: str | None = None
+    failures: int = 0              # consecutive failed cycles
+    cycle_ms: float | None = None  # duration of the last poll of this router
+    updated_at: float | None = None  # time.time() of the last successful poll
+
+    @property
+    def name(self):
+        return self.profile.name
+
+    def as_dict(self):
+        """Versão serializável em JSON."""
+        record = {'name': self.profile.name, 'host': self.profile.host, 'health': self.health.value,
+                  'failures': self.failures, 'cycle_ms': self.cycle_ms}
+        if self.status is not None:
+            record.update(self.status.as_dict())
+            record['stale'] = self.status.stale
+        if self.error is not None:
+            record['error'] = self.error
+        return record
+
+
+@dataclass(frozen=True, slots=True)
+class FleetSnapshot:
+    """Foto da frota ao fim de um ciclo, na ordem dos perfis."""
+    routers: tuple
+    cycle_ms: float = 0.0
+    taken_at: float = 0.0
+
+    @classmethod
+    def pending(cls, profiles):
+        return cls(tuple(RouterStatus(profile) for profile in profiles), taken_at=time.time())
+
+    def counts(self):
+        """Quantos roteadores em cada RouterHealth."""
+        counts = {health: 0 for health in RouterHealth}
+        for router in self.routers:
+            counts[router.health] += 1
+        return counts
+
+    def router(self, name):
+        return next((router for router in self.routers if router.name == name), None)
@@ -0,0 +1,117 @@
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+
+
+class LinkState(Enum):
+    """Resultado do último ping de um link."""
+    UP = 'up'
+    TIMEOUT = 'timeout'
+    ERROR = 'err'            # no path to force the ping through, or the router refused it
+    CHECKING = 'checking'    # not measured yet
+    UNKNOWN = 'unknown'      # the router could not be read
+
+
+class Mode(Enum):
+    AUTO = "Failover Automático"
+    MANUAL = "Manual"
+    ERROR = "Erro"
+
+
+def ping_state(value):
+    """Converte o valor de ping do serviço (ms ou "timeout"/"err"/"checking") em (LinkState, rtt_ms)."""
+    if isinstance(value, (int, float)):
+        return LinkState.UP, float(value)
+    if value == "timeout":
+        return LinkState.TIMEOUT, None
+    if value == "err":
+        return LinkState.ERROR, None
+    return LinkState.CHECKING, None
+
+
+@dataclass(frozen=True, slots=True)
+class LinkStatus:
+    """Estado de um link em um ciclo: rota (ativa, alcançável, ids) e ping (estado, RTT, perda, jitter)."""
+    comment: str
+    label: str
+    state: LinkState = LinkState.CHECKING
+    rtt_ms: float | None = None
+    loss: float | None = None      # %, only in "stream" ping mode
+    jitter: float | None = None    # ms, only in "stream" ping mode
+    active: bool = False
+    reachable: bool = True         # gateway not flagged unreachable by the route
+    route_ids: tuple = ()
+
+    @property
+    def offline(self):
+        return not self.reachable or self.state in (LinkState.TIMEOUT, LinkState.ERROR)
+
+    def as_dict(self):
+        """Versão serializável em JSON."""
+        return {
+            'comment': self.comment, 'label': self.label, 'state': self.state.value,
+            'rtt_ms': self.rtt_ms, 'loss': self.loss, 'jitter': self.jitter,
+            'active': self.active, 'reachable': self.reachable, 'offline': self.offline,
+            'route_ids': list(self.route_ids),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['comment'], data['label'], LinkState(data['state']), data.get('rtt_ms'),
+                   data.get('loss'), data.get('jitter'), data.get('active', False),
+                   data.get('reachable', True), tuple(data.get('route_ids', ())))
+
+
+@dataclass(frozen=True, slots=True)
+class StatusSnapshot:
+    """Foto imutável do status do roteador, trocada inteira a cada ciclo.
+
+    Os links ficam na ordem da descoberta; as consultas por comentário, o
+    link ativo e os inalcançáveis são calculados uma vez na criação.
+    `stale` marca um snapshot lido do cache de uma execução anterior.
+    """
+    links: tuple
+    active_label: str
+    mode: Mode
+    stale: bool = False
+    taken_at: float = field(default_factory=time.monotonic)
+    by_comment: dict = field(init=False, repr=False, compare=False)
+    active: LinkStatus | None = field(init=False, repr=False, compare=False)
+    unreachable: frozenset = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Frozen: the derived lookups are set once, here
+        object.__setattr__(self, 'by_comment', {link.comment: link for link in self.links})
+        object.__setattr__(self, 'active', next((link for link in self.links if link.active), None))
+        object.__setattr__(self, 'unreachable',
+                           frozenset(link.comment for link in self.links if not link.reachable))
+
+    @classmethod
+    def failed(cls, discovered_links):
+        """Snapshot de um ciclo em que o roteador não respondeu."""
+        links = tuple(LinkStatus(link['comment'], link['label'], LinkState.UNKNOWN)
+                      for link in discovered_links)
+        return cls(links, "Erro de Conexão", Mode.ERROR)
+
+    def link(self, comment):
+        return self.by_comment.get(comment)
+
+    @property
+    def active_down(self):
+        """O link ativo está com o gateway inalcançável."""
+        return self.active is not None and not self.active.reachable
+
+    def as_dict(self):
+        """Versão serializável em JSON."""
+        return {
+            'active': self.active_label,
+            'mode': self.mode.value,
+            'active_down': self.active_down,
+            'links': [link.as_dict() for link in self.links],
+        }
+
+    @classmethod
+    def from_dict(cls, data, stale=True):
+        """Inverso de as_dict; por padrão o resultado é marcado como `stale`."""
+        return cls(tuple(LinkStatus.from_dict(link) for link in data['links']),
+                   data['active'], Mode(data['mode']), stale=stale)
@@ -0,0 +1,235 @@
+import asyncio
+import time
+
+from app.config import settings
+from app.services.logger_service import logger
+from app.services.probe_cache import ProbeConfigCache
+from app.services.mikrotik_service import (
+    ADDRESS_PROPERTIES, DEFAULT_ROUTE_QUERY, DHCP_CLIENT_PROPERTIES, ROUTE_PROPERTIES,
+    build_ping_configs, build_snapshot, links_from_routes, parse_ping_reply, route_writes
+)
+from app.services.route_index import SnapshotIndex
+from app.services.routeros_async import AsyncRouterOsClient, RouterOsConnectionLost, RouterOsTrapError
+
+# Same server-side filter as MikrotikService._default_routes: commented default routes only
+LINK_ROUTE_QUERY = {**DEFAULT_ROUTE_QUERY, 'comment': None}
+
+
+class AsyncMikrotikService:
+    """Versão asyncio do MikrotikService, com os mesmos métodos.
+
+    Cada roteador usa uma única conexão multiplexada: consultas e pings de um
+    ciclo saem todos de uma vez (tags diferentes) e vários roteadores podem ser
+    atendidos pelo mesmo event loop, sem uma thread por requisição.
+    """
+
+    def __init__(self, host, user, password, use_ssl=False, port=None, ssl_context=None):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.port = port
+        self.ssl_context = ssl_context
+        self._client = None
+        self._connect_lock = None
+        self._stats = {'connects': 0, 'reconnects': 0}
+        self._probes = ProbeConfigCache()
+
+    def connection_stats(self):
+        """Contadores de conexão (handshakes e reconexões)."""
+        return dict(self._stats)
+
+    async def _get_client(self):
+        # The lock must be created inside the running loop
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._client is None or not self._client.connected:
+                client = AsyncRouterOsClient(self.host, self.user, self.password, self.use_ssl,
+                                             port=self.port, ssl_context=self.ssl_context)
+                await client.connect()
+                self._client = client
+                self._stats['connects'] += 1
+            return self._client
+
+    async def _run(self, operation):
+        """Executa `operation(client)`; se a conexão tiver caído, reconecta e tenta de novo uma vez."""
+        try:
+            return await operation(await self._get_client())
+        except RouterOsConnectionLost as e:
+            logger.warning(f"API connection to {self.host} failed ({e}), reconnecting")
+            self._stats['reconnects'] += 1
+            return await operation(await self._get_client())
+
+    async def close(self):
+        """Encerra a conexão com o roteador."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def probe_configs(self):
+        """Como cada link está sendo pingado (src-address/interface), como resolvido em cache."""
+        return self._probes.snapshot()
+
+    async def discover_links(self):
+        """Busca os links disponíveis no MikroTik."""
+        try:
+            return await self._run(self._discover_links)
+        except Exception as e:
+            logger.error(f"Error discovering links on {self.host}: {e}")
+            raise
+
+    async def _discover_links(self, client):
+        routes, (dhcp_clients, ip_addresses) = await asyncio.gather(
+            client.talk('/ip/route/print', queries=LINK_ROUTE_QUERY, proplist=ROUTE_PROPERTIES),
+            self._fetch_probe_sources(client),
+        )
+        discovered = links_from_routes(routes)
+        logger.info(f"Discovered {len(discovered)} links: {[d['label'] for d in discovered]}")
+        index = SnapshotIndex(discovered, dhcp_clients, ip_addresses)
+        self._probes.store(routes, index, build_ping_configs(routes, index))
+        return discovered
+
+    async def _fetch_probe_sources(self, client):
+        """Clientes DHCP e endereços IP usados para achar o IP de origem dos pings."""
+        dhcp_clients, ip_addresses = await asyncio.gather(
+            client.talk('/ip/dhcp-client/print', queries={'status': 'bound'},
+                        proplist=DHCP_CLIENT_PROPERTIES),
+            client.talk('/ip/address/print', proplist=ADDRESS_PROPERTIES),
+            return_exceptions=True,
+        )
+        for res in (dhcp_clients, ip_addresses):
+            if isinstance(res, RouterOsConnectionLost):
+                raise res
+        if isinstance(dhcp_clients, BaseException) or isinstance(ip_addresses, BaseException):
+            logger.warning(f"Could not fetch DHCP/IP info for better pinging on {self.host}")
+            dhcp_clients = [] if isinstance(dhcp_clients, BaseException) else dhcp_clients
+            ip_addresses = [] if isinstance(ip_addresses, BaseException) else ip_addresses
+        return dhcp_clients, ip_addresses
+
+    async def get_status(self, discovered_links):
+        """Busca Link Ativo, Modo e Pings no MikroTik (StatusSnapshot)."""
+        try:
+            return await self._run(lambda c: self._get_status(c, discovered_links))
+        except Exception as e:
+            logger.error(f"Error getting status from {self.host}: {e}")
+            raise
+
+    async def _get_status(self, client, discovered_links):
+        pings = {link['comment']: "checking" for link in discovered_links}
+
+        routes = await client.talk('/ip/route/print', queries=LINK_ROUTE_QUERY, proplist=ROUTE_PROPERTIES)
+        index = SnapshotIndex(discovered_links)
+
+        # Ping sources are only re-resolved when a gateway, lease or address changed
+        ping_configs = self._probes.lookup(routes, index)
+        if ping_configs is None:
+            index = SnapshotIndex(discovered_links, *await self._fetch_probe_sources(client))
+            ping_configs = build_ping_configs(routes, index)
+            self._probes.store(routes, index, ping_configs)
+
+        probes = {}
+        for comment, params in ping_configs.items():
+            if params is None:
+                pings[comment] = "err"
+            else:
+                probes[comment] = params
+
+        # Pings still running at the deadline are cancelled on the router (/cancel),
+        # so the connection stays usable for the next cycle.
+        results = await asyncio.gather(
+            *(client.talk('/tool/ping', params, timeout=settings.STATUS_CYCLE_DEADLINE)
+              for params in probes.values()),
+            return_exceptions=True,
+        )
+        for (comment, params), res in zip(probes.items(), results):
+            if isinstance(res, asyncio.TimeoutError):
+                pings[comment] = "timeout"
+            elif isinstance(res, BaseException):
+                if isinstance(res, RouterOsConnectionLost):
+                    raise res
+                pings[comment] = "err"
+                self._probes.invalidate(comment)
+            else:
+                pings[comment] = parse_ping_reply(comment, params, res)
+
+        return build_snapshot(routes, index, pings)
+
+    async def switch_link(self, target_comment, discovered_links):
+        """Ativa um link específico e desabilita os outros."""
+        try:
+            await self._run(lambda c: self._write_routes(c, discovered_links, target_comment))
+            logger.info(f"Switched link to {target_comment}")
+        except Exception as e:
+            logger.error(f"Error switching link to {target_comment} on {self.host}: {e}")
+            raise
+
+    async def enable_all_links(self, discovered_links):
+        """Habilita todos os links para failover automático."""
+        await self._run(lambda c: self._write_routes(c, discovered_links))
+
+    async def confirm_switch(self, target_comment, discovered_links, timeout=None):
+        """Confirma pelo roteador que o link alvo assumiu (mesmo retorno do MikrotikService)."""
+        start = time.monotonic()
+        deadline = start + (timeout or settings.SWITCH_CONFIRM_TIMEOUT)
+        try:
+            confirmed, stage = await self._run(
+                lambda c: self._confirm_switch(c, target_comment, discovered_links, deadline))
+        except Exception as e:
+            logger.warning(f"Could not confirm switch to {target_comment} on {self.host}: {e}")
+            confirmed, stage = None, 'error'
+        return {'confirmed': confirmed, 'stage': stage,
+                'latency_ms': round((time.monotonic() - start) * 1000, 1)}
+
+    async def _confirm_switch(self, client, target_comment, discovered_links, deadline):
+        index = SnapshotIndex(discovered_links)
+        if target_comment not in index.links_by_comment:
+            return None, 'route'
+
+        while True:
+            rows = await client.talk('/ip/route/print', queries={**DEFAULT_ROUTE_QUERY, 'comment': target_comment},
+                                     proplist=ROUTE_PROPERTIES)
+            route = rows[0] if rows else None
+            if route is not None and route.get('active') == 'true':
+                break
+            if route is None or 'unreachable' in route.get('gateway-status', '').lower():
+                return False, 'route'
+            if time.monotonic() >= deadline:
+                return False, 'route'
+            await asyncio.sleep(settings.SWITCH_CONFIRM_POLL / 1000)
+
+        cached, params = self._probes.get(route, index)
+        if not cached:
+            index = SnapshotIndex(discovered_links, *await self._fetch_probe_sources(client))
+            params = build_ping_configs([route], index).get(target_comment)
+        if params is None:
+            return None, 'probe'
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False, 'probe'
+            try:
+                res = await client.talk('/tool/ping', params, timeout=remaining)
+            except asyncio.TimeoutError:
+                return False, 'probe'
+            except RouterOsTrapError as e:
+                logger.info(f"Switch probe through {target_comment} failed: {e}")
+                return None, 'probe'
+            if parse_ping_reply(target_comment, params, res) != "timeout":
+                return True, 'probe'
+
+    async def _write_routes(self, client, discovered_links, target_comment=None):
+        routes = await client.talk('/ip/route/print', queries=LINK_ROUTE_QUERY,
+                                   proplist=('.id', 'comment', 'disabled'))
+        writes = route_writes(routes, SnapshotIndex(discovered_links), target_comment)
+        # Enables complete before any disable is sent, so a default route always exists
+        for phase in ('no', 'yes'):
+            results = await asyncio.gather(
+                *(client.talk('/ip/route/set', {'.id': route_id, 'disabled': disabled})
+                  for route_id, disabled in writes if disabled == phase),
+                return_exceptions=True,
+            )
+            for res in results:
+                if isinstance(res, (RouterOsTrapError, RouterOsConnectionLost)):
+                    raise res
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from app.config import settings
+from app.services.logger_service import logger
+
+
+class CircuitOpenError(RuntimeError):
+    """O roteador falhou seguidamente; chamadas são recusadas até o fim do backoff."""
+
+
+class CircuitBreaker:
+    """Disjuntor por roteador, com backoff exponencial.
+
+    Depois de `threshold` falhas seguidas o circuito abre e `before_call`
+    passa a falhar na hora, sem tocar na rede. Terminado o backoff, uma
+    única tentativa é liberada: sucesso fecha o circuito, falha reabre com o
+    dobro do tempo (até `max_delay`).
+    """
+
+    def __init__(self, name, threshold=None, base_delay=None, max_delay=None):
+        self.name = name
+        self.threshold = threshold or settings.BREAKER_FAILURE_THRESHOLD
+        self.base_delay = base_delay or settings.BREAKER_BASE_DELAY
+        self.max_delay = max_delay or settings.BREAKER_MAX_DELAY
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False  # a half-open trial call is in flight
+        self.trips = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """Levanta CircuitOpenError se o circuito está aberto."""
+        with self._lock:
+            if self._failures < self.threshold:
+                return
+            remaining = self._open_until - time.monotonic()
+            if remaining > 0 or self._probing:
+                self.rejected += 1
+                raise CircuitOpenError(
+                    f"{self.name} unreachable; next attempt in {max(remaining, 0):.0f}s")
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            if self._failures >= self.threshold:
+                logger.info(f"Circuit for {self.name} closed again")
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._failures >= self.threshold:
+                delay = min(self.base_delay * 2 ** (self._failures - self.threshold), self.max_delay)
+                self._open_until = time.monotonic() + delay
+                self.trips += 1
+                logger.warning(f"Circuit for {self.name} open for {delay:.0f}s "
+                               f"after {self._failures} consecutive failures")
+
+    def state(self):
+        with self._lock:
+            if self._failures < self.threshold:
+                status = 'closed'
+            elif self._probing or time.monotonic() >= self._open_until:
+                status = 'half-open'
+            else:
+                status = 'open'
+            return {'state': status, 'failures': self._failures,
+                    'trips': self.trips, 'rejected': self.rejected}
@@ -0,0 +1,479 @@
+import heapq
+import itertools
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import routeros_api
+from routeros_api import exceptions as ros_exceptions
+from routeros_api.query import HasValueQuery
+
+from app.config import settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.logger_service import logger
+
+# Errors that mean the session itself is gone (as opposed to a !trap for a bad command)
+CONNECTION_ERRORS = (
+    ros_exceptions.RouterOsApiConnectionError,
+    ros_exceptions.RouterOsApiFatalCommunicationError,
+    ros_exceptions.FatalRouterOsApiError,
+    socket.error,
+)
+
+
+class OperationTimeout(TimeoutError):
+    """Uma operação com o roteador passou do prazo e a sessão foi derrubada."""
+
+
+class _Alarm:
+    __slots__ = ('when', 'expire', 'cancelled', 'fired')
+
+    def __init__(self, when, expire):
+        self.when = when
+        self.expire = expire
+        self.cancelled = False
+        self.fired = False
+
+
+class _Watchdog:
+    """Uma única thread que dispara os prazos vencidos de todas as sessões."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._thread = None
+
+    def arm(self, seconds, expire):
+        alarm = _Alarm(time.monotonic() + seconds, expire)
+        with self._cond:
+            heapq.heappush(self._heap, (alarm.when, next(self._seq), alarm))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='api-watchdog', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return alarm
+
+    def disarm(self, alarm):
+        """Cancela o alarme; retorna True se ele já tinha disparado."""
+        with self._cond:
+            alarm.cancelled = True
+            return alarm.fired
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    now = time.monotonic()
+                    if self._heap and self._heap[0][0] <= now:
+                        alarm = heapq.heappop(self._heap)[2]
+                        alarm.fired = True
+                        break
+                    self._cond.wait(self._heap[0][0] - now if self._heap else None)
+            try:
+                alarm.expire()
+            except Exception as e:
+                logger.error(f"Deadline handler failed: {e}")
+
+
+_watchdog = _Watchdog()
+
+
+def _timed_out(error):
+    """Leitura cortada pelo timeout do socket (o routeros_api embrulha em RouterOsApiConnectionError)."""
+    return isinstance(error, socket.timeout) or isinstance(error.__context__, socket.timeout)
+
+
+def _tear_down(raw):
+    """Derruba o socket de uma sessão, acordando quem estiver bloqueado lendo dele."""
+    try:
+        raw.socket.socket.shutdown(socket.SHUT_RDWR)
+    except (AttributeError, OSError):
+        pass
+
+
+def decode_row(attributes):
+    """Converte uma linha crua da API (bytes) em dict de str, com '.id' -> 'id'."""
+    row = {}
+    for key, value in attributes.items():
+        key = key.decode(errors='replace')
+        # Same key convention as routeros_api resources
+        if key.startswith('.'):
+            key = key[1:]
+        row[key] = value.decode(errors='replace')
+    return row
+
+
+class PooledSession:
+    """Sessão autenticada mantida pelo pool."""
+
+    __slots__ = ('raw', 'api', 'default_timeout', 'created_at', 'last_used', 'last_keepalive', 'uses')
+
+    def __init__(self, raw):
+        self.raw = raw
+        # socket_timeout bounds the TCP/TLS handshake; the watchdog covers the
+        # login exchange that follows, which may trickle in under a per-read timeout
+        raw.socket_timeout = settings.API_CONNECT_TIMEOUT
+        budget = settings.API_CONNECT_TIMEOUT + settings.API_LOGIN_TIMEOUT
+        alarm = _watchdog.arm(budget, lambda: _tear_down(raw))
+        try:
+            self.api = raw.get_api()
+        except Exception as e:
+            # A failed login leaves the socket open inside routeros_api
+            raw.disconnect()
+            if _watchdog.disarm(alarm) or _timed_out(e):
+                raise OperationTimeout(f"Connect/login to {raw.host} timed out") from e
+            raise
+        _watchdog.disarm(alarm)
+        raw.set_timeout(settings.API_QUERY_TIMEOUT)
+        self.default_timeout = settings.API_QUERY_TIMEOUT
+        # routeros_api writes every word with its own send(); without NODELAY
+        # Nagle + delayed ACK adds ~40ms to each command on the wire.
+        try:
+            raw.socket.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (AttributeError, OSError):
+            pass
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_keepalive = self.created_at
+        self.uses = 0
+
+    @property
+    def alive(self):
+        # routeros_api flips `connected` off when it sees a fatal/connection error
+        return self.raw.connected
+
+    @property
+    def wire(self):
+        """Camada de protocolo do routeros_api (envio/leitura de sentenças com tag).
+
+        São internos do routeros_api (`inner.inner`, `response_buffor`,
+        `receive_single_response`), usados pelo `stream_print`, pelo
+        RouterStateWatcher e pelos pings contínuos; a versão em que foram
+        conferidos está fixada no requirements.txt.
+        """
+        return self.api.communicator.exception_aware_communicator.inner.inner
+
+    def get_resource(self, path, structure=None):
+        return self.api.get_resource(path, structure)
+
+    @contextmanager
+    def deadline(self, seconds, what):
+        """Prazo total para o bloco.
+
+        Vencido o prazo, o socket é derrubado (quem estiver lendo acorda na
+        hora) e o erro que escapar do bloco vira OperationTimeout. A sessão
+        fica inutilizada e o pool a descarta.
+        """
+        self.set_timeout(seconds)
+        alarm = _watchdog.arm(seconds, lambda: _tear_down(self.raw))
+        try:
+            yield
+        except Exception as e:
+            if _watchdog.disarm(alarm) or _timed_out(e):
+                # A read cut halfway leaves the protocol out of sync either way
+                self.close()
+                raise OperationTimeout(f"{what} on {self.raw.host} exceeded {seconds:.1f}s") from e
+            raise
+        finally:
+            if _watchdog.disarm(alarm):
+                # The socket was shut down, even if the block got to finish
+                self.close()
+            elif self.alive:
+                self.reset_timeout()
+
+    def stream_print(self, path, proplist=None, queries=None, has=(), timeout=None):
+        """Executa `print` em `path` e entrega as linhas uma a uma, conforme chegam.
+
+        `proplist` limita as colunas devolvidas; `queries` (igualdade) e `has`
+        (propriedade presente) são filtros avaliados no próprio roteador.
+        O comando inteiro tem `timeout` segundos (padrão API_QUERY_TIMEOUT).
+        """
+        with self.deadline(timeout or settings.API_QUERY_TIMEOUT, f"print on {path}"):
+            yield from self._stream_print(path, proplist, queries, has)
+
+    def _stream_print(self, path, proplist, queries, has):
+        wire = self.wire
+        arguments = {b'.proplist': ','.join(proplist).encode()} if proplist else {}
+        queries = {key.encode(): value.encode() for key, value in (queries or {}).items()}
+        tag = wire.send(path.rstrip('/').encode() + b'/', b'print', arguments, queries,
+                        additional_queries=[HasValueQuery(key) for key in has])
+        # Rows are decoded straight off the socket instead of being buffered as typed dicts
+        del wire.response_buffor[tag]
+        error = None
+        try:
+            while True:
+                response = wire.receive_single_response()
+                sentence = response.response
+                if sentence.tag != tag:
+                    # Reply to another command in flight on this session
+                    response.save_to_buffor(wire.response_buffor)
+                elif sentence.type == b're':
+                    yield decode_row(sentence.attributes)
+                elif sentence.type == b'trap':
+                    error = sentence.attributes.get(b'message', b'')
+                elif sentence.type == b'done':
+                    break
+                elif sentence.type == b'fatal':
+                    raise ros_exceptions.RouterOsApiFatalCommunicationError(
+                        f"Fatal error executing print on {path}")
+        except CONNECTION_ERRORS:
+            # Same as routeros_api's own handler: the session is unusable now
+            self.raw.disconnect()
+            raise
+        if error is not None:
+            raise ros_exceptions.RouterOsApiCommunicationError(
+                f"Error \"{error.decode(errors='replace')}\" executing print on {path}", error)
+
+    def set_timeout(self, seconds):
+        """Limita quanto tempo a próxima leitura do socket pode bloquear (None = sem limite)."""
+        self.raw.set_timeout(None if seconds is None else max(seconds, 0.001))
+
+    def reset_timeout(self):
+        self.raw.set_timeout(self.default_timeout)
+
+    def close(self):
+        _tear_down(self.raw)
+        try:
+            self.raw.disconnect()
+        except Exception:
+            pass
+
+
+class RouterOsConnectionPool:
+    """Pool limitado de conexões persistentes com um roteador MikroTik.
+
+    Mantém as sessões já autenticadas entre os ciclos de atualização, envia
+    keepalive nas conexões ociosas, fecha as que ficam ociosas por muito tempo
+    e reconecta de forma transparente quando uma sessão cai.
+    """
+
+    def __init__(self, host, user, password, use_ssl=False, port=None,
+                 max_size=None, idle_timeout=None, keepalive_interval=None, ssl_context=None):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.port = port
+        self.ssl_context = ssl_context
+        self.max_size = max_size or settings.POOL_MAX_SIZE
+        self.idle_timeout = idle_timeout or settings.POOL_IDLE_TIMEOUT
+        self.keepalive_interval = keepalive_interval or settings.POOL_KEEPALIVE_INTERVAL
+        # Fails fast while the router is unreachable instead of paying every timeout again
+        self._breaker = CircuitBreaker(host)
+
+        self._idle = []  # LIFO: most recently used connection is reused first
+        self._open = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._maintenance = None
+        self._stop = threading.Event()
+
+        self._stats = {
+            'connects': 0,     # TCP/TLS handshake + login performed
+            'reuses': 0,       # acquisitions served by an already open session
+            'reconnects': 0,   # operations retried on a fresh session after a failure
+            'discarded': 0,    # sessions dropped because they broke
+            'reaped': 0,       # sessions closed for being idle too long
+            'keepalives': 0,   # keepalive commands sent on idle sessions
+            'timeouts': 0,     # operations (or logins) cut at their deadline
+        }
+
+    def _count(self, key, amount=1):
+        with self._cond:
+            self._stats[key] += amount
+
+    def _create(self):
+        raw = routeros_api.RouterOsApiPool(
+            self.host,
+            username=self.user,
+            password=self.password,
+            port=self.port,
+            plaintext_login=True,
+            use_ssl=self.use_ssl,
+            ssl_context=self.ssl_context
+        )
+        try:
+            conn = PooledSession(raw)
+        except Exception as e:
+            self._breaker.record_failure()
+            if isinstance(e, OperationTimeout):
+                self._count('timeouts')
+            raise
+        self._count('connects')
+        logger.info(f"Opened API session to {self.host} (total handshakes: {self._stats['connects']})")
+        return conn
+
+    def _acquire(self):
+        self._breaker.before_call()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"Connection pool for {self.host} is closed")
+            self._ensure_maintenance()
+
+            deadline = time.monotonic() + settings.POOL_ACQUIRE_TIMEOUT
+            while not self._idle and self._open >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No free API session to {self.host} (pool size {self.max_size})")
+                self._cond.wait(remaining)
+
+            if self._idle:
+                conn = self._idle.pop()
+                self._stats['reuses'] += 1
+                return conn
+
+            # Reserve the slot before connecting so concurrent callers respect max_size
+            self._open += 1
+
+        try:
+            return self._create()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, conn):
+        if conn.alive:
+            conn.reset_timeout()
+        conn.last_used = time.monotonic()
+        conn.uses += 1
+        with self._cond:
+            if not conn.alive:
+                self._stats['discarded'] += 1
+                self._drop_locked(conn)
+            elif self._closed:
+                self._drop_locked(conn)
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def _discard(self, conn):
+        with self._cond:
+            self._stats['discarded'] += 1
+            self._drop_locked(conn)
+            self._cond.notify()
+
+    def _drop_locked(self, conn):
+        self._open -= 1
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Empresta uma sessão autenticada do pool."""
+        conn = self._acquire()
+        try:
+            yield conn
+        except CONNECTION_ERRORS as e:
+            self._breaker.record_failure()
+            if isinstance(e, OperationTimeout):
+                self._count('timeouts')
+            self._discard(conn)
+            raise
+        except BaseException:
+            # A !trap still means the router answered
+            self._breaker.record_success()
+            self._release(conn)
+            raise
+        else:
+            self._breaker.record_success()
+            self._release(conn)
+
+    def run(self, operation):
+        """Executa `operation(session)` em uma sessão do pool.
+
+        Se a sessão reaproveitada estiver quebrada (roteador reiniciou, NAT
+        expirou, etc.), a operação é repetida uma vez em uma sessão nova.
+        Estouro de prazo não é repetido: o prazo já era o orçamento da operação.
+        """
+        try:
+            with self.connection() as session:
+                return operation(session)
+        except TimeoutError:
+            raise
+        except CONNECTION_ERRORS as e:
+            logger.warning(f"API session to {self.host} failed ({e}), reconnecting")
+            self._count('reconnects')
+            with self.connection() as session:
+                return operation(session)
+
+    def open_dedicated(self):
+        """Abre uma sessão fora do pool, para comandos de longa duração como `listen`.
+
+        Quem abre é responsável por fechar com `session.close()`.
+        """
+        self._breaker.before_call()
+        conn = self._create()
+        self._breaker.record_success()
+        return conn
+
+    def stats(self):
+        """Retorna os contadores de reaproveitamento de conexões."""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot['open'] = self._open
+            snapshot['idle'] = len(self._idle)
+        snapshot['breaker'] = self._breaker.state()
+        acquisitions = snapshot['connects'] + snapshot['reuses']
+        snapshot['reuse_ratio'] = round(snapshot['reuses'] / acquisitions, 3) if acquisitions else 0.0
+        return snapshot
+
+    def close(self):
+        """Fecha todas as sessões ociosas e impede novos empréstimos."""
+        logger.info(f"Closing API pool for {self.host}: {self.stats()}")
+        self._stop.set()
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for conn in idle:
+                self._drop_locked(conn)
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Keepalive / idle reaping
+    # ------------------------------------------------------------------
+    def _ensure_maintenance(self):
+        if self._maintenance is None:
+            self._maintenance = threading.Thread(target=self._maintenance_loop, daemon=True)
+            self._maintenance.start()
+
+    def _maintenance_loop(self):
+        interval = min(self.keepalive_interval, self.idle_timeout) / 2
+        while not self._stop.wait(interval):
+            now = time.monotonic()
+            to_ping = []
+            with self._cond:
+                keep = []
+                for conn in self._idle:
+                    idle_for = now - conn.last_used
+                    if idle_for >= self.idle_timeout:
+                        self._stats['reaped'] += 1
+                        self._drop_locked(conn)
+                    elif now - max(conn.last_used, conn.last_keepalive) >= self.keepalive_interval:
+                        to_ping.append(conn)
+                    else:
+                        keep.append(conn)
+                self._idle = keep
+
+            for conn in to_ping:
+                try:
+                    with conn.deadline(settings.API_QUERY_TIMEOUT, 'keepalive'):
+                        conn.get_resource('/system/identity').get()
+                    conn.last_keepalive = time.monotonic()
+                    self._count('keepalives')
+                except Exception as e:
+                    logger.info(f"Idle API session to {self.host} died ({e}), dropping it")
+                    self._discard(conn)
+                    continue
+                # Keepalive does not count as use: the idle clock keeps running
+                # so the session is still reaped if nobody needs it.
+                with self._cond:
+                    if self._closed:
+                        self._drop_locked(conn)
+                    else:
+                        self._idle.insert(0, conn)
+                    self._cond.notify()
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import threading
+import time
+from dataclasses import replace
+
+from app.config import settings
+from app.models.fleet import FleetSnapshot, RouterHealth, RouterProfile, RouterStatus
+from app.services.async_mikrotik_service import AsyncMikrotikService
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.services.logger_service import logger
+
+
+def load_profiles(path=None, password_source=None):
+    """Perfis do arquivo da frota (`{"routers": [{"name", "host", "user", ...}]}`).
+
+    Perfis sem senha no arquivo buscam a senha com `password_source(host, user)`,
+    por padrão o keyring do ConfigManager.
+    """
+    path = path or settings.FLEET_FILE
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    profiles = [RouterProfile.from_dict(entry) for entry in data.get('routers', [])]
+    if password_source is None and any(profile.password is None for profile in profiles):
+        from app.utils.config_manager import ConfigManager
+        password_source = ConfigManager().get_password
+    return [profile if profile.password is not None
+            else replace(profile, password=password_source(profile.host, profile.user) or '')
+            for profile in profiles]
+
+
+class _Router:
+    """Estado mutável de um roteador, só tocado pelo event loop da frota."""
+
+    __slots__ = ('profile', 'service', 'links', 'breaker', 'last')
+
+    def __init__(self, profile, service_factory):
+        self.profile = profile
+        self.service = service_factory(profile.host, profile.user, profile.password or '',
+                                       profile.use_ssl, port=profile.port)
+        self.links = None  # discovered on the first successful cycle
+        # One failure is enough to back off: the fleet has plenty of other routers to poll
+        self.breaker = CircuitBreaker(profile.name, threshold=1, base_delay=settings.FLEET_BACKOFF_BASE,
+                                      max_delay=settings.FLEET_BACKOFF_MAX)
+        self.last = RouterStatus(profile)
+
+
+class FleetMonitor:
+    """Monitora vários roteadores a partir de um único event loop.
+
+    Cada roteador tem um AsyncMikrotikService (uma conexão multiplexada); em
+    cada ciclo no máximo `concurrency` roteadores são consultados ao mesmo
+    tempo, cada um limitado a FLEET_ROUTER_TIMEOUT. Um roteador que falha
+    fica de fora pelo backoff do seu disjuntor, sem ocupar vaga nem esperar
+    prazo nos ciclos seguintes.
+    """
+
+    def __init__(self, profiles, concurrency=None, service_factory=AsyncMikrotikService):
+        self.concurrency = concurrency or settings.FLEET_MAX_CONCURRENCY
+        self._routers = [_Router(profile, service_factory) for profile in profiles]
+        self.snapshot = FleetSnapshot.pending(profiles)
+        self.stats = {'cycles': 0, 'polled': 0, 'skipped': 0, 'peak_in_flight': 0}
+        self._in_flight = 0
+        self._loop = None
+        self._wake = None
+        self._stopping = False
+        self._thread = None
+
+    async def poll(self):
+        """Um ciclo: consulta todos os roteadores fora de backoff e retorna o FleetSnapshot."""
+        started = time.perf_counter()
+        # Created here: it belongs to the running loop
+        slots = asyncio.Semaphore(self.concurrency)
+        routers = await asyncio.gather(*(self._poll_router(router, slots) for router in self._routers))
+        self.stats['cycles'] += 1
+        self.snapshot = FleetSnapshot(tuple(routers), round((time.perf_counter() - started) * 1000, 1),
+                                      time.time())
+        return self.snapshot
+
+    async def _poll_router(self, router, slots):
+        try:
+            router.breaker.before_call()
+        except CircuitOpenError:
+            self.stats['skipped'] += 1
+            router.last = replace(router.last, health=RouterHealth.BACKOFF)
+            return router.last
+
+        async with slots:
+            self._in_flight += 1
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self._in_flight)
+            started = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(self._cycle(router), settings.FLEET_ROUTER_TIMEOUT)
+            except Exception as e:
+                router.breaker.record_failure()
+                # A timed out connection may still have commands pending; start clean next time
+                await router.service.close()
+                previous = router.last.status
+                router.last = replace(
+                    router.last, health=RouterHealth.DOWN,
+                    status=replace(previous, stale=True) if previous is not None else None,
+                    error=str(e) or type(e).__name__, failures=router.last.failures + 1,
+                    cycle_ms=round((time.perf_counter() - started) * 1000, 1))
+                return router.last
+            finally:
+                self._in_flight -= 1
+                self.stats['polled'] += 1
+
+        router.breaker.record_success()
+        degraded = status.active_down or any(link.offline for link in status.links)
+        router.last = RouterStatus(router.profile, RouterHealth.DEGRADED if degraded else RouterHealth.OK,
+                                   status, cycle_ms=round((time.perf_counter() - started) * 1000, 1),
+                                   updated_at=time.time())
+        return router.last
+
+    async def _cycle(self, router):
+        if not router.links:
+            # Also retried while nothing was found, like the headless monitor
+            router.links = await router.service.discover_links()
+        return await router.service.get_status(router.links)
+
+    async def run(self, on_update, once=False):
+        """Laço de ciclos a cada FLEET_POLL_INTERVAL; `on_update(FleetSnapshot)` ao fim de cada um."""
+        self._wake = asyncio.Event()
+        try:
+            while not self._stopping:
+                started = time.monotonic()
+                on_update(await self.poll())
+                if once:
+                    return
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(),
+                                           max(settings.FLEET_POLL_INTERVAL - (time.monotonic() - started), 0))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.close()
+
+    async def close(self):
+        await asyncio.gather(*(router.service.close() for router in self._routers),
+                             return_exceptions=True)
+
+    def start(self, on_update):
+        """Roda `run` em uma thread própria (uma só, para a frota inteira)."""
+        def main():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop.run_until_complete(self.run(on_update))
+            except Exception as e:
+                logger.error(f"Fleet monitor stopped: {e}")
+            finally:
+                self._loop.close()
+
+        self._thread = threading.Thread(target=main, name='fleet-monitor', daemon=True)
+        self._thread.start()
+
+    def refresh(self):
+        """Começa o próximo ciclo agora (de qualquer thread)."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def stop(self):
+        self._stopping = True
+        self.refresh()
+        if self._thread is not None:
+            self._thread.join(timeout=settings.FLEET_ROUTER_TIMEOUT)
@@ -2,7 +2,12 @@ import logging
 import os
 import sys
 
-def setup_logger():
+# Handlers are only attached by setup_logger(), called once by the entry point;
+# importing a service no longer creates the log directory or opens the file.
+logger = logging.getLogger("MikroTikRoutes")
+
+
+def setup_logger(console_level=logging.INFO):
     # Determine log path
     if getattr(sys, 'frozen', False):
         # Running as executable
@@ -17,17 +22,17 @@ def setup_logger():
 
     log_file = os.path.join(log_dir, "app.log")
 
+    # stderr, so stdout stays free for program output (app.daemon's JSON lines)
+    console = logging.StreamHandler(sys.stderr)
+    console.setLevel(console_level)
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s [%(levelname)s] %(name)s: %(message)s',
         handlers=[
             logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler(sys.stdout)
+            console
         ]
     )
     
-    logger = logging.getLogger("MikroTikRoutes")
     logger.info("Application started")
     return logger
-
-logger = setup_logger()
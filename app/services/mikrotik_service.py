@@ -1,278 +1,671 @@
-import routeros_api
-import re
+import hashlib
+import time
+from collections import deque
+from app.config import settings
+from app.models.status import LinkStatus, Mode, StatusSnapshot, ping_state
+from app.services.connection_pool import RouterOsConnectionPool
 from app.services.logger_service import logger
+from app.services.ping_tiers import PingTiers
+from app.services.probe_cache import ProbeConfigCache
+from app.services.probe_stream import StreamingProbes
+from app.services.route_index import SnapshotIndex
+from app.services.router_watcher import RouterStateWatcher
+from app.services.rtt_parser import parse_rtt
+
+# Only the columns the service reads are requested from the router (.proplist);
+# on edge boxes the full rows carry dozens of BGP/DHCP properties.
+DEFAULT_ROUTE_QUERY = {'dst-address': '0.0.0.0/0'}
+ROUTE_PROPERTIES = ('.id', 'comment', 'gateway', 'gateway-status', 'active', 'disabled')
+DHCP_CLIENT_PROPERTIES = ('interface', 'status', 'address', 'gateway')
+ADDRESS_PROPERTIES = ('interface', 'address')
 
 
 class MikrotikService:
-    def __init__(self, host, user, password, use_ssl=False):
+    def __init__(self, host, user, password, use_ssl=False, port=None, ssl_context=None):
         self.host = host
         self.user = user
         self.password = password
         self.use_ssl = use_ssl
+        # Long-lived authenticated sessions shared by every call below
+        self._pool = RouterOsConnectionPool(host, user, password, use_ssl, port=port,
+                                            ssl_context=ssl_context)
+        self._watcher = None
+        self._probes = ProbeConfigCache()
+        self._ping_tiers = PingTiers()
+        self._leases = {}  # comment -> DHCP address seen by the cheap tier last cycle
+        self._streams = None  # StreamingProbes, started on the first cycle in "stream" mode
+        self._cycles = deque(maxlen=200)  # (seconds, outcome) of recent get_status calls
+        self._discovered = None  # (route fingerprint, links) of the last discovery
 
-    def _get_connection(self):
-        return routeros_api.RouterOsApiPool(
-            self.host, 
-            username=self.user, 
-            password=self.password, 
-            plaintext_login=True,
-            use_ssl=self.use_ssl
-        )
+    def connection_stats(self):
+        """Contadores do pool (handshakes, reaproveitamentos, reconexões, prazos, disjuntor)."""
+        return self._pool.stats()
+
+    def status_latency(self):
+        """Percentis (ms) da duração dos últimos ciclos de get_status e seus desfechos."""
+        cycles = list(self._cycles)
+        times = sorted(seconds * 1000 for seconds, _ in cycles)
+        outcomes = {}
+        for _, outcome in cycles:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        stats = {'cycles': len(cycles), 'outcomes': outcomes}
+        for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            stats[name] = round(times[min(int(q * len(times)), len(times) - 1)], 1) if times else None
+        stats['max'] = round(times[-1], 1) if times else None
+        return stats
+
+    def link_stats(self):
+        """Perda, mín/média/máx e jitter por link (só no modo de ping "stream")."""
+        return self._streams.stats() if self._streams is not None else {}
+
+    def close(self):
+        """Encerra as sessões abertas com o roteador."""
+        self.stop_watching()
+        if self._streams is not None:
+            self._streams.stop()
+        self._pool.close()
+
+    def start_watching(self, on_change=None):
+        """Passa a acompanhar rotas, DHCP e endereços via `listen`.
+
+        Enquanto o espelho estiver sincronizado, get_status deixa de reconsultar
+        essas tabelas. Se o roteador não suportar `listen`, tudo continua por polling.
+        """
+        if self._watcher is None:
+            def changed(table, row):
+                # A new lease or address may change the ping source of a link
+                if table in (None, 'dhcp_clients', 'addresses'):
+                    self._probes.invalidate()
+                if on_change is not None:
+                    on_change(table, row)
+            self._watcher = RouterStateWatcher(self._pool, changed)
+            self._watcher.start()
+        return self._watcher
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def is_watching(self):
+        return self._watcher is not None and self._watcher.live
+
+    def next_ping_in(self):
+        """Segundos até algum link precisar de um ping novo (None se nenhum foi medido)."""
+        return self._ping_tiers.next_due()
+
+    def get_route_state(self, discovered_links, previous=None):
+        """StatusSnapshot com as rotas do espelho local (sem ir ao roteador).
+
+        Os pings vêm de `previous`, o último snapshot medido. Retorna None se
+        o espelho não estiver sincronizado.
+        """
+        watcher = self._watcher
+        if watcher is None or not watcher.live:
+            return None
+        routes, _, _ = watcher.snapshot()
+        return build_snapshot(routes, SnapshotIndex(discovered_links), previous=previous)
+
+    def probe_configs(self):
+        """Como cada link está sendo pingado (src-address/interface), como resolvido em cache."""
+        return self._probes.snapshot()
+
+    def get_cloud_address(self):
+        """IP público visto pelo serviço /ip/cloud do roteador (None se desativado)."""
+        def read(api):
+            rows = list(api.stream_print('/ip/cloud', ('public-address',)))
+            return rows[0].get('public-address') if rows else None
+        return self._pool.run(read) or None
 
-    def discover_links(self):
-        """Busca os links disponíveis no MikroTik."""
-        connection = self._get_connection()
+    def discover_links(self, cached=None):
+        """Busca os links disponíveis no MikroTik.
+
+        Com `cached` (o `warm_state()` de uma execução anterior), se a impressão
+        digital das rotas de link não mudou, a resolução dos pings é reaproveitada
+        e só a lista de rotas vai ao roteador.
+        """
         try:
-            api = connection.get_api()
-            list_routes = api.get_resource('/ip/route')
-            
-            routes = list_routes.get(dst_address='0.0.0.0/0')
-            discovered = []
-            
-            for r in routes:
-                comment = r.get('comment', '')
-                if comment.startswith("Link"):
-                    label = comment.split('_')[-1] if '_' in comment else comment
-                    gateway = r.get('gateway', '')
-                    discovered.append({'comment': comment, 'label': label, 'gateway': gateway})
-            
-            discovered.sort(key=lambda x: x['comment'])
-            logger.info(f"Discovered {len(discovered)} links: {[d['label'] for d in discovered]}")
-            return discovered
+            return self._pool.run(lambda api: self._discover_links(api, cached))
         except Exception as e:
             logger.error(f"Error discovering links on {self.host}: {e}")
             raise
+
+    def _discover_links(self, api, cached=None):
+        routes = list(self._default_routes(api, ROUTE_PROPERTIES))
+        discovered = links_from_routes(routes)
+        fingerprint = route_fingerprint(routes)
+        self._discovered = (fingerprint, discovered)
+
+        if cached is not None and cached.get('fingerprint') == fingerprint:
+            # Same link routes as last run: no DHCP/address reads, no re-resolution
+            self._probes.restore(cached.get('probes', {}))
+            logger.info(f"Warm start: routes unchanged, reusing probes for {[d['label'] for d in discovered]}")
+            return discovered
+        logger.info(f"Discovered {len(discovered)} links: {[d['label'] for d in discovered]}")
+
+        # Resolve how each link is probed now, so refreshes only have to ping
+        dhcp_clients, ip_addresses = self._fetch_probe_sources(api)
+        index = SnapshotIndex(discovered, dhcp_clients, ip_addresses)
+        self._probes.store(routes, index, build_ping_configs(routes, index))
+        return discovered
+
+    def warm_state(self):
+        """O que a próxima execução precisa para pular a descoberta (None antes da primeira)."""
+        if self._discovered is None:
+            return None
+        fingerprint, links = self._discovered
+        return {'fingerprint': fingerprint, 'links': links, 'probes': self._probes.export()}
+
+    @staticmethod
+    def _fetch_probe_sources(api):
+        """Clientes DHCP e endereços IP usados para achar o IP de origem dos pings."""
+        dhcp_clients = []
+        ip_addresses = []
+        try:
+            dhcp_clients = MikrotikService._bound_dhcp_clients(api)
+            ip_addresses = list(api.stream_print('/ip/address', ADDRESS_PROPERTIES))
+            logger.info(f"Found {len(dhcp_clients)} DHCP clients: {[d.get('interface') + '=' + d.get('gateway', 'N/A') for d in dhcp_clients]}")
+        except Exception as e:
+            logger.warning(f"Could not fetch DHCP/IP info for better pinging: {e}")
+        return dhcp_clients, ip_addresses
+
+    @staticmethod
+    def _bound_dhcp_clients(api):
+        # Only bound clients can provide a source address
+        return list(api.stream_print('/ip/dhcp-client', DHCP_CLIENT_PROPERTIES, {'status': 'bound'}))
+
+    @staticmethod
+    def _default_routes(api, proplist):
+        """Rotas default com comentário, filtradas e projetadas no próprio roteador."""
+        # Routes without a comment (BGP/DHCP-learned defaults) can never be a link
+        return api.stream_print('/ip/route', proplist, DEFAULT_ROUTE_QUERY, has=('comment',))
+
+    def get_status(self, discovered_links, force_ping=False):
+        """Busca Link Ativo, Modo e Pings no MikroTik (StatusSnapshot).
+
+        Com `force_ping`, todos os links são pingados neste ciclo, sem esperar
+        a cadência do tier de ping.
+        """
+        started = time.monotonic()
+        outcome = 'ok'
+        if force_ping:
+            self._ping_tiers.invalidate()
+        try:
+            return self._pool.run(lambda api: self._get_status(api, discovered_links))
+        except Exception as e:
+            outcome = type(e).__name__
+            logger.error(f"Error getting status from {self.host}: {e}")
+            raise
         finally:
-            connection.disconnect()
+            elapsed = time.monotonic() - started
+            self._cycles.append((elapsed, outcome))
+            if elapsed > settings.STATUS_CYCLE_DEADLINE + settings.PING_DEADLINE_SLACK:
+                logger.warning(f"Slow status cycle on {self.host}: {elapsed * 1000:.0f} ms ({outcome})")
 
-    def get_status(self, discovered_links):
-        """Busca Link Ativo, Modo e Pings no MikroTik."""
-        active_link = "Desconhecido"
-        mode = "Manual"
-        unreachable_links = []
+    def _get_status(self, api, discovered_links):
         pings = {}  # {comment: ms}
         
         # Initialize all pings as "checking" to show user that verification is in progress
         for link in discovered_links:
             pings[link['comment']] = "checking"
         
-        connection = self._get_connection()
-        try:
-            api = connection.get_api()
-            list_routes = api.get_resource('/ip/route')
-            all_default_routes = list_routes.get(dst_address='0.0.0.0/0')
-            
-            enabled_count = 0
-            
-            # Fetch DHCP clients and IP addresses to find source IPs for forced pings
-            dhcp_clients = []
-            ip_addresses = []
+        watcher = self._watcher
+        mirrored = watcher is not None and watcher.live
+        if mirrored:
+            # Tables are kept current by `listen`; only the pings hit the router
+            all_default_routes, dhcp_clients, ip_addresses = watcher.snapshot()
+            index = SnapshotIndex(discovered_links, dhcp_clients, ip_addresses)
+        else:
+            all_default_routes = list(self._default_routes(api, ROUTE_PROPERTIES))
+            # Cheap tier: route flags plus DHCP leases, read every cycle
             try:
-                dhcp_clients = api.get_resource('/ip/dhcp-client').get()
-                ip_addresses = api.get_resource('/ip/address').get()
-                logger.info(f"Found {len(dhcp_clients)} DHCP clients: {[d.get('interface') + '=' + d.get('gateway', 'N/A') for d in dhcp_clients]}")
+                dhcp_clients = self._bound_dhcp_clients(api)
             except Exception as e:
-                logger.warning(f"Could not fetch DHCP/IP info for better pinging: {e}")
-            
-            # Prep ping targets and interfaces
-            ping_configs = {} # comment -> {params}
-            
-            for route in all_default_routes:
-                comment = route.get('comment', '')
-                matched_link = next((l for l in discovered_links if l['comment'] in comment), None)
-                
-                if matched_link:
-                    is_disabled = route.get('disabled') == 'true'
-                    is_active = route.get('active') == 'true'
-                    
-                    if not is_disabled:
-                        enabled_count += 1
-                        gw_status = route.get('gateway-status', '').lower()
-                        if 'unreachable' in gw_status or (not is_active and enabled_count == 1 and not is_disabled):
-                            unreachable_links.append(matched_link['comment'])
-                    
-                    if is_active:
-                        active_link = matched_link['label']
-
-                    # ============================================================
-                    # PING CONFIGURATION LOGIC
-                    # ============================================================
-                    # Goal: Ping 8.8.8.8 through each WAN link to measure real latency,
-                    # even when the link is not the active default route.
-                    #
-                    # Strategy by link type:
-                    # 1. PPPoE/VPN links (e.g., LINK1_CityNet_PPPoE):
-                    #    - Use: interface=<interface_name>
-                    #    - MikroTik can route through the interface directly
-                    #
-                    # 2. DHCP/Static links with physical interface (e.g., LINK3_Starlink):
-                    #    - Use: src-address=<dhcp_client_ip>
-                    #    - Forces the packet to exit via the correct WAN by source IP
-                    #    - DHCP client is found by matching gateway IP (e.g., 192.168.1.1)
-                    #
-                    # 3. Fallback (no interface or source IP found):
-                    #    - Ping the gateway IP directly (limited usefulness)
-                    # ============================================================
-                    
-                    # Ping Configuration Logic: Try to find physical interface 
-                    # to force ping through the correct path even if not active.
-                    gw_raw = route.get('gateway', '')
-                    gw_status = route.get('gateway-status', '')
-                    p_params = {'count': '1', 'address': '8.8.8.8'}
-                    
-                    logger.info(f"Route Debug: {comment} -> gw='{gw_raw}', gw_status='{gw_status}'")
-                    
-                    iface = None
-                    if '%' in gw_raw:
-                        iface = gw_raw.split('%')[-1]
-                    elif any(c.isalpha() for c in gw_raw):
-                        iface = gw_raw
-                    elif 'via' in gw_status:
-                        # Extract interface name after "via" (e.g. "reachable via ether1")
-                        try:
-                            iface = gw_status.split('via')[-1].strip().split()[0]
-                        except: pass
-                    
-                    # Better forcing: Find Source IP for this interface
-                    # This is key for DHCP/Static links to route 8.8.8.8 correctly
-                    src_ip = None
-                    is_pppoe = iface and ('pppoe' in iface.lower() or 'vpn' in iface.lower())
-                    
-                    logger.info(f"Ping Config Debug: {comment} -> iface='{iface}', is_pppoe={is_pppoe}, gw_raw='{gw_raw}'")
-                    
-                    if iface and not is_pppoe:
-                        # For non-PPPoE interfaces (DHCP/Static), we need src-address
-                        # Check DHCP bound address
-                        dhcp = next((d for d in dhcp_clients if d.get('interface') == iface and d.get('status') == 'bound'), None)
-                        logger.info(f"  DHCP lookup for {iface}: {dhcp}")
-                        if dhcp:
-                            src_ip = dhcp.get('address', '').split('/')[0]
-                        else:
-                            # Check static IP Address list
-                            addr = next((a for a in ip_addresses if a.get('interface') == iface), None)
-                            logger.info(f"  IP Address lookup for {iface}: {addr}")
-                            if addr:
-                                src_ip = addr.get('address', '').split('/')[0]
-                        logger.info(f"  Found src_ip: {src_ip}")
-                    elif not iface and gw_raw and not any(c.isalpha() for c in gw_raw):
-                        # Gateway is an IP but no interface found - search DHCP by gateway
-                        logger.info(f"  Searching DHCP client by gateway IP: {gw_raw}")
-                        dhcp = next((d for d in dhcp_clients if d.get('gateway') == gw_raw and d.get('status') == 'bound'), None)
-                        logger.info(f"  DHCP lookup by gateway: {dhcp}")
-                        if dhcp:
-                            src_ip = dhcp.get('address', '').split('/')[0]
-                            logger.info(f"  Found src_ip from DHCP gateway: {src_ip}")
-                        else:
-                            # DHCP client not found - likely cable disconnected or interface down
-                            logger.warning(f"  No DHCP client found for gateway {gw_raw} - marking as offline")
-                            pings[matched_link['comment']] = "err"
-                            ping_configs[matched_link['comment']] = None  # Skip ping attempt
-                            continue
-                    
-                    if src_ip:
-                        # Use src-address for DHCP/Static links (not PPPoE)
-                        p_params['src-address'] = src_ip
-                        # Don't use interface parameter with src-address
-                        # p_params already has address=8.8.8.8
-                    elif iface:
-                        # For PPPoE, use interface parameter only
-                        p_params['interface'] = iface
-                    else:
-                        # Fallback to pinging the gateway IP if no way to force 8.8.8.8
-                        p_params['address'] = gw_raw.split('%')[0]
-                    
-                    ping_configs[matched_link['comment']] = p_params
-
-            # Quick pings for each link (timeout 1s each)
-            ping_resource = api.get_resource('/tool')
-            for comment, params in ping_configs.items():
-                if params is None:
-                    # Link was marked as offline during config phase
-                    continue
-                try:
-                    logger.info(f"Ping Executing: {comment} -> {params}")
-                    res = ping_resource.call('ping', params)
-                    if res and len(res) > 0:
-                        avg_rtt = str(res[0].get('avg-rtt', ''))
-                        logger.info(f"Ping Result: {comment} ({params.get('interface', params.get('address'))}) -> '{avg_rtt}'")
-                        if avg_rtt:
-                            # Handle composite format: "10ms247us"
-                            ms = 0
-                            us = 0
-                            ms_match = re.search(r'(\d+)\s*ms', avg_rtt)
-                            if ms_match:
-                                ms = int(ms_match.group(1))
-                            us_match = re.search(r'(\d+)\s*us', avg_rtt)
-                            if us_match:
-                                us = int(us_match.group(1))
-                            
-                            if ms_match or us_match:
-                                total_ms = ms + (us / 1000.0)
-                                pings[comment] = str(round(total_ms, 1))
-                            elif ':' in avg_rtt and '.' in avg_rtt:
-                                # Format HH:MM:SS.mmm -> extract milliseconds
-                                try:
-                                    ms_part = avg_rtt.split('.')[-1]
-                                    total_ms = float("0." + ms_part) * 1000
-                                    pings[comment] = str(round(total_ms, 1))
-                                except:
-                                    pings[comment] = "0"
-                            else:
-                                # Strip any non-numeric chars but keep it simple
-                                clean_val = "".join(filter(lambda x: x.isdigit() or x == '.', avg_rtt))
-                                pings[comment] = clean_val if clean_val else "timeout"
-                        else:
-                            pings[comment] = "timeout"
-                    else:
-                        pings[comment] = "timeout"
-                except Exception:
-                    pings[comment] = "err"
-
-            if enabled_count > 1:
-                mode = "Failover Automático"
+                logger.warning(f"Could not read DHCP leases: {e}")
+                dhcp_clients = []
+            index = SnapshotIndex(discovered_links, dhcp_clients)
+        
+        signatures = link_signatures(all_default_routes, index)
+        for comment, signature in signatures.items():
+            lease = signature[-1]
+            if self._leases.get(comment, lease) != lease:
+                # Renumbered: resolve the source address again instead of pinging from the old one
+                self._probes.invalidate(comment)
+            self._leases[comment] = lease
+
+        # Ping sources are only re-resolved when a gateway, lease or address changed
+        ping_configs = self._probes.lookup(all_default_routes, index)
+        if ping_configs is None:
+            if not mirrored:
+                index = SnapshotIndex(discovered_links, *self._fetch_probe_sources(api))
+            ping_configs = build_ping_configs(all_default_routes, index)
+            self._probes.store(all_default_routes, index, ping_configs)
+
+        # Expensive tier: only links whose cadence ran out or whose route/lease
+        # changed are pinged; the rest repeat their last result
+        now = time.monotonic()
+        streamed = self._stream_probes(ping_configs)
+        paced = {}
+        for comment, params in ping_configs.items():
+            if params is None:
+                pings[comment] = "err"
+            elif comment in streamed:
+                # Rolling average of the stream; "checking" until the first echo
+                result = self._streams.result(comment)
+                pings[comment] = result if result is not None else "checking"
             else:
-                mode = "Manual"
-                
-            return active_link, mode, unreachable_links, pings
-        except Exception as e:
-            logger.error(f"Error getting status from {self.host}: {e}")
-            raise
-        finally:
-            connection.disconnect()
+                paced[comment] = signatures.get(comment)
+        selected = self._ping_tiers.select(paced, now)
+        due = {comment: ping_configs[comment] for comment in paced if comment in selected}
+        for comment in paced:
+            if comment not in selected:
+                pings[comment] = self._ping_tiers.last(comment)
+
+        if due:
+            # All pings go out at once as tagged commands on this session; RouterOS
+            # runs them in parallel, so the cycle costs the slowest probe, not the sum.
+            results = self._run_pings(api, due)
+            for comment, result in results.items():
+                self._ping_tiers.record(comment, signatures.get(comment), result, now)
+            pings.update(results)
+
+        return build_snapshot(all_default_routes, index, pings, self.link_stats())
+
+    def _stream_probes(self, ping_configs):
+        """No modo "stream", (re)configura os pings contínuos e retorna os links cobertos por eles."""
+        if settings.PING_MODE != "stream":
+            return {}
+        # Metered links keep their own paced single pings
+        streamed = {comment: params for comment, params in ping_configs.items()
+                    if params is not None and comment not in self._ping_tiers.intervals}
+        if self._streams is None:
+            self._streams = StreamingProbes(self._pool)
+        self._streams.configure(streamed)
+        return streamed
+
+    def _run_pings(self, api, ping_configs):
+        # The per-read cut below reports late replies as timeout; the hard deadline
+        # is a backstop in case the router keeps the socket busy without answering
+        with api.deadline(settings.STATUS_CYCLE_DEADLINE + settings.PING_DEADLINE_SLACK, 'ping round'):
+            return self._collect_pings(api, ping_configs)
+
+    def _collect_pings(self, api, ping_configs):
+        results = {}
+        pending = {}
+        ping_resource = api.get_resource('/tool')
+        for comment, params in ping_configs.items():
+            if params is None:
+                # Link was marked as offline during config phase
+                continue
+            try:
+                logger.info(f"Ping Executing: {comment} -> {params}")
+                pending[comment] = ping_resource.call_async('ping', params)
+            except Exception:
+                results[comment] = "err"
+
+        # Whatever has not answered by the cycle deadline is reported as timeout;
+        # the socket read is cut at the deadline so a stuck router can't hold the cycle.
+        # Replies that arrived while waiting on another tag are already buffered, so
+        # they are still collected after the session has been cut.
+        deadline = time.monotonic() + settings.STATUS_CYCLE_DEADLINE
+        for comment, promise in pending.items():
+            if api.alive:
+                api.set_timeout(deadline - time.monotonic())
+            try:
+                res = promise.get()
+                results[comment] = parse_ping_reply(comment, ping_configs[comment], res)
+            except Exception as e:
+                # A dead session here means the read hit the deadline
+                results[comment] = "err" if api.alive else "timeout"
+                if api.alive:
+                    # e.g. the source address is gone; resolve this link again next cycle
+                    self._probes.invalidate(comment)
+                logger.info(f"Ping Failed: {comment} -> {e}")
+        return results
 
     def switch_link(self, target_comment, discovered_links):
         """Ativa um link específico e desabilita os outros."""
-        connection = self._get_connection()
         try:
-            api = connection.get_api()
-            list_routes = api.get_resource('/ip/route')
-            routes = list_routes.get(dst_address='0.0.0.0/0')
-
-            for route in routes:
-                comment = route.get('comment', '')
-                if any(link['comment'] in comment for link in discovered_links):
-                    if target_comment in comment:
-                        list_routes.set(id=route['id'], disabled='no')
-                    else:
-                        list_routes.set(id=route['id'], disabled='yes')
+            self._pool.run(lambda api: self._write_routes(api, discovered_links, target_comment))
+            # The user will want fresh numbers for every link on the next refresh
+            self._ping_tiers.invalidate()
             logger.info(f"Switched link to {target_comment}")
         except Exception as e:
             logger.error(f"Error switching link to {target_comment} on {self.host}: {e}")
             raise
-        finally:
-            connection.disconnect()
 
     def enable_all_links(self, discovered_links):
         """Habilita todos os links para failover automático."""
-        connection = self._get_connection()
+        self._pool.run(lambda api: self._write_routes(api, discovered_links))
+        self._ping_tiers.invalidate()
+
+    def _write_routes(self, api, discovered_links, target_comment=None):
+        watcher = self._watcher
+        if watcher is not None and watcher.live:
+            routes, _, _ = watcher.snapshot()
+        else:
+            routes = list(self._default_routes(api, ('.id', 'comment', 'disabled')))
+
+        writes = route_writes(routes, SnapshotIndex(discovered_links), target_comment)
+        list_routes = api.get_resource('/ip/route')
+        # Enables are confirmed before any disable goes out, so there is always a
+        # default route; each phase is sent as one pipelined batch.
+        for phase in ('no', 'yes'):
+            with api.deadline(settings.API_QUERY_TIMEOUT, f"route writes (disabled={phase})"):
+                promises = [list_routes.call_async('set', {'id': route_id, 'disabled': disabled})
+                            for route_id, disabled in writes if disabled == phase]
+                for promise in promises:
+                    promise.get()
+        logger.info(f"Route writes: {writes or 'none, already in the desired state'}")
+
+    def confirm_switch(self, target_comment, discovered_links, timeout=None):
+        """Confirma pelo roteador que o link alvo assumiu: rota ativa e ping passando por ele.
+
+        Retorna um dict com `confirmed` (True/False, ou None quando o roteador
+        não permite concluir e vale checar pelo IP público), `stage` (onde parou:
+        'route', 'probe' ou 'error') e `latency_ms` desde o início da verificação.
+        """
+        start = time.monotonic()
+        deadline = start + (timeout or settings.SWITCH_CONFIRM_TIMEOUT)
         try:
-            api = connection.get_api()
-            list_routes = api.get_resource('/ip/route')
-            routes = list_routes.get(dst_address='0.0.0.0/0')
-
-            for route in routes:
-                comment = route.get('comment', '')
-                if any(link['comment'] in comment for link in discovered_links):
-                    list_routes.set(id=route['id'], disabled='no')
-        finally:
-            connection.disconnect()
+            confirmed, stage = self._pool.run(
+                lambda api: self._confirm_switch(api, target_comment, discovered_links, deadline))
+        except Exception as e:
+            logger.warning(f"Could not confirm switch to {target_comment} on {self.host}: {e}")
+            confirmed, stage = None, 'error'
+        return {'confirmed': confirmed, 'stage': stage,
+                'latency_ms': round((time.monotonic() - start) * 1000, 1)}
+
+    def _confirm_switch(self, api, target_comment, discovered_links, deadline):
+        index = SnapshotIndex(discovered_links)
+        if target_comment not in index.links_by_comment:
+            return None, 'route'
+
+        # 1) The target route must become the active default route
+        while True:
+            route = self._target_route(api, target_comment)
+            if route is not None and route.get('active') == 'true':
+                break
+            if route is None or 'unreachable' in route.get('gateway-status', '').lower():
+                return False, 'route'
+            if time.monotonic() >= deadline:
+                return False, 'route'
+            time.sleep(settings.SWITCH_CONFIRM_POLL / 1000)
+
+        # 2) And traffic must actually go through it
+        cached, params = self._probes.get(route, index)
+        if not cached:
+            index = SnapshotIndex(discovered_links, *self._fetch_probe_sources(api))
+            params = build_ping_configs([route], index).get(target_comment)
+        if params is None:
+            # No source address/interface to force the probe through this link
+            return None, 'probe'
+
+        ping_resource = api.get_resource('/tool')
+        while time.monotonic() < deadline:
+            try:
+                # A count=1 ping answers within ~1s; leave the socket a little slack
+                with api.deadline(deadline - time.monotonic() + 1.5, 'switch probe'):
+                    res = ping_resource.call('ping', params)
+            except Exception as e:
+                logger.info(f"Switch probe through {target_comment} failed: {e}")
+                return None, 'probe'
+            if parse_ping_reply(target_comment, params, res) != "timeout":
+                return True, 'probe'
+        return False, 'probe'
+
+    def _target_route(self, api, target_comment):
+        watcher = self._watcher
+        if watcher is not None and watcher.live:
+            routes, _, _ = watcher.snapshot()
+            return next((r for r in routes if r.get('comment') == target_comment), None)
+        routes = list(api.stream_print('/ip/route', ROUTE_PROPERTIES,
+                                       {**DEFAULT_ROUTE_QUERY, 'comment': target_comment}))
+        return routes[0] if routes else None
+
+
+def links_from_routes(routes):
+    """Extrai os links (rotas default com comentário iniciando em "Link")."""
+    discovered = []
+    
+    for r in routes:
+        comment = r.get('comment', '')
+        if comment.startswith("Link"):
+            label = comment.split('_')[-1] if '_' in comment else comment
+            gateway = r.get('gateway', '')
+            discovered.append({'comment': comment, 'label': label, 'gateway': gateway})
+    
+    discovered.sort(key=lambda x: x['comment'])
+    return discovered
+
+
+def route_fingerprint(routes):
+    """Impressão digital do conjunto de rotas de link (.id e comentário)."""
+    pairs = sorted((r.get('id', ''), r.get('comment', '')) for r in routes
+                   if r.get('comment', '').startswith("Link"))
+    return hashlib.sha1(repr(pairs).encode()).hexdigest()
+
+
+def route_writes(routes, index, target_comment=None):
+    """Lista (id, disabled) só das rotas de link que precisam mudar.
+
+    Com `target_comment`, só o link alvo fica habilitado (modo manual);
+    sem ele, todos são habilitados (failover automático). As habilitações
+    vêm antes das desabilitações.
+    """
+    enables = []
+    disables = []
+    for route in routes:
+        link = index.link_for(route)
+        if link is None:
+            continue
+        enable = target_comment is None or link['comment'] == target_comment
+        # Routes already in the desired state are left alone
+        if enable and route.get('disabled') == 'true':
+            enables.append((route['id'], 'no'))
+        elif not enable and route.get('disabled') != 'true':
+            disables.append((route['id'], 'yes'))
+    return enables + disables
+
+
+def link_interface(route):
+    """Interface de saída da rota: `ip%iface`, gateway nome de interface ou "via iface"."""
+    gw_raw = route.get('gateway', '')
+    gw_status = route.get('gateway-status', '')
+    if '%' in gw_raw:
+        return gw_raw.split('%')[-1]
+    if any(c.isalpha() for c in gw_raw):
+        return gw_raw
+    if 'via' in gw_status:
+        # Extract interface name after "via" (e.g. "reachable via ether1")
+        parts = gw_status.split('via')[-1].strip().split()
+        if parts:
+            return parts[0]
+    return None
+
+
+def link_signatures(default_routes, index):
+    """O que o tier barato vê de cada link: flags da rota e o lease DHCP dele."""
+    signatures = {}
+    for route in default_routes:
+        link = index.link_for(route)
+        if link is None:
+            continue
+        iface = link_interface(route)
+        dhcp = (index.dhcp_by_interface.get(iface) if iface
+                else index.dhcp_by_gateway.get(route.get('gateway', '')))
+        signatures[link['comment']] = (
+            route.get('gateway', ''), route.get('gateway-status', ''),
+            route.get('active', ''), route.get('disabled', ''),
+            dhcp.get('address') if dhcp else None,
+        )
+    return signatures
+
+
+def summarize_routes(default_routes, index):
+    """Deriva link ativo, modo e links inalcançáveis das rotas default."""
+    active_link = "Desconhecido"
+    unreachable_links = []
+    enabled_count = 0
+    
+    for route in default_routes:
+        matched_link = index.link_for(route)
+        if not matched_link:
+            continue
+        
+        is_disabled = route.get('disabled') == 'true'
+        is_active = route.get('active') == 'true'
+        
+        if not is_disabled:
+            enabled_count += 1
+            gw_status = route.get('gateway-status', '').lower()
+            if 'unreachable' in gw_status or (not is_active and enabled_count == 1 and not is_disabled):
+                unreachable_links.append(matched_link['comment'])
+        
+        if is_active:
+            active_link = matched_link['label']
+
+    if enabled_count > 1:
+        mode = Mode.AUTO
+    else:
+        mode = Mode.MANUAL
+    return active_link, mode, unreachable_links
+
+
+def build_snapshot(default_routes, index, pings=None, link_stats=None, previous=None):
+    """Junta rotas e pings de um ciclo em um StatusSnapshot.
+
+    `pings` traz os valores do serviço (ms, "timeout", "err", "checking");
+    links sem valor ali repetem o ping de `previous`, ou ficam "checking".
+    """
+    pings = pings or {}
+    link_stats = link_stats or {}
+    active_link, mode, unreachable_links = summarize_routes(default_routes, index)
+
+    route_ids = {}
+    active = set()
+    for route in default_routes:
+        link = index.link_for(route)
+        if link is None:
+            continue
+        route_ids.setdefault(link['comment'], []).append(route.get('id'))
+        if route.get('active') == 'true':
+            active.add(link['comment'])
+
+    links = []
+    for comment, link in index.links_by_comment.items():
+        old = previous.link(comment) if previous is not None and comment not in pings else None
+        if old is not None:
+            state, rtt, loss, jitter = old.state, old.rtt_ms, old.loss, old.jitter
+        else:
+            state, rtt = ping_state(pings.get(comment, "checking"))
+            stats = link_stats.get(comment, {})
+            loss, jitter = stats.get('loss'), stats.get('jitter')
+        links.append(LinkStatus(
+            comment, link['label'], state, rtt, loss, jitter,
+            active=comment in active,
+            reachable=comment not in unreachable_links,
+            route_ids=tuple(route_ids.get(comment, ())),
+        ))
+    return StatusSnapshot(tuple(links), active_link, mode)
+
+
+def build_ping_configs(default_routes, index):
+    """Monta os parâmetros de /tool ping de cada link (None = link sem caminho, não pingar)."""
+    # Prep ping targets and interfaces
+    ping_configs = {} # comment -> {params}
+    
+    for route in default_routes:
+        comment = route.get('comment', '')
+        matched_link = index.link_for(route)
+        
+        if matched_link:
+            # ============================================================
+            # PING CONFIGURATION LOGIC
+            # ============================================================
+            # Goal: Ping 8.8.8.8 (PING_TARGETS) through each WAN link to measure real latency,
+            # even when the link is not the active default route.
+            #
+            # Strategy by link type:
+            # 1. PPPoE/VPN links (e.g., LINK1_CityNet_PPPoE):
+            #    - Use: interface=<interface_name>
+            #    - MikroTik can route through the interface directly
+            #
+            # 2. DHCP/Static links with physical interface (e.g., LINK3_Starlink):
+            #    - Use: src-address=<dhcp_client_ip>
+            #    - Forces the packet to exit via the correct WAN by source IP
+            #    - DHCP client is found by matching gateway IP (e.g., 192.168.1.1)
+            #
+            # 3. Fallback (no interface or source IP found):
+            #    - Ping the gateway IP directly (limited usefulness)
+            # ============================================================
+            
+            # Ping Configuration Logic: Try to find physical interface 
+            # to force ping through the correct path even if not active.
+            gw_raw = route.get('gateway', '')
+            gw_status = route.get('gateway-status', '')
+            p_params = {'count': '1', 'address': settings.PING_TARGETS[0]}
+            
+            logger.info(f"Route Debug: {comment} -> gw='{gw_raw}', gw_status='{gw_status}'")
+            
+            iface = link_interface(route)
+            
+            # Better forcing: Find Source IP for this interface
+            # This is key for DHCP/Static links to route 8.8.8.8 correctly
+            src_ip = None
+            is_pppoe = iface and ('pppoe' in iface.lower() or 'vpn' in iface.lower())
+            
+            logger.info(f"Ping Config Debug: {comment} -> iface='{iface}', is_pppoe={is_pppoe}, gw_raw='{gw_raw}'")
+            
+            if iface and not is_pppoe:
+                # For non-PPPoE interfaces (DHCP/Static), we need src-address
+                # Check DHCP bound address
+                dhcp = index.dhcp_by_interface.get(iface)
+                logger.info(f"  DHCP lookup for {iface}: {dhcp}")
+                if dhcp:
+                    src_ip = dhcp.get('address', '').split('/')[0]
+                else:
+                    # Check static IP Address list
+                    addr = index.address_by_interface.get(iface)
+                    logger.info(f"  IP Address lookup for {iface}: {addr}")
+                    if addr:
+                        src_ip = addr.get('address', '').split('/')[0]
+                logger.info(f"  Found src_ip: {src_ip}")
+            elif not iface and gw_raw and not any(c.isalpha() for c in gw_raw):
+                # Gateway is an IP but no interface found - search DHCP by gateway
+                logger.info(f"  Searching DHCP client by gateway IP: {gw_raw}")
+                dhcp = index.dhcp_by_gateway.get(gw_raw)
+                logger.info(f"  DHCP lookup by gateway: {dhcp}")
+                if dhcp:
+                    src_ip = dhcp.get('address', '').split('/')[0]
+                    logger.info(f"  Found src_ip from DHCP gateway: {src_ip}")
+                else:
+                    # DHCP client not found - likely cable disconnected or interface down
+                    logger.warning(f"  No DHCP client found for gateway {gw_raw} - marking as offline")
+                    ping_configs[matched_link['comment']] = None  # Skip ping attempt
+                    continue
+            
+            if src_ip:
+                # Use src-address for DHCP/Static links (not PPPoE)
+                p_params['src-address'] = src_ip
+                # Don't use interface parameter with src-address
+                # p_params already has address=8.8.8.8
+            elif iface:
+                # For PPPoE, use interface parameter only
+                p_params['interface'] = iface
+            else:
+                # Fallback to pinging the gateway IP if no way to force 8.8.8.8
+                p_params['address'] = gw_raw.split('%')[0]
+            
+            ping_configs[matched_link['comment']] = p_params
+    return ping_configs
+
+
+def parse_ping_reply(comment, params, res):
+    """Converte a resposta de /tool ping em ms (float) ou "timeout"."""
+    if not res:
+        return "timeout"
+    avg_rtt = res[0].get('avg-rtt', '')
+    logger.info(f"Ping Result: {comment} ({params.get('interface', params.get('address'))}) -> '{avg_rtt}'")
+    ms = parse_rtt(avg_rtt)
+    return ms if ms is not None else "timeout"
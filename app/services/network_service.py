@@ -1,22 +1,143 @@
-import urllib.request
-import socket
+import http.client
+import ipaddress
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
 
-class NetworkService:
-    @staticmethod
-    def get_public_ip():
-        """Busca o IP público via ipify.org ou icanhazip.com."""
-        services = [
-            "https://api.ipify.org",
-            "https://icanhazip.com",
-            "https://ifconfig.me/ip"
-        ]
-        
-        for service in services:
+from app.config import settings
+from app.services.logger_service import logger
+
+OFFLINE = "Erro (Offline?)"
+
+
+class _Provider:
+    """Serviço HTTP de IP público com uma conexão keep-alive reaproveitada."""
+
+    def __init__(self, url, timeout):
+        parts = urlsplit(url)
+        self.url = url
+        self.https = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or '/'
+        self.timeout = timeout
+        self.busy = threading.Lock()  # one request at a time per connection
+        self._conn = None
+
+    def fetch(self):
+        # A kept-alive connection the server already closed fails on first use; retry once fresh
+        for attempt in range(2):
+            if self._conn is None:
+                cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+                self._conn = cls(self.host, self.port, timeout=self.timeout)
             try:
-                # Timeout agressivo para falhar rápido e tentar o próximo
-                with urllib.request.urlopen(service, timeout=1) as response:
-                    return response.read().decode('utf-8').strip()
+                self._conn.request('GET', self.path, headers={'User-Agent': 'mikrotik-routes'})
+                response = self._conn.getresponse()
+                body = response.read().decode('utf-8', errors='replace').strip()
+                if response.status != 200:
+                    raise ValueError(f"HTTP {response.status}")
+                if response.will_close:
+                    self.close()
+                return body
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self.close()
+                if attempt:
+                    raise
             except Exception:
-                continue
-                
-        return "Erro (Offline?)"
+                self.close()
+                raise
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class NetworkService:
+    """Descobre o IP público consultando vários serviços ao mesmo tempo.
+
+    Vale a primeira resposta válida; o resultado fica em cache por
+    `PUBLIC_IP_TTL` segundos ou até `invalidate()` (troca de link ativo).
+    `router_source` (ex.: MikrotikService.get_cloud_address) é usado quando
+    nenhum serviço HTTP responde.
+    """
+
+    def __init__(self, providers=None, timeout=None, ttl=None, router_source=None):
+        self.timeout = timeout or settings.PUBLIC_IP_TIMEOUT
+        self.ttl = ttl if ttl is not None else settings.PUBLIC_IP_TTL
+        self.router_source = router_source
+        self._providers = [_Provider(url, self.timeout) for url in (providers or settings.PUBLIC_IP_PROVIDERS)]
+        self._executor = ThreadPoolExecutor(max_workers=len(self._providers),
+                                            thread_name_prefix='public-ip')
+        self._lock = threading.Lock()
+        self._cached = None
+        self._cached_at = 0.0
+
+    def get_public_ip(self, fresh=False):
+        """Busca o IP público (ou devolve o do cache, se ainda válido)."""
+        with self._lock:
+            if not fresh and self._cached and time.monotonic() - self._cached_at < self.ttl:
+                return self._cached
+
+        ip = self._race() or self._from_router()
+        if ip is None:
+            return OFFLINE
+        with self._lock:
+            self._cached = ip
+            self._cached_at = time.monotonic()
+        return ip
+
+    def invalidate(self):
+        """Descarta o IP em cache (o link de saída mudou)."""
+        with self._lock:
+            self._cached = None
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for provider in self._providers:
+            provider.close()
+
+    def _race(self):
+        pending = set()
+        for provider in self._providers:
+            # A provider still stuck on the previous race sits this one out
+            if provider.busy.acquire(blocking=False):
+                try:
+                    pending.add(self._executor.submit(self._ask, provider))
+                except RuntimeError:
+                    # Executor already shut down by close(): _ask will never release it
+                    provider.busy.release()
+                    break
+        deadline = time.monotonic() + self.timeout
+        while pending:
+            done, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                ip = future.result()
+                if ip is not None:
+                    return ip
+        return None
+
+    @staticmethod
+    def _ask(provider):
+        try:
+            answer = provider.fetch()
+            ipaddress.ip_address(answer)
+            return answer
+        except Exception as e:
+            logger.info(f"Public IP provider {provider.url} failed: {e}")
+            return None
+        finally:
+            provider.busy.release()
+
+    def _from_router(self):
+        if self.router_source is None:
+            return None
+        try:
+            return self.router_source()
+        except Exception as e:
+            logger.info(f"Router public address unavailable: {e}")
+            return None
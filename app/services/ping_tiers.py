@@ -0,0 +1,79 @@
+import threading
+import time
+
+from app.config import settings
+
+
+class PingTiers:
+    """Decide, a cada ciclo, quais links precisam de um ping novo.
+
+    O tier barato (flags da rota e lease DHCP do link, a `signature`) roda
+    todo ciclo. O ping de um link só sai quando o intervalo dele venceu
+    (`PING_INTERVAL`, ou o valor do link em `PING_INTERVAL_BY_LINK`) ou quando
+    a assinatura mudou; nos outros ciclos o link repete a última medição.
+    Uma rodada que já vai sair leva junto os links quase vencidos (`select`).
+    Um ping que falhou segue o mesmo intervalo: um backup tarifado fora do ar
+    não é pingado a cada ciclo, e a volta do gateway muda a assinatura.
+    """
+
+    def __init__(self, default_interval=None, intervals=None):
+        self.default_interval = default_interval if default_interval is not None else settings.PING_INTERVAL
+        self.intervals = dict(settings.PING_INTERVAL_BY_LINK if intervals is None else intervals)
+        self._last = {}  # comment -> (signature, result, measured_at)
+        self._lock = threading.Lock()
+
+    def interval(self, comment):
+        return self.intervals.get(comment, self.default_interval)
+
+    def due(self, comment, signature, now=None):
+        """True se o link deve ser pingado neste ciclo."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._last.get(comment)
+        if entry is None:
+            return True
+        last_signature, _, measured_at = entry
+        return signature != last_signature or now - measured_at >= self.interval(comment)
+
+    def select(self, signatures, now=None):
+        """Links de `signatures` ({comment: signature}) que saem na rodada de ping deste ciclo.
+
+        Saem os vencidos; se algum sair, os links no intervalo padrão que já
+        passaram da metade dele vão junto, para as rodadas não se espalharem
+        em um ciclo por link. Links com intervalo próprio só saem vencidos.
+        """
+        now = time.monotonic() if now is None else now
+        due = {comment for comment, signature in signatures.items() if self.due(comment, signature, now)}
+        if due:
+            with self._lock:
+                measured = {comment: entry[2] for comment, entry in self._last.items()}
+            due.update(comment for comment in signatures
+                       if comment not in due and comment not in self.intervals
+                       and now - measured[comment] >= self.default_interval / 2)
+        return due
+
+    def next_due(self, now=None):
+        """Segundos até o próximo link vencer o intervalo (0 se já venceu), ou None sem medições."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            remaining = [measured_at + self.interval(comment) - now
+                         for comment, (_, _, measured_at) in self._last.items()]
+        return max(min(remaining), 0) if remaining else None
+
+    def record(self, comment, signature, result, now=None):
+        with self._lock:
+            self._last[comment] = (signature, result, time.monotonic() if now is None else now)
+
+    def last(self, comment):
+        """Última medição do link (None se nunca foi pingado)."""
+        with self._lock:
+            entry = self._last.get(comment)
+        return entry[1] if entry is not None else None
+
+    def invalidate(self, comment=None):
+        """Força um ping novo no próximo ciclo (de um link, ou de todos)."""
+        with self._lock:
+            if comment is None:
+                self._last.clear()
+            else:
+                self._last.pop(comment, None)
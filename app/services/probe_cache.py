@@ -0,0 +1,113 @@
+import threading
+import time
+
+from app.config import settings
+from app.services.logger_service import logger
+
+
+def route_key(route):
+    """O que, na rota, decide como o link é pingado (gateway e interface de saída)."""
+    return route.get('gateway', ''), route.get('gateway-status', '')
+
+
+class ProbeConfigCache:
+    """Parâmetros de /tool ping resolvidos por link, reaproveitados entre ciclos.
+
+    A resolução (interface, PPPoE/VPN, IP de origem via DHCP ou endereço
+    estático) só é refeita quando o gateway da rota muda, quando uma tabela
+    de DHCP/endereços muda (via `invalidate`), quando um ping falha com erro
+    ou depois de `PROBE_CACHE_TTL` segundos, já que sem `listen` uma troca de
+    lease não é vista pelo polling.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl or settings.PROBE_CACHE_TTL
+        self._entries = {}  # comment -> {'params', 'route', 'resolved_at'}
+        self._lock = threading.Lock()
+
+    def lookup(self, default_routes, index):
+        """Retorna {comment: params} se todos os links estão em cache e válidos; senão None."""
+        now = time.monotonic()
+        configs = {}
+        with self._lock:
+            for route in default_routes:
+                link = index.link_for(route)
+                if link is None:
+                    continue
+                entry = self._entries.get(link['comment'])
+                if entry is None or entry['route'] != route_key(route) or now - entry['resolved_at'] > self.ttl:
+                    return None
+                configs[link['comment']] = entry['params']
+        # A link with no route in this snapshot must be resolved (and reported) again
+        if len(configs) != len(index.links_by_comment):
+            return None
+        return configs
+
+    def get(self, route, index):
+        """(True, params) se o link da rota está em cache e válido; senão (False, None)."""
+        link = index.link_for(route)
+        if link is None:
+            return False, None
+        with self._lock:
+            entry = self._entries.get(link['comment'])
+            if (entry is None or entry['route'] != route_key(route)
+                    or time.monotonic() - entry['resolved_at'] > self.ttl):
+                return False, None
+            return True, entry['params']
+
+    def store(self, default_routes, index, ping_configs):
+        now = time.monotonic()
+        with self._lock:
+            self._entries.clear()
+            for route in default_routes:
+                link = index.link_for(route)
+                if link is None or link['comment'] not in ping_configs:
+                    continue
+                params = ping_configs[link['comment']]
+                self._entries[link['comment']] = {
+                    'params': params, 'route': route_key(route), 'resolved_at': now,
+                }
+                logger.info(f"Probe for {link['comment']} resolved to {params}")
+
+    def export(self):
+        """Resolução atual por link, serializável em JSON (para o cache de partida a quente)."""
+        with self._lock:
+            return {comment: {'params': entry['params'], 'route': list(entry['route'])}
+                    for comment, entry in self._entries.items()}
+
+    def restore(self, entries):
+        """Recarrega o que `export` devolveu; conta como resolvido agora.
+
+        Um link cujo gateway mudou desde então é resolvido de novo no próximo lookup.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._entries = {
+                comment: {'params': entry['params'], 'route': tuple(entry['route']), 'resolved_at': now}
+                for comment, entry in entries.items()
+            }
+
+    def invalidate(self, comment=None):
+        """Descarta a resolução de um link (ou de todos, sem `comment`)."""
+        with self._lock:
+            if comment is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(comment, None)
+
+    def snapshot(self):
+        """Cópia da resolução atual por link, para inspeção.
+
+        `params` é o que vai para /tool ping (`src-address` ou `interface`);
+        None indica link sem caminho (marcado como erro sem pingar).
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                comment: {
+                    'params': dict(entry['params']) if entry['params'] is not None else None,
+                    'gateway': entry['route'][0],
+                    'age': round(now - entry['resolved_at'], 1),
+                }
+                for comment, entry in self._entries.items()
+            }
@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import deque
+
+from app.config import settings
+from app.services.connection_pool import decode_row
+from app.services.logger_service import logger
+from app.services.rtt_parser import parse_rtt
+
+
+class LinkStats:
+    """Janela das últimas amostras de um link: perda, mín/média/máx e jitter."""
+
+    __slots__ = ('samples', 'jitter', 'error', 'updated_at', '_last_rtt')
+
+    def __init__(self, window):
+        self.samples = deque(maxlen=window)  # rtt in ms, None for a lost echo
+        self.jitter = None
+        self.error = None
+        self.updated_at = None
+        self._last_rtt = {}  # target -> previous rtt; paths to different targets aren't compared
+
+    def add(self, rtt, target):
+        self.samples.append(rtt)
+        self.error = None
+        self.updated_at = time.monotonic()
+        if rtt is None:
+            return
+        previous = self._last_rtt.get(target)
+        if previous is not None:
+            delta = abs(rtt - previous)
+            # RFC 3550 interarrival jitter estimator (EWMA with gain 1/16)
+            self.jitter = delta if self.jitter is None else self.jitter + (delta - self.jitter) / 16
+        self._last_rtt[target] = rtt
+
+    def snapshot(self):
+        rtts = [rtt for rtt in self.samples if rtt is not None]
+        count = len(self.samples)
+        return {
+            'samples': count,
+            'loss': round(100 * (count - len(rtts)) / count, 1) if count else None,
+            'min': round(min(rtts), 1) if rtts else None,
+            'avg': round(sum(rtts) / len(rtts), 1) if rtts else None,
+            'max': round(max(rtts), 1) if rtts else None,
+            'jitter': round(self.jitter, 1) if self.jitter is not None else None,
+            'error': self.error,
+        }
+
+
+class StreamingProbes:
+    """Pings contínuos por link, lidos conforme chegam, em uma sessão dedicada.
+
+    Cada link tem um `/tool ping` sem `count` (com `interval`) por alvo de
+    PING_TARGETS, que fica rodando: um único comando serve a todas as
+    amostras seguintes. As respostas alimentam uma janela de PROBE_WINDOW
+    amostras por link, de onde saem perda, mín/média/máx e jitter.
+    """
+
+    def __init__(self, pool, targets=None, interval=None, window=None):
+        self._pool = pool
+        self.targets = tuple(targets or settings.PING_TARGETS)
+        self.interval = interval or settings.PROBE_STREAM_INTERVAL
+        self.window = window or settings.PROBE_WINDOW
+        self._configs = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reconfigure = threading.Event()
+        self._session = None
+        self._thread = None
+
+    def configure(self, ping_configs):
+        """Define os links e seus parâmetros de ping; os streams só são refeitos se algo mudou."""
+        configs = {comment: params for comment, params in ping_configs.items() if params is not None}
+        with self._lock:
+            if configs == self._configs:
+                return
+            previous, self._configs = self._configs, configs
+            # A link whose path changed starts a fresh window
+            self._stats = {
+                comment: self._stats[comment] if previous.get(comment) == params else LinkStats(self.window)
+                for comment, params in configs.items()
+            }
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='probe-stream', daemon=True)
+            self._thread.start()
+        else:
+            self._restart()
+
+    def stop(self):
+        self._stop.set()
+        self._restart()
+
+    def stats(self):
+        """{comment: {'samples', 'loss', 'min', 'avg', 'max', 'jitter', 'error'}}"""
+        with self._lock:
+            return {comment: stats.snapshot() for comment, stats in self._stats.items()}
+
+    def result(self, comment):
+        """Valor de ping no formato dos ciclos de status: média em ms (float), "timeout"/"err", ou None sem amostras."""
+        with self._lock:
+            stats = self._stats.get(comment)
+            snapshot = stats.snapshot() if stats is not None else None
+        if snapshot is None or not snapshot['samples']:
+            return "err" if snapshot is not None and snapshot['error'] else None
+        if snapshot['avg'] is None:
+            return "timeout"
+        return snapshot['avg']
+
+    def _restart(self):
+        self._reconfigure.set()
+        session = self._session
+        if session is not None:
+            # Unblocks the reader; it reconnects with the new configuration
+            session.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._reconfigure.clear()
+            with self._lock:
+                idle = not self._configs
+            if idle:
+                self._reconfigure.wait()
+                continue
+            try:
+                self._session = self._pool.open_dedicated()
+                self._stream(self._session)
+            except Exception as e:
+                if not self._stop.is_set() and not self._reconfigure.is_set():
+                    logger.warning(f"Probe stream on {self._pool.host} lost its session: {e}")
+            finally:
+                if self._session is not None:
+                    self._session.close()
+                    self._session = None
+            if not self._reconfigure.is_set():
+                # stop() and configure() both set _reconfigure, so this wakes up for them
+                self._reconfigure.wait(settings.WATCH_RECONNECT_DELAY)
+
+    def _stream(self, session):
+        wire = session.wire
+        # Several echoes missing in a row means the session, not the link, is gone
+        session.set_timeout(max(self.interval * 5, settings.API_QUERY_TIMEOUT))
+        with self._lock:
+            configs = dict(self._configs)
+
+        streams = {}
+        for comment, params in configs.items():
+            for target in self._targets_for(params):
+                arguments = {key: value for key, value in params.items() if key != 'count'}
+                arguments.update({'address': target, 'interval': str(self.interval)})
+                tag = wire.send(b'/tool/', b'ping',
+                                {key.encode(): str(value).encode() for key, value in arguments.items()})
+                # Replies are consumed below; don't let routeros_api buffer them
+                del wire.response_buffor[tag]
+                streams[tag] = (comment, target)
+        logger.info(f"Probe streams on {self._pool.host}: {len(streams)} for {len(configs)} links")
+
+        while streams and not self._stop.is_set() and not self._reconfigure.is_set():
+            sentence = wire.receive_single_response().response
+            comment, target = streams.get(sentence.tag, (None, None))
+            if comment is None:
+                continue
+            if sentence.type == b're':
+                row = decode_row(sentence.attributes)
+                rtt = parse_rtt(row.get('time')) if 'status' not in row else None
+                with self._lock:
+                    stats = self._stats.get(comment)
+                    if stats is not None:
+                        stats.add(rtt, target)
+            elif sentence.type == b'trap':
+                message = sentence.attributes.get(b'message', b'').decode(errors='replace')
+                logger.info(f"Probe stream {comment} -> {target} failed: {message}")
+                with self._lock:
+                    stats = self._stats.get(comment)
+                    if stats is not None:
+                        stats.error = message
+            elif sentence.type == b'done':
+                del streams[sentence.tag]
+        if not streams:
+            raise ConnectionError("every probe stream ended")
+
+    def _targets_for(self, params):
+        # Links without a way to force the path ping their gateway instead of the targets
+        if params.get('address') != self.targets[0]:
+            return (params['address'],)
+        return self.targets
@@ -0,0 +1,81 @@
+from app.config import settings
+from app.services.logger_service import logger
+
+
+def link_health(link):
+    """Classe de saúde de um LinkStatus: 'down', 'slow', 'fair', 'ok' ou 'checking'."""
+    if link.offline:
+        return 'down'
+    if link.rtt_ms is None:
+        return 'checking'
+    # Same thresholds the dashboard uses to color the ping labels
+    if link.rtt_ms > 200:
+        return 'slow'
+    if link.rtt_ms > 100:
+        return 'fair'
+    return 'ok'
+
+
+class RefreshPolicy:
+    """Decide quanto esperar até a próxima atualização de status.
+
+    Uma mudança (link ativo, modo ou classe de saúde de algum link) e as
+    trocas de link pedem alguns ciclos rápidos; depois de alguns ciclos sem
+    mudança o intervalo cresce, e com a janela escondida na bandeja cresce
+    mais ainda. Um link que continua fora do ar não é mudança.
+
+    Os intervalos longos (estável e escondido) só valem com `route_push`
+    (espelho do `listen` ativo): aí uma rota que cai chega na hora e o polling
+    só mede os pings. Sem ele o polling é a única detecção e fica no normal.
+    Nenhum intervalo passa de `ping_due_in`: o tier de ping segue a própria
+    cadência, e uma perda que só o ping vê aparece no mesmo tempo de sempre.
+    """
+
+    def __init__(self):
+        self.hidden = False
+        self.route_push = False
+        self.ping_due_in = None  # ms until the ping tier has a link due (None: nothing measured)
+        self._signature = None
+        self._fast_left = 0
+        self._stable = 0
+        self._last_interval = None
+
+    def observe(self, status):
+        """Registra o StatusSnapshot de um ciclo."""
+        signature = (status.active_label, status.mode,
+                     tuple((link.comment, link_health(link)) for link in status.links))
+        if signature != self._signature:
+            if self._signature is not None:
+                self.boost()
+            self._signature = signature
+            self._stable = 0
+        else:
+            self._stable += 1
+            if self._fast_left:
+                self._fast_left -= 1
+
+    def boost(self):
+        """Amostra rápido pelos próximos ciclos (troca de link, mudança de saúde)."""
+        self._fast_left = settings.REFRESH_FAST_CYCLES
+        self._stable = 0
+
+    def next_interval(self):
+        """Intervalo em ms até o próximo ciclo."""
+        if self._fast_left:
+            interval = settings.REFRESH_INTERVAL_FAST
+        elif not self.route_push:
+            # Polling is what detects a dead route; hidden or stable, it keeps the normal pace
+            interval = settings.REFRESH_INTERVAL
+        elif self.hidden:
+            interval = settings.REFRESH_INTERVAL_HIDDEN
+        elif self._stable >= settings.REFRESH_STABLE_CYCLES:
+            interval = settings.REFRESH_INTERVAL_STABLE
+        else:
+            interval = settings.REFRESH_INTERVAL
+        if interval != self._last_interval:
+            logger.info(f"Refresh interval now {interval} ms")
+            self._last_interval = interval
+        if self.ping_due_in is not None:
+            # Only the route reads are stretched; a due ping still goes out on time
+            interval = min(interval, max(self.ping_due_in, settings.REFRESH_INTERVAL_FAST))
+        return interval
@@ -0,0 +1,35 @@
+class SnapshotIndex:
+    """Índices de um snapshot do roteador, montados uma vez por ciclo.
+
+    Troca as buscas lineares (link por comentário, cliente DHCP por interface
+    ou gateway, endereço por interface) por consultas em dict, então o custo
+    do ciclo não cresce com links x clientes DHCP x endereços.
+
+    Uma rota pertence a um link quando o comentário é exatamente o do link:
+    com substring, `Link1_ISP` casaria também com `Link10_ISP`.
+    """
+
+    __slots__ = ('links_by_comment', 'dhcp_by_interface', 'dhcp_by_gateway', 'address_by_interface')
+
+    def __init__(self, discovered_links, dhcp_clients=(), ip_addresses=()):
+        self.links_by_comment = {link['comment']: link for link in discovered_links}
+
+        # Only bound clients have a usable address; the first match wins, as before
+        self.dhcp_by_interface = {}
+        self.dhcp_by_gateway = {}
+        for client in dhcp_clients:
+            if client.get('status') != 'bound':
+                continue
+            if 'interface' in client:
+                self.dhcp_by_interface.setdefault(client['interface'], client)
+            if 'gateway' in client:
+                self.dhcp_by_gateway.setdefault(client['gateway'], client)
+
+        self.address_by_interface = {}
+        for address in ip_addresses:
+            if 'interface' in address:
+                self.address_by_interface.setdefault(address['interface'], address)
+
+    def link_for(self, route):
+        """Link dono da rota, ou None se a rota não for de um link descoberto."""
+        return self.links_by_comment.get(route.get('comment', ''))
@@ -0,0 +1,157 @@
+import threading
+
+from app.config import settings
+from app.services.connection_pool import decode_row
+from app.services.logger_service import logger
+
+
+class ListenUnsupportedError(Exception):
+    """O roteador recusou o comando `listen` (RouterOS antigo ou sem permissão)."""
+
+
+class RouterStateWatcher:
+    """Espelho em memória das rotas default, clientes DHCP e endereços IP.
+
+    Mantido por `listen` em uma sessão dedicada: o roteador só envia algo quando
+    uma linha muda, então com a rede estável o tráfego de API é praticamente zero.
+    `on_change(table, row)` é chamado (na thread do watcher) a cada alteração;
+    `table=None` indica que o espelho foi recarregado por completo.
+    """
+
+    # table name -> (menu, query words). Sent on the `listen` as well as on the
+    # initial dump, so on a full BGP table the churn of non-default routes never
+    # reaches the client; _apply() still drops anything outside the filter.
+    TABLES = {
+        'routes': ('/ip/route/', {b'dst-address': b'0.0.0.0/0'}),
+        'dhcp_clients': ('/ip/dhcp-client/', {}),
+        'addresses': ('/ip/address/', {}),
+    }
+
+    def __init__(self, pool, on_change=None):
+        self._pool = pool
+        self.on_change = on_change
+        self.available = True  # False once the router refuses `listen`
+        self._tables = {name: {} for name in self.TABLES}
+        self._lock = threading.Lock()
+        self._live = False
+        self._stop = threading.Event()
+        self._session = None
+        self._thread = None
+
+    @property
+    def live(self):
+        """True enquanto o espelho está sincronizado com o roteador."""
+        return self._live
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._live = False
+        session = self._session
+        if session is not None:
+            # Closing the socket unblocks the reader thread
+            session.close()
+
+    def snapshot(self):
+        """Cópia das tabelas espelhadas: (rotas default, clientes DHCP, endereços)."""
+        with self._lock:
+            return (
+                list(self._tables['routes'].values()),
+                list(self._tables['dhcp_clients'].values()),
+                list(self._tables['addresses'].values()),
+            )
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._session = self._pool.open_dedicated()
+                self._stream(self._session.wire)
+            except ListenUnsupportedError as e:
+                logger.warning(f"Router {self._pool.host} does not support listen ({e}); staying on polling")
+                self.available = False
+                break
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(f"Route watcher on {self._pool.host} lost its session: {e}")
+            finally:
+                self._live = False
+                if self._session is not None:
+                    self._session.close()
+                    self._session = None
+            self._stop.wait(settings.WATCH_RECONNECT_DELAY)
+
+    def _stream(self, wire):
+        # The reader blocks until the router has something to say; dead peers
+        # are caught by the TCP keepalive routeros_api enables on the socket.
+        self._session.set_timeout(None)
+        with self._lock:
+            for rows in self._tables.values():
+                rows.clear()
+
+        # Subscribe first and dump afterwards so nothing changed in between is lost
+        commands = {}
+        for name, (path, queries) in self.TABLES.items():
+            commands[wire.send(path.encode(), b'listen', {}, queries)] = (name, 'listen')
+        pending_dumps = set()
+        for name, (path, queries) in self.TABLES.items():
+            tag = wire.send(path.encode(), b'print', {}, queries)
+            commands[tag] = (name, 'print')
+            pending_dumps.add(tag)
+
+        while not self._stop.is_set():
+            sentence = wire.receive_single_response().response
+            name, kind = commands.get(sentence.tag, (None, None))
+            if name is None:
+                continue
+
+            if sentence.type == b'trap':
+                message = sentence.attributes.get(b'message', b'').decode(errors='replace')
+                if kind == 'listen':
+                    raise ListenUnsupportedError(message)
+                raise RuntimeError(f"{name} dump failed: {message}")
+
+            if sentence.type == b'done':
+                if kind == 'listen':
+                    raise ConnectionError(f"router ended the {name} subscription")
+                pending_dumps.discard(sentence.tag)
+                if not pending_dumps:
+                    self._live = True
+                    logger.info(f"Route watcher on {self._pool.host} is live")
+                    self._notify(None, None)
+                continue
+
+            if sentence.type == b're':
+                row = decode_row(sentence.attributes)
+                if self._apply(name, row) and self._live:
+                    self._notify(name, row)
+
+    def _apply(self, name, row):
+        """Aplica uma linha recebida ao espelho; retorna True se algo mudou."""
+        row_id = row.get('id')
+        if row_id is None:
+            return False
+        with self._lock:
+            rows = self._tables[name]
+            # RouterOS marks a removed item with `=.dead=yes` (only the id comes with it)
+            gone = row.get('dead') in ('yes', 'true')
+            # A route whose dst-address changed away from default leaves the mirror
+            if name == 'routes' and row.get('dst-address', '0.0.0.0/0') != '0.0.0.0/0':
+                gone = True
+            if gone:
+                return rows.pop(row_id, None) is not None
+            if rows.get(row_id) == row:
+                return False
+            rows[row_id] = row
+            return True
+
+    def _notify(self, name, row):
+        if self.on_change is None:
+            return
+        try:
+            self.on_change(name, row)
+        except Exception as e:
+            logger.error(f"Route watcher callback failed: {e}")
@@ -0,0 +1,300 @@
+import asyncio
+import binascii
+import hashlib
+import itertools
+import socket
+import ssl
+
+from app.services.logger_service import logger
+
+
+class RouterOsTrapError(Exception):
+    """O roteador respondeu `!trap` ao comando (erro do comando, não da conexão)."""
+
+    def __init__(self, message, category=None):
+        super().__init__(message)
+        self.category = category
+
+
+class RouterOsConnectionLost(ConnectionError):
+    """A sessão com o roteador caiu (ou recebeu `!fatal`)."""
+
+
+# ----------------------------------------------------------------------
+# Wire format: words are length-prefixed, a sentence ends with an empty word
+# ----------------------------------------------------------------------
+def encode_length(length):
+    if length < 0x80:
+        return length.to_bytes(1, 'big')
+    if length < 0x4000:
+        return (length | 0x8000).to_bytes(2, 'big')
+    if length < 0x200000:
+        return (length | 0xC00000).to_bytes(3, 'big')
+    if length < 0x10000000:
+        return (length | 0xE0000000).to_bytes(4, 'big')
+    return b'\xF0' + length.to_bytes(4, 'big')
+
+
+def encode_sentence(words):
+    out = bytearray()
+    for word in words:
+        data = word.encode('utf-8') if isinstance(word, str) else word
+        out += encode_length(len(data))
+        out += data
+    out += b'\x00'
+    return bytes(out)
+
+
+async def read_length(reader):
+    first = (await reader.readexactly(1))[0]
+    if first < 0x80:
+        return first
+    if first < 0xC0:
+        return ((first & 0x3F) << 8) | (await reader.readexactly(1))[0]
+    if first < 0xE0:
+        return ((first & 0x1F) << 16) | int.from_bytes(await reader.readexactly(2), 'big')
+    if first < 0xF0:
+        return ((first & 0x0F) << 24) | int.from_bytes(await reader.readexactly(3), 'big')
+    if first == 0xF0:
+        return int.from_bytes(await reader.readexactly(4), 'big')
+    raise RouterOsConnectionLost(f"Malformed word length prefix 0x{first:02X}")
+
+
+async def read_sentence(reader):
+    words = []
+    while True:
+        length = await read_length(reader)
+        if length == 0:
+            return words
+        words.append((await reader.readexactly(length)).decode('utf-8', errors='replace'))
+
+
+def parse_reply(words):
+    """Separa uma sentença de resposta em (tipo, tag, atributos)."""
+    kind = words[0] if words else ''
+    tag = None
+    attrs = {}
+    for word in words[1:]:
+        if word.startswith('.tag='):
+            tag = word[5:]
+        elif word.startswith('='):
+            key, _, value = word[1:].partition('=')
+            # Same key convention as routeros_api resources ('.id' -> 'id')
+            if key.startswith('.'):
+                key = key[1:]
+            attrs[key] = value
+    return kind, tag, attrs
+
+
+def build_command(command, attrs=None, queries=None, proplist=None, tag=None):
+    words = [command]
+    for key, value in (attrs or {}).items():
+        words.append(f'={key}={value}')
+    if proplist:
+        words.append('=.proplist=' + ','.join(proplist))
+    for key, value in (queries or {}).items():
+        # None means "has the property" (`?comment`)
+        words.append(f'?{key}' if value is None else f'?{key}={value}')
+    if tag is not None:
+        words.append(f'.tag={tag}')
+    return words
+
+
+class _Pending:
+    """Estado de um comando em andamento, indexado pela tag."""
+
+    __slots__ = ('rows', 'done', 'queue')
+
+    def __init__(self, loop, streaming):
+        self.rows = []
+        self.done = loop.create_future()
+        # Streaming commands (listen, ping sem count) hand each !re over as it arrives
+        self.queue = asyncio.Queue() if streaming else None
+
+
+class AsyncRouterOsClient:
+    """Cliente asyncio da API do RouterOS.
+
+    Uma única conexão multiplexa qualquer número de comandos ao mesmo tempo
+    (cada um com sua `.tag`); uma task leitora entrega cada `!re/!done/!trap`
+    ao comando correspondente.
+    """
+
+    def __init__(self, host, user, password, use_ssl=False, port=None, ssl_context=None):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl or ssl_context is not None
+        self.port = port or (8729 if self.use_ssl else 8728)
+        self.ssl_context = ssl_context
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._pending = {}
+        self._tags = itertools.count(1)
+        self._closed = True
+
+    @property
+    def connected(self):
+        return not self._closed
+
+    async def connect(self, timeout=None):
+        """Abre a conexão (TCP ou TLS) e autentica."""
+        context = None
+        if self.use_ssl:
+            context = self.ssl_context or ssl.create_default_context()
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=context,
+                                    server_hostname=self.host if context else None),
+            timeout)
+        sock = self._writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._closed = False
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+        try:
+            await asyncio.wait_for(self._login(), timeout)
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def _login(self):
+        # RouterOS >= 6.43 accepts the password directly; older versions answer
+        # with a challenge (=ret=) for the MD5 login.
+        _, done = await self._talk('/login', {'name': self.user, 'password': self.password})
+        challenge = done.get('ret')
+        if challenge:
+            digest = hashlib.md5(b'\x00' + self.password.encode() + binascii.unhexlify(challenge))
+            await self._talk('/login', {'name': self.user, 'response': '00' + digest.hexdigest()})
+
+    async def close(self):
+        if self._closed and self._writer is None:
+            return
+        self._closed = True
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+            self._writer = None
+        self._fail_pending(RouterOsConnectionLost(f"Connection to {self.host} closed"))
+
+    async def __aenter__(self):
+        if self._closed:
+            await self.connect()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+    async def talk(self, command, attrs=None, queries=None, proplist=None, timeout=None):
+        """Executa um comando e retorna as linhas `!re`.
+
+        Se `timeout` estourar, o comando é cancelado no roteador com `/cancel`
+        e a conexão continua utilizável.
+        """
+        rows, _ = await self._talk(command, attrs, queries, proplist, timeout)
+        return rows
+
+    async def _talk(self, command, attrs=None, queries=None, proplist=None, timeout=None):
+        tag, pending = self._send(command, attrs, queries, proplist, streaming=False)
+        try:
+            done = await asyncio.wait_for(asyncio.shield(pending.done), timeout)
+        except asyncio.TimeoutError:
+            await self._cancel(tag)
+            raise
+        except asyncio.CancelledError:
+            await self._cancel(tag)
+            raise
+        return pending.rows, done
+
+    async def stream(self, command, attrs=None, queries=None, proplist=None):
+        """Gerador assíncrono das linhas de um comando contínuo (`listen`, `ping` sem `count`).
+
+        Ao sair do laço (break/cancelamento) o comando é cancelado no roteador.
+        """
+        tag, pending = self._send(command, attrs, queries, proplist, streaming=True)
+        try:
+            while True:
+                getter = asyncio.ensure_future(pending.queue.get())
+                await asyncio.wait({getter, pending.done}, return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                # Drain what arrived before !done, then surface a !trap as an exception
+                while not pending.queue.empty():
+                    yield pending.queue.get_nowait()
+                pending.done.result()
+                return
+        finally:
+            if not pending.done.done():
+                await self._cancel(tag)
+
+    def _send(self, command, attrs, queries, proplist, streaming):
+        if self._closed:
+            raise RouterOsConnectionLost(f"Not connected to {self.host}")
+        tag = str(next(self._tags))
+        pending = _Pending(asyncio.get_running_loop(), streaming)
+        self._pending[tag] = pending
+        self._writer.write(encode_sentence(build_command(command, attrs, queries, proplist, tag)))
+        return tag, pending
+
+    async def _cancel(self, tag):
+        pending = self._pending.get(tag)
+        if pending is None or self._closed:
+            return
+        # The router answers the cancelled command with !trap(interrupted) + !done;
+        # the reader drops those once the tag is gone.
+        self._pending.pop(tag, None)
+        try:
+            self._writer.write(encode_sentence(build_command('/cancel', {'tag': tag}, tag=f'c{tag}')))
+        except Exception:
+            pass
+
+    async def _read_loop(self):
+        try:
+            while True:
+                kind, tag, attrs = parse_reply(await read_sentence(self._reader))
+                if kind == '!fatal':
+                    raise RouterOsConnectionLost(attrs.get('message', 'fatal error'))
+                pending = self._pending.get(tag)
+                if pending is None:
+                    continue
+                if kind == '!re':
+                    if pending.queue is not None:
+                        pending.queue.put_nowait(attrs)
+                    else:
+                        pending.rows.append(attrs)
+                elif kind == '!trap':
+                    self._pending.pop(tag, None)
+                    if not pending.done.done():
+                        pending.done.set_exception(
+                            RouterOsTrapError(attrs.get('message', 'trap'), attrs.get('category')))
+                elif kind == '!done':
+                    self._pending.pop(tag, None)
+                    if not pending.done.done():
+                        pending.done.set_result(attrs)
+        except asyncio.CancelledError:
+            pass
+        except (asyncio.IncompleteReadError, OSError, RouterOsConnectionLost) as e:
+            if not self._closed:
+                logger.warning(f"API connection to {self.host} lost: {e}")
+            self._closed = True
+            self._fail_pending(RouterOsConnectionLost(f"Connection to {self.host} lost: {e}"))
+
+    def _fail_pending(self, error):
+        pending, self._pending = self._pending, {}
+        for item in pending.values():
+            if not item.done.done():
+                item.done.set_exception(error)
+                # Nobody may be waiting on it (cancelled command); don't warn about it
+                item.done.exception()
@@ -0,0 +1,60 @@
+import math
+import re
+
+# RouterOS duration units, in milliseconds
+_UNITS = {
+    'w': 604800000.0, 'd': 86400000.0, 'h': 3600000.0, 'm': 60000.0,
+    's': 1000.0, 'ms': 1.0, 'us': 0.001, 'ns': 0.000001,
+}
+# What /tool ping actually prints ('10ms247us', '1s5ms'), matched in one go
+_COMMON = re.compile(r'(?:(\d+)s)?(?:(\d+)ms)?(?:(\d+)us)?')
+# Two-letter units first so "ms" isn't read as minutes + seconds
+_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|us|ns|[wdhms])')
+_CLOCK = re.compile(r'(?:(\d+):)?(\d\d):(\d\d(?:\.\d+)?)')
+_COMPACT = re.compile(r'(?:\d+(?:\.\d+)?(?:ms|us|ns|[wdhms]))+')
+
+
+def parse_rtt(value):
+    """Converte uma duração do RouterOS em milissegundos (float), ou None se não for uma.
+
+    Aceita unidades simples ou combinadas ('10ms', '247us', '1s5ms',
+    '10ms247us', '1m2s', '1d2h3m4s', '1.5ms'), relógio ('00:00:00.012',
+    '00:00:01.012345', '00:01.5') e número puro, tratado como ms. Negativos,
+    NaN e infinito não são RTT e viram None.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return _valid(float(value))
+    text = value.strip()
+    if not text:
+        return None
+
+    common = _COMMON.fullmatch(text)
+    if common and common.lastindex:
+        seconds, millis, micros = common.groups()
+        return ((int(seconds) * 1000.0 if seconds else 0.0)
+                + (int(millis) if millis else 0)
+                + (int(micros) / 1000 if micros else 0))
+
+    if _COMPACT.fullmatch(text):
+        # Fractions, minutes and larger units
+        total = 0.0
+        for number, unit in _PART.findall(text):
+            total += float(number) * _UNITS[unit]
+        return total
+
+    clock = _CLOCK.fullmatch(text)
+    if clock:
+        hours, minutes, seconds = clock.groups()
+        return (int(hours or 0) * 3600 + int(minutes) * 60 + float(seconds)) * 1000
+
+    try:
+        return _valid(float(text))
+    except ValueError:
+        return None
+
+
+def _valid(ms):
+    # float() also takes 'nan', 'inf' and '-5', which the UI would then try to round
+    return ms if math.isfinite(ms) and ms >= 0 else None
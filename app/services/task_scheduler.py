@@ -0,0 +1,153 @@
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, Future
+
+from app.services.logger_service import logger
+
+# Lanes: user actions (switch, failover, discovery) and background polls
+USER = 'user'
+BACKGROUND = 'background'
+
+
+class _Task:
+    __slots__ = ('key', 'lane', 'fn', 'future', 'stale')
+
+    def __init__(self, key, lane, fn):
+        self.key = key
+        self.lane = lane
+        self.fn = fn
+        self.future = Future()
+        self.stale = False
+
+
+class TaskScheduler:
+    """Executor único para todo o trabalho com o roteador.
+
+    - Uma thread fixa por faixa (`user` e `background`), em vez de uma thread
+      nova por clique ou atualização.
+    - Single-flight: pedir uma tarefa com a mesma chave enquanto ela ainda está
+      na fila ou rodando devolve o mesmo Future (e não gera outra ida ao roteador).
+    - Ações do usuário têm prioridade: ao chegar uma, os polls de fundo na fila
+      são cancelados, o que estiver rodando tem o resultado descartado (ficou
+      velho) e a faixa de fundo só volta a andar quando a do usuário esvaziar.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queues = {USER: deque(), BACKGROUND: deque()}
+        self._running = {USER: None, BACKGROUND: None}
+        self._inflight = {}  # key -> _Task
+        self._stopped = False
+        self.stats = {'submitted': 0, 'coalesced': 0, 'cancelled': 0, 'completed': 0}
+        self._threads = [
+            threading.Thread(target=self._worker, args=(lane,), name=f'router-{lane}', daemon=True)
+            for lane in self._queues
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key, fn, lane=BACKGROUND, callback=None):
+        """Agenda `fn()` e retorna seu Future.
+
+        `callback(future)` roda uma única vez quando a tarefa termina (ou é
+        cancelada); pedidos repetidos da mesma chave não o registram de novo.
+        """
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("scheduler is shut down")
+            task = self._inflight.get(key)
+            if task is not None:
+                self.stats['coalesced'] += 1
+                return task.future
+            task = _Task(key, lane, fn)
+            if callback is not None:
+                task.future.add_done_callback(callback)
+            self._inflight[key] = task
+            self._queues[lane].append(task)
+            self.stats['submitted'] += 1
+            cancelled = []
+            if lane == USER:
+                # Whatever the background lane is fetching is about to be outdated
+                cancelled = self._cancel_locked(BACKGROUND)
+            self._cond.notify_all()
+        self._cancel_futures(cancelled)
+        return task.future
+
+    def cancel(self, lane=BACKGROUND):
+        """Cancela o que estiver na fila da faixa e descarta o resultado da tarefa em execução."""
+        with self._cond:
+            cancelled = self._cancel_locked(lane)
+            self._cond.notify_all()
+        self._cancel_futures(cancelled)
+
+    def shutdown(self):
+        cancelled = []
+        with self._cond:
+            self._stopped = True
+            for lane in self._queues:
+                cancelled += self._cancel_locked(lane)
+            self._cond.notify_all()
+        self._cancel_futures(cancelled)
+
+    def _cancel_locked(self, lane):
+        """Tira da fila o que estava esperando; retorna os Futures para cancelar fora do lock."""
+        queued = list(self._queues[lane])
+        self._queues[lane].clear()
+        running = self._running[lane]
+        if running is not None and not running.stale:
+            running.stale = True
+            # A new request for this key must not be coalesced onto a stale result
+            if self._inflight.get(running.key) is running:
+                del self._inflight[running.key]
+            self.stats['cancelled'] += 1
+        for task in queued:
+            if self._inflight.get(task.key) is task:
+                del self._inflight[task.key]
+            self.stats['cancelled'] += 1
+        return [task.future for task in queued]
+
+    @staticmethod
+    def _cancel_futures(futures):
+        # Futures run their callbacks synchronously: only with the lock released,
+        # so an on_cancel that submits again can't deadlock or see a half-updated queue
+        for future in futures:
+            future.cancel()
+
+    def _blocked(self, lane):
+        if not self._queues[lane]:
+            return True
+        # Background work waits while the user lane has anything to do
+        return lane == BACKGROUND and (self._queues[USER] or self._running[USER] is not None)
+
+    def _worker(self, lane):
+        while True:
+            with self._cond:
+                while not self._stopped and self._blocked(lane):
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                task = self._queues[lane].popleft()
+                self._running[lane] = task
+                task.future.set_running_or_notify_cancel()
+
+            result, error = None, None
+            try:
+                result = task.fn()
+            except BaseException as e:
+                error = e
+
+            with self._cond:
+                self._running[lane] = None
+                if self._inflight.get(task.key) is task:
+                    del self._inflight[task.key]
+                self.stats['completed'] += 1
+                self._cond.notify_all()
+
+            if task.stale:
+                task.future.set_exception(CancelledError())
+            elif error is not None:
+                if not isinstance(error, Exception):
+                    logger.error(f"Router task {task.key} aborted: {error!r}")
+                task.future.set_exception(error)
+            else:
+                task.future.set_result(result)
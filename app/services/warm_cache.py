@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+import time
+
+from app.config import settings
+from app.services.logger_service import logger
+
+_VERSION = 1
+
+
+class WarmStartCache:
+    """Última descoberta, resolução de pings e status de cada roteador, em disco.
+
+    Uma entrada por host com o `warm_state()` do MikrotikService (impressão
+    digital das rotas, links e pings resolvidos), o último StatusSnapshot em
+    dict e o IP público. Um arquivo ilegível ou de outra versão é ignorado.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.WARM_CACHE_FILE
+        self._lock = threading.Lock()
+
+    def load(self, host):
+        """Entrada salva para `host` ({'state', 'status', 'public_ip', 'saved_at'}) ou None."""
+        data = self._read()
+        entry = data.get('hosts', {}).get(host)
+        if not entry or not entry.get('state'):
+            return None
+        return entry
+
+    def save(self, host, state, status=None, public_ip=None):
+        if state is None:
+            return
+        with self._lock:
+            data = self._read()
+            data.setdefault('hosts', {})[host] = {
+                'state': state,
+                'status': status.as_dict() if status is not None else None,
+                'public_ip': public_ip,
+                'saved_at': time.time(),
+            }
+            try:
+                # Written aside and swapped in, so a crash mid-write can't leave half a file
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Could not save warm start cache: {e}")
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {'version': _VERSION}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable warm start cache: {e}")
+            return {'version': _VERSION}
+        if data.get('version') != _VERSION:
+            return {'version': _VERSION}
+        return data
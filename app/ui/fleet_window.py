@@ -0,0 +1,194 @@
+import customtkinter as ctk
+import time
+from app.config import settings
+from app.models.fleet import RouterHealth
+from app.models.status import LinkState
+from app.services.logger_service import logger
+from app.ui.view_diff import ViewDiff
+
+HEALTH_COLORS = {
+    RouterHealth.OK: settings.COLORS["success"],
+    RouterHealth.DEGRADED: settings.COLORS["warning"],
+    RouterHealth.DOWN: settings.COLORS["danger"],
+    RouterHealth.BACKOFF: settings.COLORS["danger"],
+    RouterHealth.PENDING: settings.COLORS["text_dim"],
+}
+HEALTH_TEXT = {
+    RouterHealth.OK: "ok",
+    RouterHealth.DEGRADED: "degradados",
+    RouterHealth.DOWN: "fora",
+    RouterHealth.BACKOFF: "em espera",
+    RouterHealth.PENDING: "aguardando",
+}
+
+
+def ping_text(link, stale=False):
+    """Texto e cor do ping de um link, com as mesmas faixas do painel de um roteador."""
+    if link.state is LinkState.UP:
+        ms_val = round(link.rtt_ms, 1)
+        text = f"{int(ms_val)} ms" if ms_val == int(ms_val) else f"{ms_val:.1f} ms"
+        if stale: return text, settings.COLORS["text_dim"]
+        if ms_val > 200: return text, settings.COLORS["danger"]
+        if ms_val > 100: return text, settings.COLORS["warning"]
+        return text, settings.COLORS["success"]
+    if link.state in (LinkState.TIMEOUT, LinkState.ERROR) or not link.reachable:
+        return "-", settings.COLORS["danger"]
+    if link.state is LinkState.CHECKING:
+        return "⏳", settings.COLORS["text_dim"]
+    return "-", settings.COLORS["text_dim"]
+
+
+class FleetWindow(ctk.CTk):
+    """Uma linha por roteador da frota; cada linha abre o detalhe por link."""
+
+    def __init__(self, monitor):
+        super().__init__()
+        self.monitor = monitor
+        self._view = ViewDiff()
+        self.rows = {}     # router name -> {widget name: widget}
+        self.details = {}  # router name -> (frame, {comment: (label, ping label)}) of expanded rows
+        self.snapshot = monitor.snapshot
+
+        self.title("MikroTik Fleet")
+        self.geometry("720x640")
+        self.configure(fg_color=settings.COLORS["bg"])
+
+        self._setup_ui()
+        for index, router in enumerate(self.snapshot.routers):
+            self._create_row(index, router.name)
+        self._render(self.snapshot)
+
+        # One thread and one event loop for the whole fleet; results come back through after()
+        self.monitor.start(lambda snapshot: self.after(0, lambda: self._render(snapshot)))
+        self.protocol("WM_DELETE_WINDOW", self._quit)
+
+    def _setup_ui(self):
+        self.header_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.header_frame.pack(pady=(20, 10), padx=20, fill="x")
+
+        self.title_label = ctk.CTkLabel(self.header_frame, text="FROTA",
+                                        font=("Segoe UI", 20, "bold"), text_color=settings.COLORS["text"])
+        self.title_label.pack(side="left")
+
+        self.refresh_btn = ctk.CTkButton(self.header_frame, text="↻", width=30, height=30,
+                                         fg_color="transparent", hover_color=settings.COLORS["card"],
+                                         text_color=settings.COLORS["text_dim"], font=("Segoe UI", 18),
+                                         command=self.monitor.refresh)
+        self.refresh_btn.pack(side="left", padx=(10, 0))
+
+        self.counts_label = ctk.CTkLabel(self.header_frame, text="", font=("Segoe UI", 12),
+                                         text_color=settings.COLORS["text_dim"])
+        self.counts_label.pack(side="right")
+
+        self.list_frame = ctk.CTkScrollableFrame(self, fg_color=settings.COLORS["card"], corner_radius=15)
+        self.list_frame.pack(pady=5, padx=20, fill="both", expand=True)
+        self.list_frame.grid_columnconfigure(2, weight=1)
+
+        self.last_update_label = ctk.CTkLabel(self, text="Consultando roteadores...", font=("Segoe UI", 10),
+                                              text_color=settings.COLORS["text_dim"])
+        self.last_update_label.pack(pady=(5, 10))
+
+    def _create_row(self, index, name):
+        # Two grid rows per router: the summary and, when expanded, its links
+        row = index * 2
+        widgets = {
+            'toggle': ctk.CTkButton(self.list_frame, text="▸", width=24, height=24, fg_color="transparent",
+                                    hover_color=settings.COLORS["accent"], text_color=settings.COLORS["text_dim"],
+                                    command=lambda: self._toggle_detail(name, row + 1)),
+            'dot': ctk.CTkLabel(self.list_frame, text="●", font=("Segoe UI", 14)),
+            'name': ctk.CTkLabel(self.list_frame, text=name, font=("Segoe UI", 12, "bold"),
+                                 text_color=settings.COLORS["text"], anchor="w"),
+            'active': ctk.CTkLabel(self.list_frame, text="", font=("Segoe UI", 12), anchor="w"),
+            'mode': ctk.CTkLabel(self.list_frame, text="", font=("Segoe UI", 11),
+                                 text_color=settings.COLORS["text_dim"]),
+            'info': ctk.CTkLabel(self.list_frame, text="", font=("Segoe UI", 10),
+                                 text_color=settings.COLORS["text_dim"]),
+        }
+        for column, key in enumerate(('toggle', 'dot', 'name', 'active', 'mode', 'info')):
+            widgets[key].grid(row=row, column=column, padx=(10 if column == 0 else 5, 5), pady=2, sticky="w")
+        self.rows[name] = widgets
+
+    def _toggle_detail(self, name, grid_row):
+        if name in self.details:
+            frame, labels = self.details.pop(name)
+            # The next expand builds new labels, so drop what was recorded for these
+            self._view.forget((name, 'links'), *(label for pair in labels.values() for label in pair))
+            frame.destroy()
+            self._view.configure(self.rows[name]['toggle'], text="▸")
+            return
+        frame = ctk.CTkFrame(self.list_frame, fg_color=settings.COLORS["bg"], corner_radius=8)
+        frame.grid(row=grid_row, column=2, columnspan=4, padx=5, pady=(0, 6), sticky="ew")
+        self.details[name] = (frame, {})
+        self._view.configure(self.rows[name]['toggle'], text="▾")
+        self._render_detail(self.snapshot.router(name))
+
+    def _render(self, snapshot):
+        try:
+            self.snapshot = snapshot
+            view = self._view
+            counts = snapshot.counts()
+            view.configure(self.counts_label,
+                           text="  ·  ".join(f"{counts[health]} {HEALTH_TEXT[health]}"
+                                             for health in RouterHealth if counts[health]))
+
+            for router in snapshot.routers:
+                widgets = self.rows[router.name]
+                status = router.status
+                view.configure(widgets['dot'], text_color=HEALTH_COLORS[router.health])
+                if status is None:
+                    view.configure(widgets['active'], text="-", text_color=settings.COLORS["text_dim"])
+                    view.configure(widgets['mode'], text="")
+                else:
+                    view.configure(widgets['active'], text=status.active_label,
+                                   text_color=settings.COLORS["danger"] if status.active_down
+                                   else settings.COLORS["text_dim"] if status.stale
+                                   else settings.COLORS["text"])
+                    view.configure(widgets['mode'], text=status.mode.value)
+                if router.error is not None:
+                    info = "aguardando nova tentativa" if router.health is RouterHealth.BACKOFF else router.error[:40]
+                else:
+                    info = f"{router.cycle_ms:.0f} ms" if router.cycle_ms is not None else ""
+                view.configure(widgets['info'], text=info)
+
+                if router.name in self.details:
+                    self._render_detail(router)
+
+            if snapshot.cycle_ms:
+                view.configure(self.last_update_label,
+                               text=f"Última atualização: {time.strftime('%H:%M:%S', time.localtime(snapshot.taken_at))}"
+                                    f"  ·  ciclo de {snapshot.cycle_ms / 1000:.1f} s")
+        except Exception as e:
+            logger.error(f"Error in FleetWindow._render: {e}")
+
+    def _render_detail(self, router):
+        frame, labels = self.details[router.name]
+        status = router.status
+        links = status.links if status is not None else ()
+        view = self._view
+        if view.changed((router.name, 'links'), tuple(link.comment for link in links)):
+            # Different set of links (first render or routes changed): rebuild this detail
+            for widget in frame.winfo_children():
+                widget.destroy()
+            view.forget(*(label for pair in labels.values() for label in pair))
+            labels.clear()
+            for row, link in enumerate(links):
+                name_label = ctk.CTkLabel(frame, text=link.label, font=("Segoe UI", 11), anchor="w")
+                name_label.grid(row=row, column=0, padx=(10, 20), pady=1, sticky="w")
+                ping_label = ctk.CTkLabel(frame, text="", font=("Segoe UI", 11))
+                ping_label.grid(row=row, column=1, padx=10, pady=1, sticky="e")
+                labels[link.comment] = (name_label, ping_label)
+            if not links:
+                ctk.CTkLabel(frame, text="Sem dados deste roteador ainda.", font=("Segoe UI", 11, "italic"),
+                             text_color=settings.COLORS["text_dim"]).grid(row=0, column=0, padx=10, pady=4)
+
+        for link in links:
+            name_label, ping_label = labels[link.comment]
+            text, color = ping_text(link, status.stale)
+            view.configure(ping_label, text=text, text_color=color)
+            view.configure(name_label,
+                           text=f"{link.label} (ativo)" if link.active else link.label,
+                           text_color=settings.COLORS["text"] if link.active else settings.COLORS["text_dim"])
+
+    def _quit(self):
+        self.monitor.stop()
+        self.destroy()
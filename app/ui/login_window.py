@@ -1,4 +1,6 @@
 import customtkinter as ctk
+import threading
+from concurrent.futures import Future
 from app.config import settings
 from app.utils.config_manager import ConfigManager
 
@@ -7,6 +9,8 @@ class LoginWindow(ctk.CTk):
         super().__init__()
         self.on_login_success = on_login_success
         self.config_manager = ConfigManager()
+        self._attempt = None  # (credentials, Future of (service, links)) being connected
+        self._closed = False  # set before destroy(); worker callbacks check it
         
         self.title("MikroTik Login")
         self.geometry("400x500")
@@ -15,6 +19,10 @@ class LoginWindow(ctk.CTk):
         
         self._setup_ui()
         self._load_saved_data()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Remembered credentials: authenticate and discover while the user is still looking at the form
+        if self._credentials() is not None and self.pass_entry.get():
+            self.after_idle(lambda: self._connect(self._credentials()))
         
     def _setup_ui(self):
         # Header
@@ -99,16 +107,107 @@ class LoginWindow(ctk.CTk):
                 if saved_pass:
                     self.pass_entry.insert(0, saved_pass)
 
-    def _attempt_login(self):
+    def _credentials(self):
         host = self.host_entry.get().strip()
         user = self.user_entry.get().strip()
-        password = self.pass_entry.get().strip()
-        
         if not host or not user:
+            return None
+        return host, user, self.pass_entry.get().strip(), self.use_ssl_var.get()
+
+    def _connect(self, credentials):
+        """Conecta, autentica e descobre os links em segundo plano; reaproveita a tentativa igual."""
+        if self._attempt is not None:
+            previous_credentials, previous = self._attempt
+            # A prefetch that already failed is no answer to this click: try again
+            failed = previous.done() and previous.exception() is not None
+            if previous_credentials == credentials and not failed:
+                return previous
+            self._discard_attempt()
+
+        future = Future()
+
+        def work():
+            # routeros_api is imported here, off the UI thread
+            from app.services.mikrotik_service import MikrotikService
+            from app.services.warm_cache import WarmStartCache
+            host, user, password, use_ssl = credentials
+            service = MikrotikService(host, user, password, use_ssl)
+            try:
+                cached = WarmStartCache().load(host)
+                links = service.discover_links(cached['state'] if cached else None)
+            except Exception as e:
+                service.close()
+                future.set_exception(e)
+            else:
+                future.set_result((service, links))
+
+        threading.Thread(target=work, name='login-connect', daemon=True).start()
+        self._attempt = (credentials, future)
+        return future
+
+    def _discard_attempt(self):
+        # The session was opened with other credentials; close it once it is up
+        _, future = self._attempt
+        self._attempt = None
+        future.add_done_callback(lambda f: f.exception() is None and f.result()[0].close())
+
+    def _attempt_login(self):
+        credentials = self._credentials()
+        if credentials is None:
             self.error_label.configure(text="Preencha Host e Usuário")
             return
-            
-        # Save preferences
+
+        self.error_label.configure(text="")
+        self.login_btn.configure(state="disabled", text="CONECTANDO...")
+        future = self._connect(credentials)
+        future.add_done_callback(lambda f: self._when_connected(credentials, f))
+
+    def _when_connected(self, credentials, future):
+        # Worker thread: by now the window may have been closed or already logged in
+        if self._closed:
+            return
+        try:
+            self.after(0, lambda: self._on_connected(credentials, future))
+        except Exception:
+            # Destroyed between the check and the call
+            pass
+
+    def _on_connected(self, credentials, future):
+        if self._attempt is None or self._attempt[1] is not future:
+            return
+        try:
+            service, links = future.result()
+        except Exception as e:
+            # A failed attempt is not reused: the next click tries again
+            self._attempt = None
+            self.login_btn.configure(state="normal", text="CONECTAR")
+            self.error_label.configure(text=self._error_text(credentials[0], e))
+            return
+        self._attempt = None
+        self._save_preferences(*credentials[:3])
+
+        # Proceed: the authenticated session and the discovered links go to the dashboard
+        self.on_login_success(*credentials, service=service, links=links)
+        self._closed = True
+        self.destroy()
+
+    @staticmethod
+    def _error_text(host, e):
+        if 'invalid user name or password' in str(e):
+            return "Usuário ou senha inválidos"
+        # Already loaded by the attempt that failed
+        from app.services.connection_pool import CONNECTION_ERRORS
+        if isinstance(e, CONNECTION_ERRORS):
+            return f"Sem resposta de {host}"
+        return "Erro ao conectar no MikroTik"
+
+    def _on_close(self):
+        self._closed = True
+        if self._attempt is not None:
+            self._discard_attempt()
+        self.destroy()
+
+    def _save_preferences(self, host, user, password):
         remember_creds = self.remember_creds_var.get()
         remember_pass = self.remember_pass_var.get()
         
@@ -127,7 +226,3 @@ class LoginWindow(ctk.CTk):
             self.config_manager.save_password(host, user, password)
         else:
             self.config_manager.delete_password(host, user)
-            
-        # Proceed
-        self.on_login_success(host, user, password, self.use_ssl_var.get())
-        self.destroy()
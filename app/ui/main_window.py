@@ -1,9 +1,16 @@
 import customtkinter as ctk
+import math
 import threading
+from concurrent.futures import CancelledError
+from functools import cached_property
 from app.config import settings
+from app.models.status import LinkState, Mode, StatusSnapshot
 from app.services.mikrotik_service import MikrotikService
 from app.services.network_service import NetworkService
+from app.services.refresh_policy import RefreshPolicy
 from app.services.startup_service import StartupService
+from app.services.task_scheduler import BACKGROUND, USER, TaskScheduler
+from app.services.warm_cache import WarmStartCache
 import pystray
 from pystray import MenuItem as item
 import os
@@ -13,47 +20,85 @@ from PIL import Image, ImageDraw, ImageTk
 from tkinter import messagebox
 from app.services.path_service import get_resource_path
 from app.services.logger_service import logger
+from app.ui.view_diff import ViewDiff
 
 class MainWindow(ctk.CTk):
-    def __init__(self, host, user, password, use_ssl=False):
+    def __init__(self, host, user, password, use_ssl=False, service=None, links=None):
         super().__init__()
-        self.mikrotik = MikrotikService(host, user, password, use_ssl)
-        self.network = NetworkService()
+        # The login screen hands over its live session; only a bare start opens a new one
+        self.mikrotik = service or MikrotikService(host, user, password, use_ssl)
+        # Falls back to the router's /ip/cloud address when no HTTP provider answers
+        self.network = NetworkService(router_source=self.mikrotik.get_cloud_address)
         self.startup_service = StartupService()
+        # Every router round trip goes through here: two fixed workers, user actions first
+        self.scheduler = TaskScheduler()
         
         self.title("MikroTik Link Dashboard")
         self.resizable(False, False)
         self.configure(fg_color=settings.COLORS["bg"])
 
-        # Icon configuration
+        # Icons are decoded on first use (icon_image / warning_image), not before the first paint
         self.icon_path = get_resource_path(os.path.join("app", "assets", "icon.png"))
-        if os.path.exists(self.icon_path):
-            try:
-                self.icon_image = Image.open(self.icon_path)
-                self.tk_icon = ImageTk.PhotoImage(self.icon_image.resize((32, 32)))
-                self.after(200, lambda: self.iconphoto(False, self.tk_icon))
-            except Exception as e:
-                logger.error(f"Could not set window icon: {e}")
-                self.icon_image = None
-        else:
-            self.icon_image = None
+        self.warning_path = get_resource_path(os.path.join("app", "assets", "warning.png"))
+        self.after(200, self._set_window_icon)
 
         self.links = []
         self.link_buttons = {} # Dict for easy access: comment -> button
         self.ping_labels = {}  # Dict for ping labels: comment -> label
-        self._status_updating = False # Lock for status loop
+        self._refresh_job = None       # the single pending polling timer
+        self.refresh_policy = RefreshPolicy()
+        self.status = None             # last StatusSnapshot; replaced whole, never mutated
+        self._view = ViewDiff()        # what is on screen now; only differences reach Tk
+        self._push_job = None
+        self._last_active_link = None  # public IP cache is dropped when this changes
         self.btn_auto = None
+        self.tray_icon = None
         self.last_update_time = "--:--:--"
-        
-        # Load Warning Icon
-        self.warning_path = get_resource_path(os.path.join("app", "assets", "warning.png"))
-        if os.path.exists(self.warning_path):
-            self.warning_image = ctk.CTkImage(light_image=Image.open(self.warning_path), size=(20, 20))
+        self._displayed = None         # snapshot on screen (live or from the warm cache)
+        self.warm_cache = WarmStartCache()
+        self._cache_saved_at = time.monotonic()
+        cached = self.warm_cache.load(host)
+
+        # The first round trip to the router runs while the widgets are being built;
+        # with a cache it only checks that the link routes are still the same
+        discovery = None
+        if links is None:
+            cached_state = cached['state'] if cached else None
+            discovery = self.scheduler.submit('discover', lambda: self.mikrotik.discover_links(cached_state), USER)
+        self._setup_ui()
+        if cached:
+            self._show_cached(cached)
+        if discovery is not None:
+            discovery.add_done_callback(self._ui_callback(self._on_discovery, self._on_discovery_error))
         else:
-            self.warning_image = None
+            # Discovered during login: straight to the first status
+            self._on_discovery(links)
 
-        self._setup_ui()
-        self.discover_links()
+    @cached_property
+    def icon_image(self):
+        if not os.path.exists(self.icon_path):
+            return None
+        try:
+            return Image.open(self.icon_path)
+        except Exception as e:
+            logger.error(f"Could not load window icon: {e}")
+            return None
+
+    @cached_property
+    def warning_image(self):
+        # Most sessions never show a warning
+        if not os.path.exists(self.warning_path):
+            return None
+        return ctk.CTkImage(light_image=Image.open(self.warning_path), size=(20, 20))
+
+    def _set_window_icon(self):
+        if self.icon_image is None:
+            return
+        try:
+            self.tk_icon = ImageTk.PhotoImage(self.icon_image.resize((32, 32)))
+            self.iconphoto(False, self.tk_icon)
+        except Exception as e:
+            logger.error(f"Could not set window icon: {e}")
 
     def _setup_ui(self):
         # Header section
@@ -177,24 +222,91 @@ class MainWindow(ctk.CTk):
                                              font=("Segoe UI", 10), text_color=settings.COLORS["text_dim"])
         self.last_update_label.pack(pady=(15, 5), side="bottom")
 
-        # Move tray setup and protocol to the end of init or here
-        self._create_tray_icon()
+        # The tray icon (and its thread) can wait until the window is on screen
+        self.after_idle(self._create_tray_icon)
         self.protocol("WM_DELETE_WINDOW", self.hide_window)
 
+    def _submit(self, key, fn, lane=BACKGROUND, on_result=None, on_error=None, on_cancel=None):
+        """Agenda trabalho com o roteador; o desfecho é entregue na thread da UI.
+
+        Pedidos repetidos com a mesma `key` enquanto o primeiro não terminou
+        são agrupados nele, e os callbacks rodam uma vez só.
+        """
+        return self.scheduler.submit(key, fn, lane, callback=self._ui_callback(on_result, on_error, on_cancel))
+
+    def _ui_callback(self, on_result=None, on_error=None, on_cancel=None):
+        """Callback de Future que entrega o desfecho na thread da UI."""
+        def done(future):
+            self.after(0, lambda: self._deliver(future, on_result, on_error, on_cancel))
+        return done
+
+    @staticmethod
+    def _deliver(future, on_result, on_error, on_cancel):
+        try:
+            result = future.result()
+        except CancelledError:
+            if on_cancel:
+                on_cancel()
+            return
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            return
+        if on_result:
+            on_result(result)
+
     def discover_links(self):
-        threading.Thread(target=self._do_discovery, daemon=True).start()
+        # Refresh button and tray spam collapse into the discovery already in flight
+        self._submit('discover', self.mikrotik.discover_links, USER,
+                     on_result=self._on_discovery, on_error=self._on_discovery_error)
 
-    def _do_discovery(self):
+    def _show_cached(self, cached):
+        """Desenha o último estado salvo deste roteador, marcado como desatualizado."""
         try:
-            self.links = self.mikrotik.discover_links()
-            self.after(0, self._create_dynamic_ui)
+            self.links = cached['state']['links']
+            self._create_dynamic_ui()
+            if cached.get('status'):
+                status = StatusSnapshot.from_dict(cached['status'])
+                self.last_update_time = time.strftime("%H:%M:%S", time.localtime(cached['saved_at']))
+                self._update_ui_status(status, cached.get('public_ip') or "0.0.0.0", scheduled=False)
         except Exception as e:
-            logger.error(f"UI Discovery Error: {e}")
-            self.after(0, lambda: self.discovery_label.configure(text="Erro ao conectar no MikroTik", text_color="red"))
+            logger.warning(f"Could not show the warm start cache: {e}")
+
+    def _on_discovery(self, links):
+        # A warm start already drew these links; the widgets stay, only the data goes live
+        if links != self.links or not self.link_buttons:
+            self.links = links
+            self._create_dynamic_ui()
+        self._save_warm_cache(force=True)
+        if not self.links:
+            return
+        # Route/failover changes are pushed by the router; polling stays as fallback
+        self.mikrotik.start_watching(self._on_router_change)
+        self.update_status()
+
+    def _on_discovery_error(self, e):
+        logger.error(f"UI Discovery Error: {e}")
+        if self.link_buttons:
+            # Warm start: the cached dashboard stays up, flagged as unreachable
+            self._view.configure(self.last_update_label, text="Erro ao conectar no MikroTik (dados salvos)",
+                                 text_color=settings.COLORS["danger"])
+        else:
+            self.discovery_label.configure(text="Erro ao conectar no MikroTik", text_color="red")
+
+    def _save_warm_cache(self, force=False):
+        if not force and time.monotonic() - self._cache_saved_at < settings.WARM_CACHE_SAVE_INTERVAL:
+            return
+        self._cache_saved_at = time.monotonic()
+        # Until the first live status, what is on screen is the previous cache entry
+        status = self._displayed
+        self.warm_cache.save(self.mikrotik.host, self.mikrotik.warm_state(), status,
+                             self.ip_label.cget("text") if status is not None else None)
 
     def _create_dynamic_ui(self):
         for widget in self.btn_frame.winfo_children():
             widget.destroy()
+        # New widgets, new layout: everything is applied again once
+        self._view.forget()
         
         if not self.links:
             self.discovery_label = ctk.CTkLabel(self.btn_frame, text="Nenhum link com 'Link' no comentário encontrado.", font=("Segoe UI", 12))
@@ -225,7 +337,6 @@ class MainWindow(ctk.CTk):
             self.link_buttons[link['comment']] = btn
             self.ping_labels[link['comment']] = ping_lbl
         
-        self.update_status()
         self.after(200, self._adjust_window_size)
 
     def _adjust_window_size(self):
@@ -237,8 +348,12 @@ class MainWindow(ctk.CTk):
     def set_loading(self, is_loading):
         if is_loading:
             for btn in self.link_buttons.values():
-                btn.configure(state="disabled")
-            if self.btn_auto: self.btn_auto.configure(state="disabled")
+                self._view.configure(btn, state="disabled")
+            if self.btn_auto: self._view.configure(self.btn_auto, state="disabled")
+        # Every poll ends with set_loading(False); only a real toggle touches the layout
+        if not self._view.changed('loading', is_loading):
+            return
+        if is_loading:
             self.loading_container.pack(pady=(15, 10), padx=35, fill="x")
             self.loading_bar.start()
         else:
@@ -252,11 +367,12 @@ class MainWindow(ctk.CTk):
         self.set_loading(True)
         # Visual feedback on the button itself
         if target_comment in self.link_buttons:
-            self.link_buttons[target_comment].configure(text="Conectando...")
-        threading.Thread(target=self._do_switch_link, args=(target_comment,), daemon=True).start()
+            self._view.configure(self.link_buttons[target_comment], text="Conectando...")
+        self._submit(('switch', target_comment), lambda: self._do_switch_link(target_comment), USER)
 
     def _do_switch_link(self, target_comment):
         try:
+            started = time.monotonic()
             # Tenta o switch inicial
             try:
                 self.mikrotik.switch_link(target_comment, self.links)
@@ -264,20 +380,16 @@ class MainWindow(ctk.CTk):
                 logger.error(f"Erro inicial ao trocar link: {e}")
                 raise e
 
-            # Verificar conectividade
-            start_time = time.time()
-            online = False
-            
-            # Tenta verificar o IP por X segundos
-            while time.time() - start_time < settings.LINK_VERIFICATION_TIMEOUT:
-                time.sleep(1) # Reduzido de 2s para 1s para ser mais responsivo
-                try:
-                    ip = self.network.get_public_ip()
-                    if ip and "Erro" not in ip:
-                        online = True
-                        break
-                except Exception:
-                    continue 
+            # Confirmação pelo próprio roteador: rota ativa + ping passando pelo link
+            result = self.mikrotik.confirm_switch(target_comment, self.links)
+            online = result['confirmed']
+            if online is None:
+                # Roteador inconclusivo: volta para a checagem pelo IP público
+                online = self._verify_public_ip(started)
+                result['stage'] = 'http'
+            elapsed_ms = (time.monotonic() - started) * 1000
+            logger.info(f"Switch to {target_comment}: confirmed={online} via {result['stage']} "
+                        f"in {elapsed_ms:.0f} ms")
             
             if not online:
                 logger.warning(f"Link {target_comment} offline após switch. Ativando failover de emergência.")
@@ -295,61 +407,127 @@ class MainWindow(ctk.CTk):
                     f"O link selecionado não tem conectividade.\nFailover Automático foi reativado por segurança."
                 ))
             
-            self.after(0, self.update_status)
+            # Poll right away instead of waiting out the current interval
+            self.after(0, lambda: self._refresh_soon(0))
         except Exception as e:
             logger.error(f"UI Switch Link Error: {e}")
         finally:
             # Garante que SEMPRE sai do estado de loading
             self.after(0, lambda: self.set_loading(False))
 
+    def _verify_public_ip(self, started):
+        """Checagem antiga: espera o IP público responder até LINK_VERIFICATION_TIMEOUT."""
+        while time.monotonic() - started < settings.LINK_VERIFICATION_TIMEOUT:
+            time.sleep(1)
+            try:
+                ip = self.network.get_public_ip(fresh=True)
+                if ip and "Erro" not in ip:
+                    return True
+            except Exception:
+                continue
+        return False
+
     def enable_all_links(self):
         self.set_loading(True)
-        threading.Thread(target=self._do_enable_all, daemon=True).start()
+        self._submit('enable_all', self._do_enable_all, USER)
 
     def _do_enable_all(self):
         try:
             self.mikrotik.enable_all_links(self.links)
-            self.after(settings.SWITCH_WAIT_TIME, self.update_status)
+            self.after(0, lambda: self._refresh_soon(settings.SWITCH_WAIT_TIME))
         except Exception as e:
             logger.error(f"UI Enable All Error: {e}")
             self.after(0, lambda: self.set_loading(False))
 
     def update_status(self):
-        if self._status_updating:
-            return
-        self._status_updating = True
-        threading.Thread(target=self._fetch_status, daemon=True).start()
+        # A poll already queued or running answers this request too
+        self._submit('status', self._fetch_status,
+                     on_result=lambda result: self._update_ui_status(*result),
+                     on_error=self._on_status_error,
+                     on_cancel=self._schedule_refresh)
+
+    def _on_status_error(self, e):
+        # Whatever broke this poll, the loop must keep going
+        logger.error(f"UI Status Poll Error: {e}")
+        self._schedule_refresh()
+
+    def _schedule_refresh(self, delay=None):
+        """(Re)arma o único timer de polling; sem `delay`, a RefreshPolicy decide."""
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+        self._refresh_job = self.after(delay if delay is not None else self.refresh_policy.next_interval(),
+                                       self._on_refresh_timer)
+
+    def _refresh_soon(self, delay):
+        """Algo mudou (troca de link, rota): atualiza logo e amostra rápido por alguns ciclos."""
+        self.refresh_policy.boost()
+        self._schedule_refresh(delay)
+
+    def _on_refresh_timer(self):
+        self._refresh_job = None
+        self.update_status()
 
     def _fetch_status(self):
-        current_ip = self.network.get_public_ip()
-        
         # Show intermediate "checking" state first for better UX
-        # This prevents links from showing as offline while pings are in progress
-        checking_pings = {link['comment']: 'checking' for link in self.links}
-        self.after(0, lambda: self._update_ping_status(checking_pings))
+        # This prevents links from showing as offline while pings are in progress.
+        # Links already measured keep their value: most cycles don't ping them again.
+        previous = self._displayed
+        measured = {link.comment for link in previous.links
+                    if link.state is not LinkState.UNKNOWN} if previous else set()
+        unmeasured = [link['comment'] for link in self.links if link['comment'] not in measured]
+        if unmeasured:
+            self.after(0, lambda: self._show_checking(unmeasured))
         
         try:
-            active_link, mode, unreachable_links, pings = self.mikrotik.get_status(self.links)
+            status = self.mikrotik.get_status(self.links)
+            # The mirror may have moved on while the pings were running
+            status = self.mikrotik.get_route_state(self.links, status) or status
         except Exception as e:
             logger.error(f"UI Fetch Status Error: {e}")
-            active_link = "Erro de Conexão"
-            mode = "Erro"
-            unreachable_links = []
-            pings = {}
+            status = StatusSnapshot.failed(self.links)
 
-        self.after(0, lambda: self._update_ui_status(active_link, mode, current_ip, unreachable_links, pings))
+        self._track_active_link(status.active_label)
+        current_ip = self.network.get_public_ip()
+        return status, current_ip
     
-    def _update_ping_status(self, pings):
+    def _track_active_link(self, active_link):
+        # Traffic leaves through another WAN now, so the cached public IP is stale
+        if active_link != self._last_active_link:
+            self._last_active_link = active_link
+            self.network.invalidate()
+
+    def _on_router_change(self, table, row):
+        # Called from the watcher thread; DHCP/address changes only matter for the next ping round
+        if table in (None, 'routes'):
+            self.after(0, self._schedule_route_push)
+
+    def _schedule_route_push(self):
+        if self._push_job is None:
+            self._push_job = self.after(settings.WATCH_DEBOUNCE, self._push_route_state)
+
+    def _push_route_state(self):
+        """Aplica na tela uma mudança de rota recebida do roteador, sem esperar o próximo ciclo."""
+        self._push_job = None
+        if self.status is None:
+            return
+        status = self.mikrotik.get_route_state(self.links, self.status)
+        if status is None:
+            return
+        self._track_active_link(status.active_label)
+        self._update_ui_status(status, self.ip_label.cget("text"), scheduled=False)
+        # The pings still describe the old routes; measure again soon
+        self._refresh_soon(settings.REFRESH_INTERVAL_FAST)
+
+    def _show_checking(self, comments):
         """Update only ping labels without touching other UI elements."""
         try:
-            for comment, ping_lbl in self.ping_labels.items():
-                val_raw = str(pings.get(comment, "--")).lower()
-                
-                if val_raw == "checking":
-                    ping_lbl.configure(text="⏳", text_color=settings.COLORS["text_dim"])
+            for comment in comments:
+                ping_lbl = self.ping_labels.get(comment)
+                if ping_lbl is not None:
+                    self._view.configure(ping_lbl, text="⏳", text_color=settings.COLORS["text_dim"])
                 # Other states will be handled by full _update_ui_status
         except Exception as e:
-            logger.error(f"Error in _update_ping_status: {e}")
+            logger.error(f"Error in _show_checking: {e}")
         
     def toggle_startup(self):
         enabled = self.startup_var.get()
@@ -359,30 +537,32 @@ class MainWindow(ctk.CTk):
             self.startup_var.set(not enabled)
             messagebox.showerror("Erro", "Não foi possível alterar a configuração de inicialização.\nVerifique as permissões.")
 
-    def _update_tray_menu(self, active_link, mode, unreachable_links):
+    def _update_tray_menu(self, status):
         if not self.tray_icon:
             return
+        # pystray rebuilds the native menu on every assignment; skip it when nothing it shows changed
+        content = (status.active_label, status.mode,
+                   tuple((link.comment, link.reachable, link.active) for link in status.links))
+        if not self._view.changed('tray', content):
+            return
 
         menu_items = [
-            item(f'Link: {active_link}', self.show_window, enabled=False),
-            item(f'Status: {mode} ({self.last_update_time})', self.show_window, enabled=False),
+            item(f'Link: {status.active_label}', self.show_window, enabled=False),
+            item(f'Status: {status.mode.value} (desde {self.last_update_time})', self.show_window, enabled=False),
             item('Forçar Atualização', lambda icon, item: self.discover_links()),
             pystray.Menu.SEPARATOR
         ]
 
         # Add link switching options
-        for link in self.links:
-            is_active = (link['label'] == active_link)
-            is_unreachable = link['comment'] in unreachable_links
-            
+        for link in status.links:
             menu_items.append(item(
-                f"Ativar {link['label']}{' (Offline)' if is_unreachable else ''}", 
-                (lambda l=link: lambda icon, item: self.switch_link(l['comment']))(),
-                checked=lambda item, l=link: active_link == l['label'],
-                enabled=not is_unreachable
+                f"Ativar {link.label}{'' if link.reachable else ' (Offline)'}", 
+                (lambda c=link.comment: lambda icon, item: self.switch_link(c))(),
+                checked=lambda item, active=link.active: active,
+                enabled=link.reachable
             ))
 
-        if mode == "Manual":
+        if status.mode is Mode.MANUAL:
             menu_items.append(item('Ativar Failover Automático', lambda icon, item: self.enable_all_links()))
         
         menu_items.extend([
@@ -393,120 +573,129 @@ class MainWindow(ctk.CTk):
 
         self.tray_icon.menu = pystray.Menu(*menu_items)
 
-    def _update_ui_status(self, active_link, mode, current_ip, unreachable_links, pings):
+    def _update_ui_status(self, status, current_ip, scheduled=True):
         try:
-            # Update timestamp
-            self.last_update_time = time.strftime("%H:%M:%S")
-            if hasattr(self, 'last_update_label'):
-                self.last_update_label.configure(text=f"Última atualização: {self.last_update_time}")
+            if scheduled:
+                # Swapped whole: route pushes and the next poll read a consistent snapshot
+                self.status = status
+                self.refresh_policy.route_push = self.mikrotik.is_watching()
+                due = self.mikrotik.next_ping_in()
+                self.refresh_policy.ping_due_in = math.ceil(due * 1000) if due is not None else None
+                self.refresh_policy.observe(status)
+                self._save_warm_cache()
+
+            view = self._view
+            self._displayed = status
+            if status.stale:
+                # From the warm start cache; last_update_time is when it was saved
+                view.configure(self.last_update_label, text=f"Dados salvos às {self.last_update_time}, atualizando...",
+                               text_color=settings.COLORS["text_dim"])
+            else:
+                # Update timestamp
+                self.last_update_time = time.strftime("%H:%M:%S")
+                view.configure(self.last_update_label, text=f"Última atualização: {self.last_update_time}",
+                               text_color=settings.COLORS["text_dim"])
 
-            self.active_link_label.configure(text=active_link)
-            
             # Check if active link is unreachable
-            is_active_down = any(l for l in self.links if l['label'] == active_link and l['comment'] in unreachable_links)
-            if is_active_down:
-                self.active_link_label.configure(text_color=settings.COLORS["danger"], image=self.warning_image)
+            if status.active_down:
+                view.configure(self.active_link_label, text=status.active_label,
+                               text_color=settings.COLORS["danger"], image=self.warning_image)
             else:
-                self.active_link_label.configure(text_color=settings.COLORS["text"], image=None)
-
-            self.mode_label.configure(
-                text=mode.upper(), 
-                text_color=settings.COLORS["success"] if mode == "Failover Automático" else settings.COLORS["warning"] if mode == "Manual" else settings.COLORS["danger"]
+                view.configure(self.active_link_label, text=status.active_label,
+                               text_color=settings.COLORS["text"], image=None)
+
+            mode = status.mode
+            view.configure(
+                self.mode_label,
+                text=mode.value.upper(), 
+                text_color=settings.COLORS["success"] if mode is Mode.AUTO else settings.COLORS["warning"] if mode is Mode.MANUAL else settings.COLORS["danger"]
             )
             
-            if mode == "Manual":
-                if self.btn_auto: 
-                    self.btn_auto.pack(fill="both", expand=True)
-                    self.btn_auto.configure(state="normal")
-            else:
-                if self.btn_auto: self.btn_auto.pack_forget()
+            if self.btn_auto:
+                # The failover container has a fixed height, so this doesn't move the layout
+                if view.changed('btn_auto', mode is Mode.MANUAL):
+                    if mode is Mode.MANUAL:
+                        self.btn_auto.pack(fill="both", expand=True)
+                    else:
+                        self.btn_auto.pack_forget()
+                if mode is Mode.MANUAL:
+                    view.configure(self.btn_auto, state="normal")
                 
             # Update Individual Link Buttons and Pings
             for comment, btn in self.link_buttons.items():
-                link_data = next((l for l in self.links if l['comment'] == comment), None)
-                is_active = (link_data and link_data['label'] == active_link)
-                is_unreachable = comment in unreachable_links
+                link = status.link(comment)
+                if link is None:
+                    continue
                 
                 # Update Ping Label
                 if comment in self.ping_labels:
-                    val_raw = str(pings.get(comment, "--")).lower()
                     color = settings.COLORS["text_dim"]
                     
                     # Handle "checking" state - ping is still in progress
-                    if val_raw == "checking":
+                    if link.state is LinkState.CHECKING:
                         val = "⏳"
-                        color = settings.COLORS["text_dim"]
-                    else:
-                        ms_val = None
-                        # Robust numeric check: extract digits and dots
-                        clean_val = "".join(filter(lambda x: x.isdigit() or x == '.', val_raw))
-                        
-                        if clean_val:
-                            try:
-                                ms_val = float(clean_val)
-                                # Format: no decimals if .0, else 1 decimal
-                                if ms_val == int(ms_val):
-                                    val = f"{int(ms_val)} ms"
-                                else:
-                                    val = f"{ms_val:.1f} ms"
-                            except ValueError:
-                                val = "-- ms"
-                        elif val_raw in ["timeout", "err"]:
-                            val = "-"
-                            color = settings.COLORS["danger"]
+                    elif link.state is LinkState.UP:
+                        ms_val = round(link.rtt_ms, 1)
+                        # Format: no decimals if .0, else 1 decimal
+                        if ms_val == int(ms_val):
+                            val = f"{int(ms_val)} ms"
                         else:
-                            val = "-" # Default for unparseable strings
-
-                        if ms_val is not None:
-                            if ms_val > 200: color = settings.COLORS["danger"]
-                            elif ms_val > 100: color = settings.COLORS["warning"]
-                            else: color = settings.COLORS["success"]
+                            val = f"{ms_val:.1f} ms"
+                        if status.stale: color = settings.COLORS["text_dim"]
+                        elif ms_val > 200: color = settings.COLORS["danger"]
+                        elif ms_val > 100: color = settings.COLORS["warning"]
+                        else: color = settings.COLORS["success"]
+                    elif link.state in (LinkState.TIMEOUT, LinkState.ERROR):
+                        val = "-"
+                        color = settings.COLORS["danger"]
+                    else:
+                        val = "-" # No measurement
                     
-                    self.ping_labels[comment].configure(text=val, text_color=color)
-
-                # Check if link is offline (unreachable OR failed ping)
-                # Don't mark as offline if still checking
-                ping_status = pings.get(comment, "")
-                ping_failed = ping_status in ["err", "timeout"]
-                is_checking = ping_status == "checking"
-                is_offline = is_unreachable or (ping_failed and not is_checking)
-                
-                if is_offline:
-                    btn.configure(
+                    view.configure(self.ping_labels[comment], text=val, text_color=color)
+
+                # Offline: unreachable gateway or failed ping (not while still checking)
+                if link.offline:
+                    view.configure(
+                        btn,
                         image=self.warning_image, 
                         state="disabled", 
                         fg_color=settings.COLORS["card"], 
                         text_color=settings.COLORS["text_dim"],
-                        text=f"{link_data['label']} (Offline)"
+                        text=f"{link.label} (Offline)"
                     )
-                elif is_active:
-                    btn.configure(
+                elif link.active:
+                    view.configure(
+                        btn,
                         image=None, 
                         state="normal", 
                         fg_color=settings.COLORS["success"],
-                        text=link_data['label']
+                        text=link.label
                     )
                 else:
-                    btn.configure(
+                    view.configure(
+                        btn,
                         image=None, 
                         state="normal", 
                         fg_color=ctk.ThemeManager.theme["CTkButton"]["fg_color"],
-                        text=link_data['label']
+                        text=link.label
                     )
 
-            self.ip_label.configure(text=current_ip)
-            self.set_loading(False)
-            self._update_tray_menu(active_link, mode, unreachable_links)
-            self.after(100, self._adjust_window_size)
+            view.configure(self.ip_label, text=current_ip)
+            if scheduled:
+                self.set_loading(False)
+            self._update_tray_menu(status)
         except Exception as e:
             logger.error(f"Error in _update_ui_status: {e}")
         finally:
-            self._status_updating = False
-            # Ensure the refresh interval always triggers next update
-            self.after(settings.REFRESH_INTERVAL, self.update_status)
+            # Pushed route updates ride on top of the polling loop, they don't re-arm it
+            if scheduled:
+                # Ensure the refresh interval always triggers next update
+                self._schedule_refresh()
 
     def hide_window(self):
         self.withdraw()
+        # Nobody is looking at the dashboard: poll less often
+        self.refresh_policy.hidden = True
         if not self.tray_icon:
             self._create_tray_icon()
 
@@ -514,14 +703,27 @@ class MainWindow(ctk.CTk):
         self.deiconify()
         self.lift()
         self.focus_force()
+        # May be called from the tray thread
+        self.after(0, self._on_window_shown)
+
+    def _on_window_shown(self):
+        self.refresh_policy.hidden = False
+        # Whatever is on screen may be up to REFRESH_INTERVAL_HIDDEN old
+        if self.links:
+            self._schedule_refresh(0)
 
     def quit_app(self, icon=None, item=None):
         if self.tray_icon:
             self.tray_icon.stop()
+        self.scheduler.shutdown()
+        self.mikrotik.close()
+        self.network.close()
         self.after(0, self._actual_quit)
 
     def _actual_quit(self):
         try:
+            # Next launch starts from what is on screen now
+            self._save_warm_cache(force=True)
             self.quit()
             self.destroy()
         except:
@@ -530,6 +732,9 @@ class MainWindow(ctk.CTk):
             sys.exit()
 
     def _create_tray_icon(self):
+        if self.tray_icon:
+            return
+
         def get_tray_image():
             if self.icon_image:
                 return self.icon_image
@@ -550,4 +755,8 @@ class MainWindow(ctk.CTk):
         )
         
         self.tray_icon = pystray.Icon("mikrotik_routes", get_tray_image(), "MikroTik Link Dashboard", menu)
+        # A new icon starts with the placeholder menu
+        self._view.changed('tray', None)
+        if self._displayed is not None:
+            self._update_tray_menu(self._displayed)
         threading.Thread(target=self.tray_icon.run, daemon=True).start()
@@ -0,0 +1,45 @@
+_UNSET = object()
+
+
+class ViewDiff:
+    """Lembra o que já está na tela e só repassa ao Tk o que mudou.
+
+    Cada widget guarda as opções aplicadas por último; `configure` envia só
+    as opções com valor diferente, e nada se todas forem iguais. `changed`
+    faz o mesmo para o que não é um configure (pack, menu da bandeja).
+
+    Todo configure de um widget acompanhado deve passar por aqui, senão o
+    registro fica para trás e uma mudança real pode ser pulada.
+    """
+
+    __slots__ = ('_applied', 'stats')
+
+    def __init__(self):
+        self._applied = {}  # widget (or name) -> {option: value} / last value
+        self.stats = {'applied': 0, 'skipped': 0}
+
+    def configure(self, widget, **options):
+        """Aplica em `widget` só as opções que mudaram; True se algo foi enviado ao Tk."""
+        applied = self._applied.setdefault(widget, {})
+        changes = {name: value for name, value in options.items() if applied.get(name, _UNSET) != value}
+        if not changes:
+            self.stats['skipped'] += 1
+            return False
+        widget.configure(**changes)
+        applied.update(changes)
+        self.stats['applied'] += 1
+        return True
+
+    def changed(self, name, value):
+        """True (e registra `value`) se for diferente do último valor registrado para `name`."""
+        if self._applied.get(name, _UNSET) == value:
+            return False
+        self._applied[name] = value
+        return True
+
+    def forget(self, *keys):
+        """Esquece os widgets/nomes dados, ou tudo; usado quando os widgets são recriados."""
+        if not keys:
+            self._applied.clear()
+        for key in keys:
+            self._applied.pop(key, None)
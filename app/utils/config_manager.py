@@ -1,6 +1,5 @@
 import json
 import os
-import keyring
 from typing import Optional, Dict
 
 class ConfigManager:
@@ -61,6 +60,7 @@ class ConfigManager:
     def save_password(self, host: str, user: str, password: str):
         username_key = f"{user}@{host}"
         try:
+            import keyring  # slow to import; only needed when a password is saved or read
             keyring.set_password(self.SERVICE_NAME, username_key, password)
         except Exception as e:
             print(f"Error saving password to keyring: {e}")
@@ -68,6 +68,7 @@ class ConfigManager:
     def get_password(self, host: str, user: str) -> Optional[str]:
         username_key = f"{user}@{host}"
         try:
+            import keyring
             return keyring.get_password(self.SERVICE_NAME, username_key)
         except Exception as e:
             print(f"Error getting password from keyring: {e}")
@@ -76,6 +77,7 @@ class ConfigManager:
     def delete_password(self, host: str, user: str):
         username_key = f"{user}@{host}"
         try:
+            import keyring
             pass_exists = keyring.get_password(self.SERVICE_NAME, username_key)
             if pass_exists:
                 keyring.delete_password(self.SERVICE_NAME, username_key)
@@ -1,32 +1,45 @@
+import importlib
+import threading
 import customtkinter as ctk
 from app.config import settings
-from app.ui.main_window import MainWindow
 from app.ui.login_window import LoginWindow
-from app.services.logger_service import logger
+from app.services.logger_service import setup_logger
 
 def main():
+    setup_logger()
+    # The dashboard's imports (routeros_api, pystray, PIL) load while the login screen is up
+    preload = threading.Thread(target=importlib.import_module, args=("app.ui.main_window",), daemon=True)
+    preload.start()
+
     ctk.set_appearance_mode(settings.APPEARANCE_MODE)
     ctk.set_default_color_theme(settings.DEFAULT_COLOR_THEME)
-    
+
     # Store credentials from login
     auth_data = {}
-    
-    def on_login(host, user, password, use_ssl):
+
+    def on_login(host, user, password, use_ssl, service=None, links=None):
         auth_data['host'] = host
         auth_data['user'] = user
         auth_data['password'] = password
         auth_data['use_ssl'] = use_ssl
-    
+        # Session already authenticated and links already discovered by the login screen
+        auth_data['service'] = service
+        auth_data['links'] = links
+
     # Show Login
     login_app = LoginWindow(on_login_success=on_login)
     login_app.mainloop()
-    
+
     # If login was successful (auth_data is populated), show Main Window
     if auth_data:
-        app = MainWindow(host=auth_data['host'], 
-                        user=auth_data['user'], 
+        preload.join()
+        from app.ui.main_window import MainWindow
+        app = MainWindow(host=auth_data['host'],
+                        user=auth_data['user'],
                         password=auth_data['password'],
-                        use_ssl=auth_data['use_ssl'])
+                        use_ssl=auth_data['use_ssl'],
+                        service=auth_data['service'],
+                        links=auth_data['links'])
         app.mainloop()
 
 if __name__ == "__main__":
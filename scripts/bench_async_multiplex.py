@@ -0,0 +1,68 @@
+"""Benchmark: vários roteadores atendidos por um único event loop.
+
+Sobe N roteadores simulados (`fake_router.py`) e mede o ciclo de status de
+todos ao mesmo tempo com o AsyncMikrotikService, comparando com o
+MikrotikService síncrono chamado roteador por roteador.
+
+    python scripts/bench_async_multiplex.py
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_router import FakeRouter  # noqa: E402
+from app.services.async_mikrotik_service import AsyncMikrotikService  # noqa: E402
+from app.services.mikrotik_service import MikrotikService  # noqa: E402
+
+ROUTER_COUNTS = (1, 5, 10, 25)
+LINKS_PER_ROUTER = 4
+
+
+def sync_cycle(routers):
+    services = [MikrotikService('127.0.0.1', 'admin', '', port=r.port) for r in routers]
+    try:
+        links = [s.discover_links() for s in services]
+        start = time.perf_counter()
+        for service, service_links in zip(services, links):
+            service.get_status(service_links)
+        return time.perf_counter() - start
+    finally:
+        for service in services:
+            service.close()
+
+
+async def async_cycle(routers):
+    services = [AsyncMikrotikService('127.0.0.1', 'admin', '', port=r.port) for r in routers]
+    try:
+        links = await asyncio.gather(*(s.discover_links() for s in services))
+        start = time.perf_counter()
+        await asyncio.gather(*(s.get_status(l) for s, l in zip(services, links)))
+        elapsed = time.perf_counter() - start
+        return elapsed, threading.active_count()
+    finally:
+        await asyncio.gather(*(s.close() for s in services))
+
+
+def main():
+    logging.getLogger("MikroTikRoutes").setLevel(logging.WARNING)
+    print(f"{'routers':>7} {'sync (s)':>9} {'async (s)':>10} {'threads':>8}")
+    for count in ROUTER_COUNTS:
+        routers = [FakeRouter.with_links(LINKS_PER_ROUTER, dead={LINKS_PER_ROUTER - 1}).start()
+                   for _ in range(count)]
+        try:
+            sync_elapsed = sync_cycle(routers)
+            async_elapsed, threads = asyncio.run(async_cycle(routers))
+        finally:
+            for router in routers:
+                router.stop()
+        # Each FakeRouter runs its own thread; those are not part of the client
+        print(f"{count:>7} {sync_elapsed:>9.3f} {async_elapsed:>10.3f} {threads - count:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark: tempo do ciclo de status x número de links.
+
+Compara o get_status atual (pings disparados em paralelo) com o laço serial
+antigo, contra o roteador simulado de `fake_router.py`. Um terço dos links
+responde com timeout (1s), como acontece com WANs fora do ar. Todo ciclo
+medido pinga todos os links (`force_ping`), como o primeiro ciclo real.
+
+    python scripts/bench_concurrent_pings.py
+"""
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_router import FakeRouter  # noqa: E402
+from app.services.mikrotik_service import MikrotikService  # noqa: E402
+
+LINK_COUNTS = (1, 2, 4, 6, 10, 20)
+ROUNDS = 3
+
+
+def serial_pings(service, links):
+    """Reproduz o laço antigo: um /tool ping por vez."""
+    def run(api):
+        ping_resource = api.get_resource('/tool')
+        for i, link in enumerate(links):
+            ping_resource.call('ping', {'count': '1', 'address': '8.8.8.8', 'src-address': f'10.{i}.0.2'})
+    service._pool.run(run)
+
+
+def measure(fn):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    logging.getLogger("MikroTikRoutes").setLevel(logging.WARNING)
+    print(f"{'links':>5} {'dead':>5} {'serial (s)':>11} {'concurrent (s)':>15} {'speedup':>8}")
+    for count in LINK_COUNTS:
+        dead = set(range(count - count // 3, count))
+        with FakeRouter.with_links(count, dead=dead) as router:
+            service = MikrotikService('127.0.0.1', 'admin', '', port=router.port)
+            links = service.discover_links()
+            serial = measure(lambda: serial_pings(service, links))
+            concurrent = measure(lambda: service.get_status(links, force_ping=True))
+            service.close()
+        print(f"{count:>5} {len(dead):>5} {serial:>11.3f} {concurrent:>15.3f} {serial / concurrent:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
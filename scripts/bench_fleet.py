@@ -0,0 +1,90 @@
+"""Benchmark do modo frota: tempo de ciclo x tamanho da frota.
+
+Sobe N roteadores simulados (`fake_router.py`, 3 links cada) e mede com o
+FleetMonitor:
+
+- primeiro ciclo: conexão + login + descoberta + status de todos;
+- ciclo normal: mediana de CYCLES ciclos seguintes (só status);
+- threads do cliente (sem contar as dos roteadores simulados) e o máximo de
+  roteadores consultados ao mesmo tempo.
+
+Depois, com a maior frota, varia o limite de concorrência e mostra o efeito
+de 5% dos roteadores travados (não respondem ao login): o primeiro ciclo paga
+o prazo deles uma vez e os seguintes os pulam pelo backoff.
+
+    python scripts/bench_fleet.py
+"""
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_router import FakeRouter  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.models.fleet import RouterProfile  # noqa: E402
+from app.services.fleet_service import FleetMonitor  # noqa: E402
+
+FLEET_SIZES = (10, 50, 100, 200)
+CONCURRENCY_LEVELS = (8, 32, 128)
+LINKS_PER_ROUTER = 3
+CYCLES = 3
+STALLED_SHARE = 0.05
+
+# Hung routers cost this once, before their backoff starts
+settings.FLEET_ROUTER_TIMEOUT = 2
+
+
+def profiles_for(routers):
+    return [RouterProfile(f'router{i:03d}', '127.0.0.1', 'admin', '', port=router.port)
+            for i, router in enumerate(routers)]
+
+
+async def measure(profiles, concurrency):
+    monitor = FleetMonitor(profiles, concurrency=concurrency)
+    try:
+        first = await monitor.poll()
+        threads = threading.active_count()
+        steady = [(await monitor.poll()).cycle_ms for _ in range(CYCLES)]
+        ok = sum(1 for router in monitor.snapshot.routers if router.error is None)
+        return first.cycle_ms, statistics.median(steady), threads, monitor.stats['peak_in_flight'], ok
+    finally:
+        await monitor.close()
+
+
+def start_routers(count, stalled=0):
+    routers = [FakeRouter.with_links(LINKS_PER_ROUTER).start() for _ in range(count - stalled)]
+    routers += [FakeRouter.with_links(LINKS_PER_ROUTER, stall={'/login'}).start() for _ in range(stalled)]
+    return routers
+
+
+def run(routers, concurrency, label):
+    try:
+        first, steady, threads, peak, ok = asyncio.run(measure(profiles_for(routers), concurrency))
+    finally:
+        for router in routers:
+            router.stop()
+    # Each FakeRouter runs its own thread; those (and the main thread) are not the client's
+    client_threads = threads - len(routers) - 1
+    print(f"{label:>16} {concurrency:>5} {first:>11.0f} {steady:>11.0f} {ok:>6} {peak:>6} {client_threads:>8}")
+
+
+def main():
+    logging.getLogger("MikroTikRoutes").setLevel(logging.CRITICAL)
+    print(f"{'routers':>16} {'conc':>5} {'1st (ms)':>11} {'cycle (ms)':>11} {'ok':>6} {'peak':>6} {'threads':>8}")
+    for count in FLEET_SIZES:
+        run(start_routers(count), settings.FLEET_MAX_CONCURRENCY, str(count))
+
+    largest = FLEET_SIZES[-1]
+    for concurrency in CONCURRENCY_LEVELS:
+        run(start_routers(largest), concurrency, str(largest))
+
+    stalled = int(largest * STALLED_SHARE)
+    run(start_routers(largest, stalled), settings.FLEET_MAX_CONCURRENCY, f"{largest} ({stalled} hung)")
+
+
+if __name__ == "__main__":
+    main()
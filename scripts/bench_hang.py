@@ -0,0 +1,71 @@
+"""Benchmark: duração dos ciclos de status com o roteador travando no meio dos comandos.
+
+Para cada cenário (saudável, print travado, ping travado, login travado,
+roteador fora do ar) roda vários ciclos de get_status e mostra p50/p95/máx,
+os desfechos e o estado do disjuntor. Antes dos prazos por operação, um
+roteador que parasse de responder segurava o ciclo (e o loop de atualização)
+indefinidamente.
+
+    python scripts/bench_hang.py
+"""
+import logging
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_router import FakeRouter  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.services.mikrotik_service import MikrotikService  # noqa: E402
+
+CYCLES = 8
+LINKS = [{'comment': f'Link{i + 1}_ISP{i + 1}', 'label': f'ISP{i + 1}', 'gateway': f'10.{i}.0.1'}
+         for i in range(3)]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def run(name, port):
+    service = MikrotikService('127.0.0.1', 'admin', '', port=port)
+    for _ in range(CYCLES):
+        try:
+            service.get_status(LINKS, force_ping=True)
+        except Exception:
+            pass
+    latency = service.status_latency()
+    breaker = service.connection_stats()['breaker']
+    service.close()
+    outcomes = ', '.join(f"{k}={v}" for k, v in latency['outcomes'].items())
+    print(f"{name:<16} {latency['p50']:>9.1f} {latency['p95']:>9.1f} {latency['max']:>9.1f}  "
+          f"{breaker['state']:<9} {breaker['rejected']:>8}  {outcomes}")
+
+
+def main():
+    logging.getLogger("MikroTikRoutes").setLevel(logging.CRITICAL)
+    print(f"deadlines: connect {settings.API_CONNECT_TIMEOUT}s, login {settings.API_LOGIN_TIMEOUT}s, "
+          f"query {settings.API_QUERY_TIMEOUT}s, pings {settings.STATUS_CYCLE_DEADLINE}s "
+          f"(+{settings.PING_DEADLINE_SLACK}s)")
+    print(f"{'scenario':<16} {'p50 (ms)':>9} {'p95 (ms)':>9} {'max (ms)':>9}  {'breaker':<9} {'rejected':>8}  outcomes")
+    scenarios = (
+        ('healthy', ()),
+        ('print hangs', ('/ip/route/print',)),
+        ('ping hangs', ('/tool/ping',)),
+        ('login hangs', ('/login',)),
+    )
+    for name, stall in scenarios:
+        with FakeRouter.with_links(3, stall=stall) as router:
+            run(name, router.port)
+    # Nothing listening: connection refused on every attempt
+    run('router down', free_port())
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    main()
+    print(f"total {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,77 @@
+"""Benchmark: pings contínuos (modo "stream") contra um ping count=1 por ciclo.
+
+O link 1 é estável, o link 2 tem jitter e o link 3 perde 1 em cada 5 pacotes.
+Para o mesmo número de amostras por link, compara quantos comandos chegam ao
+roteador e o que cada modo consegue dizer sobre os links (o modo antigo vê
+só a última amostra; o stream dá perda, mín/média/máx e jitter).
+
+    python scripts/bench_probe_stream.py
+"""
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_router import FakeRouter  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.services.mikrotik_service import MikrotikService  # noqa: E402
+
+SAMPLES = 20
+INTERVAL = 0.05  # seconds between echoes; RouterOS would use 1s, the ratio is the same
+SCRIPTS = {
+    '10.0.0.2': (0.001, '10ms'),
+    '10.1.0.2': [(0.001, rtt) for rtt in ('20ms', '45ms', '18ms', '60ms', '22ms')],
+    '10.2.0.2': [(0.001, '15ms')] * 4 + [(0.001, None)],
+}
+
+
+def router():
+    fake = FakeRouter.with_links(3)
+    fake.ping_replies.update(SCRIPTS)
+    return fake
+
+
+def single_mode():
+    settings.PING_MODE = "single"
+    with router() as fake:
+        service = MikrotikService('127.0.0.1', 'admin', '', port=fake.port)
+        links = service.discover_links()
+        before = fake.stats['commands']
+        for _ in range(SAMPLES):
+            status = service.get_status(links, force_ping=True)
+        commands = fake.stats['commands'] - before
+        service.close()
+    return commands, {link.comment: {'last': link.rtt_ms if link.rtt_ms is not None else link.state.value}
+                      for link in status.links}
+
+
+def stream_mode():
+    settings.PING_MODE = "stream"
+    settings.PROBE_STREAM_INTERVAL = INTERVAL
+    settings.PROBE_WINDOW = SAMPLES
+    with router() as fake:
+        service = MikrotikService('127.0.0.1', 'admin', '', port=fake.port)
+        links = service.discover_links()
+        before = fake.stats['commands']
+        service.get_status(links)
+        time.sleep(INTERVAL * (SAMPLES + 2))
+        service.get_status(links)
+        commands = fake.stats['commands'] - before
+        stats = service.link_stats()
+        service.close()
+    return commands, stats
+
+
+def main():
+    logging.getLogger("MikroTikRoutes").setLevel(logging.WARNING)
+    for name, run in (('single (count=1 per cycle)', single_mode), ('stream', stream_mode)):
+        commands, stats = run()
+        print(f"{name}: {commands} router commands for {SAMPLES} samples per link")
+        for comment, values in sorted(stats.items()):
+            print(f"  {comment:<12} " + ' '.join(f"{key}={value}" for key, value in values.items()))
+
+
+if __name__ == "__main__":
+    main()
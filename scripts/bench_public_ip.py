@@ -0,0 +1,121 @@
+"""Benchmark: descoberta do IP público com serviços HTTP locais simulados.
+
+Sobe três servidores HTTP locais com atrasos configuráveis (um lento, um
+rápido, um fora do ar) e compara a consulta sequencial antiga (urllib, uma
+conexão nova por tentativa) com o NetworkService (consulta concorrente,
+keep-alive e cache). Conta as conexões TCP aceitas para mostrar o reuso.
+
+    python scripts/bench_public_ip.py
+"""
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.network_service import NetworkService  # noqa: E402
+
+ROUNDS = 10
+
+
+class FakeIpService:
+    """Servidor HTTP local que responde um IP depois de `delay` segundos (ou 503 se `broken`)."""
+
+    def __init__(self, answer='198.51.100.7', delay=0.0, broken=False):
+        self.answer = answer
+        self.delay = delay
+        self.broken = broken
+        self.connections = 0
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def setup(self):
+                service.connections += 1
+                super().setup()
+                # Headers and body go out in separate writes; avoid Nagle + delayed ACK
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self):
+                time.sleep(service.delay)
+                body = service.answer.encode() if not service.broken else b'unavailable'
+                self.send_response(503 if service.broken else 200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def sequential_lookup(urls, timeout=1):
+    """Reproduz o NetworkService antigo: um serviço por vez, conexão nova a cada chamada."""
+    for url in urls:
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                return response.read().decode('utf-8').strip()
+        except Exception:
+            continue
+    return "Erro (Offline?)"
+
+
+def run(name, lookup, services):
+    for service in services:
+        service.connections = 0
+    times = []
+    answer = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        answer = lookup()
+        times.append((time.perf_counter() - start) * 1000)
+    connections = sum(service.connections for service in services)
+    print(f"{name:<28} {sum(times) / len(times):>9.1f} {max(times):>9.1f} {connections:>12}  {answer}")
+
+
+def main():
+    logging.getLogger("MikroTikRoutes").setLevel(logging.WARNING)
+    # Order matters for the sequential lookup: the broken one first, then the slow one
+    broken = FakeIpService(broken=True)
+    slow = FakeIpService(delay=0.6)
+    fast = FakeIpService(delay=0.02)
+    services = [broken, slow, fast]
+    urls = [s.url for s in services]
+
+    print(f"{'strategy':<28} {'mean (ms)':>9} {'max (ms)':>9} {'connections':>12}  answer")
+    run('sequential (old)', lambda: sequential_lookup(urls), services)
+
+    racer = NetworkService(providers=urls, ttl=0)
+    run('concurrent, no cache', racer.get_public_ip, services)
+    racer.close()
+
+    cached = NetworkService(providers=urls, ttl=60)
+    run('concurrent + TTL cache', cached.get_public_ip, services)
+    cached.close()
+
+    for service in services:
+        service.broken = True
+    fallback = NetworkService(providers=urls, ttl=0, router_source=lambda: '203.0.113.10')
+    run('all HTTP down, router source', fallback.get_public_ip, services)
+    fallback.close()
+
+    for service in services:
+        service.stop()
+
+
+if __name__ == "__main__":
+    main()
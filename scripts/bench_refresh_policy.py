@@ -0,0 +1,149 @@
+"""Simulação: quantos ciclos de status o polling adaptativo faz, comparado ao fixo de 5s.
+
+Roda uma hora simulada (sem roteador) com quatro eventos: o gateway do link
+principal cai e volta, o link principal perde a saída para a internet sem o
+gateway cair, o que só o ping vê, e há uma troca manual de link. Os pings
+seguem o PingTiers (PING_INTERVAL, e o backup LTE tarifado em METERED; o
+fixo antigo pingava tudo todo ciclo). Mostra ciclos, pings e comandos ao
+roteador por hora (sem `listen`, cada ciclo também lê rotas e leases) e o
+pior atraso de cada evento até aparecer na tela, repetindo a hora com os eventos deslocados em PHASE_STEP
+ao longo de PHASES (um evento logo antes de um ciclo não conta como o caso
+típico). Com `listen`, mudanças de rota chegam em WATCH_DEBOUNCE.
+
+    python scripts/bench_refresh_policy.py
+"""
+import logging
+import math
+import os
+import sys
+from dataclasses import replace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings  # noqa: E402
+from app.models.status import LinkStatus, Mode, StatusSnapshot, ping_state  # noqa: E402
+from app.services.ping_tiers import PingTiers  # noqa: E402
+from app.services.refresh_policy import RefreshPolicy  # noqa: E402
+
+HOUR = 3600 * 1000
+PHASES = 30 * 1000     # ms; longer than the longest refresh interval
+PHASE_STEP = 500       # ms
+METERED = {'Link3_LTE': 300}  # PING_INTERVAL_BY_LINK of the adaptive runs
+READS_PER_POLL = 2     # route and DHCP lease prints of a cycle without the mirror
+# (at ms, name, seen by the route mirror)
+EVENTS = (
+    (1207 * 1000, 'gw down', True),
+    (1263 * 1000, 'gw up', True),
+    (1802 * 1000, 'loss', False),
+    (1860 * 1000, 'loss end', False),
+    (2411 * 1000, 'switch', True),
+)
+
+
+def world(now, events):
+    """StatusSnapshot real do roteador no instante `now` (ms)."""
+    gw_down = events[0][0] <= now < events[1][0]
+    loss = events[2][0] <= now < events[3][0]
+    active = 'ISP2' if now >= events[4][0] or gw_down else 'ISP1'
+    pings = {'Link1_ISP1': 'timeout' if gw_down or loss else 12.3, 'Link2_ISP2': 35.0, 'Link3_LTE': 80.1}
+    links = tuple(
+        LinkStatus(comment, comment.split('_')[-1], *ping_state(value),
+                   active=comment.endswith(active), reachable=not (gw_down and comment == 'Link1_ISP1'))
+        for comment, value in pings.items())
+    return StatusSnapshot(links, active, Mode.AUTO)
+
+
+def displayed(truth, measured):
+    """O que a tela mostra: flags de rota atuais com o último ping de cada link."""
+    links = tuple(replace(measured.get(link.comment, link), active=link.active, reachable=link.reachable)
+                  for link in truth.links)
+    return StatusSnapshot(links, truth.active_label, truth.mode)
+
+
+def view(status):
+    # An unreachable gateway shows as offline whatever its last ping said
+    return status.active_label, tuple((link.comment, link.reachable, link.state if link.reachable else None)
+                                      for link in status.links)
+
+
+def simulate(adaptive, hidden, route_push, offset=0):
+    events = tuple((at + offset, name, pushed) for at, name, pushed in EVENTS)
+    policy = RefreshPolicy()
+    policy.hidden = hidden
+    policy.route_push = route_push
+    # The fixed 5 s loop pinged every link on every cycle
+    tiers = (PingTiers(default_interval=settings.PING_INTERVAL, intervals=METERED) if adaptive
+             else PingTiers(default_interval=0, intervals={}))
+    measured = {}
+    now, cycles, pings, seen = 0, 0, 0, {}
+    pending = list(events)   # not reached by the clock yet
+    waiting = []             # happened, not on screen yet
+
+    def show(status, at):
+        while pending and pending[0][0] <= at:
+            waiting.append(pending.pop(0))
+        if waiting and view(status) == view(world(at, events)):
+            for happened, name, _ in waiting:
+                seen[name] = (at - happened) / 1000
+            waiting.clear()
+
+    while now < HOUR:
+        cycles += 1
+        truth = world(now, events)
+        signatures = {link.comment: (link.active, link.reachable) for link in truth.links}
+        for comment in tiers.select(signatures, now / 1000):
+            measured[comment] = truth.link(comment)
+            tiers.record(comment, signatures[comment], measured[comment].state, now / 1000)
+            pings += 1
+        status = displayed(truth, measured)
+        policy.observe(status)
+        show(status, now)
+        if adaptive:
+            due = tiers.next_due(now / 1000)
+            policy.ping_due_in = math.ceil(due * 1000) if due is not None else None
+            interval = policy.next_interval()
+        else:
+            interval = settings.REFRESH_INTERVAL
+        upcoming = pending[0] if pending else None
+        if upcoming and upcoming[2] and (route_push or upcoming[1] == 'switch') and now + interval >= upcoming[0]:
+            # Pushed route change (or a click): the UI shows the routes at once and boosts
+            at, name, _ = upcoming
+            shown_at = at if name == 'switch' else at + settings.WATCH_DEBOUNCE
+            show(displayed(world(shown_at, events), measured), shown_at)
+            policy.boost()
+            now = at + (0 if name == 'switch' else settings.REFRESH_INTERVAL_FAST)
+            continue
+        now += interval
+    return cycles, pings + (0 if route_push else cycles * READS_PER_POLL), seen
+
+
+def worst_case(adaptive, hidden, route_push):
+    """Ciclos e comandos por hora (fase 0) e o pior atraso de cada evento entre as fases."""
+    cycles, commands, worst = None, None, {}
+    for offset in range(0, PHASES, PHASE_STEP):
+        run_cycles, run_commands, seen = simulate(adaptive, hidden, route_push, offset)
+        if cycles is None:
+            cycles, commands = run_cycles, run_commands
+        for _, name, _ in EVENTS:
+            # Never shown within the hour counts as the worst possible delay
+            worst[name] = max(worst.get(name, 0), seen.get(name, float('inf')))
+    return cycles, commands, worst
+
+
+def main():
+    logging.getLogger("MikroTikRoutes").setLevel(logging.WARNING)
+    print(f"ping interval {settings.PING_INTERVAL}s, {len(range(0, PHASES, PHASE_STEP))} phases")
+    print(f"{'strategy':<28} {'cycles/h':>8} {'cmds/h':>8}  worst delay until shown (s)")
+    for name, adaptive, hidden, route_push in (
+            ('fixed 5s', False, False, False),
+            ('adaptive, polling only', True, False, False),
+            ('adaptive, polling, in tray', True, True, False),
+            ('adaptive + listen', True, False, True),
+            ('adaptive + listen, in tray', True, True, True)):
+        cycles, commands, worst = worst_case(adaptive, hidden, route_push)
+        delays = ', '.join(f"{event}={delay:.1f}" for event, delay in worst.items())
+        print(f"{name:<28} {cycles:>8} {commands:>8}  {delays}")
+
+
+if __name__ == "__main__":
+    main()
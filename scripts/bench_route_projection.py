@@ -0,0 +1,83 @@
+"""Benchmark: projeção (.proplist) e filtros no roteador em tabelas grandes.
+
+Compara a forma antiga de ler as tabelas (todas as colunas, DHCP/endereços
+sem filtro, via resources do routeros_api) com a atual (`.proplist`, `?`
+filtros e linhas decodificadas conforme chegam) em um roteador simulado com
+100k rotas BGP, defaults aprendidos de peers e 1k clientes DHCP/endereços.
+
+    python scripts/bench_route_projection.py
+"""
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_router import FakeRouter  # noqa: E402
+from app.services.mikrotik_service import (  # noqa: E402
+    ADDRESS_PROPERTIES, DHCP_CLIENT_PROPERTIES, ROUTE_PROPERTIES, MikrotikService
+)
+
+LINKS = 4
+EXTRA_ROUTES = 100000
+BGP_DEFAULTS = 200
+CLIENTS = 1000
+ROUNDS = 5
+
+
+def legacy_tables(api):
+    """Leitura antiga: rotas default, DHCP e endereços completos."""
+    routes = api.get_resource('/ip/route').get(dst_address='0.0.0.0/0')
+    dhcp_clients = api.get_resource('/ip/dhcp-client').get()
+    ip_addresses = api.get_resource('/ip/address').get()
+    return routes, dhcp_clients, ip_addresses
+
+
+def projected_tables(api):
+    """Leitura atual, igual à do MikrotikService._get_status."""
+    routes = list(MikrotikService._default_routes(api, ROUTE_PROPERTIES))
+    dhcp_clients = list(api.stream_print('/ip/dhcp-client', DHCP_CLIENT_PROPERTIES, {'status': 'bound'}))
+    ip_addresses = list(api.stream_print('/ip/address', ADDRESS_PROPERTIES))
+    return routes, dhcp_clients, ip_addresses
+
+
+def measure(router, service, reader):
+    service._pool.run(reader)  # warm-up
+    best = float('inf')
+    before = router.stats['bytes_out']
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        rows = service._pool.run(reader)
+        best = min(best, time.perf_counter() - start)
+    traffic = (router.stats['bytes_out'] - before) / ROUNDS
+    return best, traffic, [len(table) for table in rows]
+
+
+def main():
+    logging.getLogger("MikroTikRoutes").setLevel(logging.WARNING)
+    router = FakeRouter.with_links(LINKS, extra_routes=EXTRA_ROUTES, extra_default_routes=BGP_DEFAULTS,
+                                   extra_dhcp_clients=CLIENTS, extra_addresses=CLIENTS)
+    print(f"/ip/route: {len(router.tables['/ip/route'])} rows, "
+          f"/ip/dhcp-client: {len(router.tables['/ip/dhcp-client'])}, "
+          f"/ip/address: {len(router.tables['/ip/address'])}")
+    with router:
+        service = MikrotikService('127.0.0.1', 'admin', '', port=router.port)
+        try:
+            results = {
+                'legacy': measure(router, service, legacy_tables),
+                'projected': measure(router, service, projected_tables),
+            }
+        finally:
+            service.close()
+
+    print(f"{'strategy':<10} {'time (ms)':>10} {'bytes':>10} {'rows (routes/dhcp/addr)':>25}")
+    for name, (elapsed, traffic, rows) in results.items():
+        print(f"{name:<10} {elapsed * 1000:>10.1f} {traffic:>10.0f} {'/'.join(map(str, rows)):>25}")
+    legacy, projected = results['legacy'], results['projected']
+    print(f"saved: {(1 - projected[1] / legacy[1]) * 100:.0f}% bytes, "
+          f"{(1 - projected[0] / legacy[0]) * 100:.0f}% time")
+
+
+if __name__ == "__main__":
+    main()
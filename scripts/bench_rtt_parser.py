@@ -0,0 +1,70 @@
+"""Micro-benchmark: parser de RTT antigo (regex + filter) contra rtt_parser.parse_rtt.
+
+Mede o custo por conversão dos formatos de duração do RouterOS e lista os
+formatos em que o parser antigo errava (segundos descartados, unidade 's'
+ignorada). O antigo também devolvia string, que a UI convertia de novo. A
+tabela completa de formatos fica em tests/test_rtt_parser.py.
+
+    python scripts/bench_rtt_parser.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.rtt_parser import parse_rtt  # noqa: E402
+
+# (RouterOS text, expected ms)
+CASES = (
+    ('10ms247us', 10.247),
+    ('5ms', 5.0),
+    ('247us', 0.247),
+    ('1s', 1000.0),
+    ('1s5ms', 1005.0),
+    ('1s5ms300us', 1005.3),
+    ('00:00:00.012', 12.0),
+    ('00:00:01.012345', 1012.345),
+    ('12', 12.0),
+    ('', None),
+    ('timeout', None),
+)
+ROUNDS = 20000
+
+
+def legacy_parse(avg_rtt):
+    """Cópia do parse_ping_reply antigo + a reconversão que a UI fazia."""
+    if not avg_rtt:
+        return None
+    ms_match = re.search(r'(\d+)\s*ms', avg_rtt)
+    us_match = re.search(r'(\d+)\s*us', avg_rtt)
+    if ms_match or us_match:
+        ms = int(ms_match.group(1)) if ms_match else 0
+        us = int(us_match.group(1)) if us_match else 0
+        text = str(round(ms + us / 1000.0, 1))
+    elif ':' in avg_rtt and '.' in avg_rtt:
+        text = str(round(float("0." + avg_rtt.split('.')[-1]) * 1000, 1))
+    else:
+        text = "".join(filter(lambda x: x.isdigit() or x == '.', avg_rtt)) or "timeout"
+    clean = "".join(filter(lambda x: x.isdigit() or x == '.', text))
+    return float(clean) if clean else None
+
+
+def main():
+    texts = [text for text, _ in CASES]
+    for name, parse in (('legacy', legacy_parse), ('parse_rtt', parse_rtt)):
+        seconds = timeit.timeit(lambda: [parse(text) for text in texts], number=ROUNDS)
+        per_call = seconds / (ROUNDS * len(texts)) * 1e9
+        wrong = [text for text, expected in CASES
+                 if (parse(text) is None) != (expected is None)
+                 or (expected is not None and abs(parse(text) - expected) > 0.05)]
+        print(f"{name:<10} {per_call:>7.0f} ns/call  wrong: {wrong or 'none'}")
+    print(f"steady-state format only ('10ms247us'):")
+    for name, parse in (('legacy', legacy_parse), ('parse_rtt', parse_rtt)):
+        seconds = timeit.timeit(lambda: parse('10ms247us'), number=ROUNDS * 10)
+        print(f"{name:<10} {seconds / (ROUNDS * 10) * 1e9:>7.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Benchmark de inicialização, com orçamento: tempo de import e tempo até o primeiro status.
+
+- import: roda `python -X importtime -c "import <módulo>"` para cada ponto de
+  entrada e lê o tempo acumulado do módulo e dos pacotes mais pesados que ele
+  puxa. `main` é o que roda antes da tela de login aparecer.
+- primeiro status do daemon: do início do processo `python -m app.daemon
+  --once` até a primeira linha JSON, contra o scripts/fake_router.py (inclui
+  interpretador, imports, conexão + login, descoberta e um ciclo de status).
+- painel: do início de um processo que abre o MainWindow de verdade contra o
+  roteador simulado até o primeiro ocioso do Tk depois da construção (janela
+  desenhada) e até o primeiro status ao vivo na tela. Precisa de display
+  (DISPLAY, ex.: `xvfb-run python scripts/bench_startup.py`) e das
+  dependências da interface.
+
+Cada medida é a mediana de RUNS execuções. As que estão em BUDGET_MS foram
+medidas e têm orçamento: o script sai com código 1 se alguma passar dele. As
+outras aparecem como "untracked" até alguém medir numa máquina com a
+interface e fixar o orçamento. Medidas cujas dependências (ou display) não
+estão disponíveis aparecem como "skipped".
+
+    python scripts/bench_startup.py
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from fake_router import FakeRouter  # noqa: E402
+
+RUNS = 5
+# ms; measured median on a developer laptop, with headroom. Raise only with a reason in the commit.
+# Measurements not listed here are reported but never fail the run.
+BUDGET_MS = {
+    'import app.daemon': 150,
+    'daemon first status': 300,
+}
+ENTRY_MODULES = ('main', 'app.ui.main_window', 'app.daemon')
+_IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| *(\S+)')
+
+
+def import_profile(module):
+    """(ms acumulados do módulo, {pacote de primeiro nível: ms}) ou None se faltar dependência."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=REPO, capture_output=True, text=True)
+    if result.returncode != 0:
+        missing = re.search(r"No module named '([^']+)'", result.stderr)
+        return None, missing.group(1) if missing else result.stderr.strip().splitlines()[-1]
+    total = None
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if not match:
+            continue
+        cumulative_us, name = int(match.group(2)), match.group(3)
+        if name == module:
+            total = cumulative_us / 1000
+        elif '.' not in name and name != 'app' and name not in sys.stdlib_module_names:
+            # Third-party packages, wherever in the tree they were first imported
+            packages[name] = cumulative_us / 1000
+    return total, packages
+
+
+def first_status_ms():
+    env = {**os.environ, 'MIKROTIK_HOST': '127.0.0.1', 'MIKROTIK_USER': 'admin', 'MIKROTIK_PASSWORD': ''}
+    with FakeRouter.with_links(3) as fake:
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-m', 'app.daemon', '--once', '--port', str(fake.port)],
+                                   cwd=REPO, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                   text=True)
+        line = process.stdout.readline()
+        elapsed = (time.perf_counter() - started) * 1000
+        process.wait()
+    if '"links"' not in line:
+        raise RuntimeError(f"daemon did not report a status: {line!r}")
+    return elapsed
+
+
+def dashboard_probe():
+    """Roda no subprocesso: abre o MainWindow e imprime os instantes (time.time) medidos, em JSON."""
+    from app.config import settings
+    from app.services.mikrotik_service import MikrotikService
+    from app.ui.main_window import MainWindow
+
+    # Public IP from the fake router's /ip/cloud: the only provider refuses at once
+    settings.PUBLIC_IP_PROVIDERS = ("http://127.0.0.1:9/",)
+    marks = {}
+
+    class TimedWindow(MainWindow):
+        def _update_ui_status(self, status, current_ip, scheduled=True):
+            super()._update_ui_status(status, current_ip, scheduled)
+            if scheduled and not status.stale and 'status' not in marks:
+                marks['status'] = time.time()
+                self.after(0, self.quit)
+
+    service = MikrotikService('127.0.0.1', 'admin', '', port=int(os.environ['BENCH_ROUTER_PORT']))
+    window = TimedWindow('127.0.0.1', 'admin', '', service=service)
+    window.after_idle(lambda: marks.setdefault('paint', time.time()))
+    window.after(10000, window.quit)
+    window.mainloop()
+    print(json.dumps(marks), flush=True)
+    # Skip Tk/tray teardown; it is not part of startup
+    os._exit(0)
+
+
+def dashboard_ms():
+    """(ms até a janela desenhada, ms até o primeiro status) de um processo novo."""
+    with FakeRouter.with_links(3) as fake, tempfile.TemporaryDirectory() as workdir:
+        # Own working directory: no warm start cache from earlier runs, none left behind
+        env = {**os.environ, 'BENCH_ROUTER_PORT': str(fake.port),
+               'PYTHONPATH': os.pathsep.join([REPO, os.path.join(REPO, 'scripts')])}
+        started = time.time()
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), '--dashboard-probe'],
+                                cwd=workdir, env=env, capture_output=True, text=True, timeout=30)
+    marks = json.loads(result.stdout.strip().splitlines()[-1]) if result.stdout.strip() else {}
+    if 'paint' not in marks or 'status' not in marks:
+        raise RuntimeError(f"dashboard did not show a status: {result.stderr.strip()[-300:]}")
+    return (marks['paint'] - started) * 1000, (marks['status'] - started) * 1000
+
+
+def check(name, samples, over):
+    median = statistics.median(samples)
+    budget = BUDGET_MS.get(name)
+    if budget is None:
+        print(f"{name:<28} {median:>7.1f} ms  untracked")
+        return
+    verdict = 'ok' if median <= budget else 'OVER'
+    if median > budget:
+        over.append(name)
+    print(f"{name:<28} {median:>7.1f} ms  (budget {budget} ms) {verdict}")
+
+
+def main():
+    over = []
+    for module in ENTRY_MODULES:
+        name = f'import {module}'
+        profiles = [import_profile(module) for _ in range(RUNS)]
+        if profiles[0][0] is None:
+            print(f"{name:<28} skipped (missing dependency: {profiles[0][1]})")
+            continue
+        check(name, [total for total, _ in profiles], over)
+        heaviest = sorted(((package, ms) for package, ms in profiles[-1][1].items() if ms >= 1),
+                          key=lambda item: -item[1])[:5]
+        print(' ' * 30 + ', '.join(f"{package} {ms:.0f}" for package, ms in heaviest))
+
+    check('daemon first status', [first_status_ms() for _ in range(RUNS)], over)
+
+    if not os.environ.get('DISPLAY') and sys.platform.startswith('linux'):
+        print(f"{'dashboard':<28} skipped (no display; try xvfb-run)")
+    elif import_profile('app.ui.main_window')[0] is None:
+        print(f"{'dashboard':<28} skipped (missing dependency)")
+    else:
+        runs = [dashboard_ms() for _ in range(RUNS)]
+        check('dashboard first paint', [paint for paint, _ in runs], over)
+        check('dashboard first status', [status for _, status in runs], over)
+
+    if over:
+        print(f"over budget: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ['--dashboard-probe']:
+        dashboard_probe()
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark do pipeline de status (discover, get_status, switch, enable_all).
+
+Roda sem interface gráfica contra o roteador simulado de `fake_router.py`,
+variando o número de links, de rotas default comentadas que não são links,
+de clientes DHCP/endereços, o tamanho da tabela de rotas e a latência do
+roteador. O get_status medido pinga todos os links a cada chamada
+(`force_ping`), sem repetir medições do tier de ping. Para cada operação
+reporta p50/p95/p99,
+comandos de API (round trips) e bytes trafegados por chamada, e grava tudo em
+JSON para comparar entre commits:
+
+    python scripts/bench_status_pipeline.py --output before.json
+    python scripts/bench_status_pipeline.py --output after.json --compare before.json
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_router import FakeRouter  # noqa: E402
+from app.services.mikrotik_service import MikrotikService  # noqa: E402
+
+LINKS = (2, 10, 50)
+CLIENTS = (10, 1000)         # DHCP clients and IP addresses besides the links
+DEFAULTS = (0, 1000)         # commented default routes that are not links ("Backup_peer...")
+ROUTES = (0, 10000)          # non-default routes in /ip/route
+LATENCIES = (0.0, 0.005)     # seconds added by the router to every command
+QUICK = {'links': (2, 10), 'defaults': (0,), 'clients': (10,), 'routes': (0,), 'latencies': (0.0,)}
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(router, operation, iterations):
+    """Executa `operation` N vezes; retorna latências (ms), comandos e bytes por chamada."""
+    operation()  # warm-up: opens the pooled session
+    samples = []
+    start_stats = dict(router.stats)
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - start) * 1000)
+    commands = router.stats['commands'] - start_stats['commands']
+    traffic = (router.stats['bytes_in'] + router.stats['bytes_out']
+               - start_stats['bytes_in'] - start_stats['bytes_out'])
+    return {
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'round_trips': round(commands / iterations, 2),
+        'bytes': round(traffic / iterations),
+    }
+
+
+def run_case(links, defaults, clients, routes, latency, iterations):
+    router = FakeRouter.with_links(links, extra_commented_defaults=defaults, extra_routes=routes,
+                                   extra_dhcp_clients=clients, extra_addresses=clients, latency=latency)
+    with router:
+        service = MikrotikService('127.0.0.1', 'admin', '', port=router.port)
+        try:
+            discovered = service.discover_links()
+            targets = itertools.cycle([link['comment'] for link in discovered])
+            return {
+                'discover_links': measure(router, service.discover_links, iterations),
+                'get_status': measure(router, lambda: service.get_status(discovered, force_ping=True),
+                                      iterations),
+                'switch_link': measure(router, lambda: service.switch_link(next(targets), discovered),
+                                       iterations),
+                'enable_all_links': measure(router, lambda: service.enable_all_links(discovered),
+                                            iterations),
+            }
+        finally:
+            service.close()
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def case_key(case):
+    # Reports written before the defaults axis existed had none
+    return (case['links'], case.get('defaults', 0), case['clients'], case['routes'], case['latency_ms'])
+
+
+def print_case(case, baseline=None):
+    header = (f"links={case['links']} defaults={case['defaults']} clients={case['clients']} "
+              f"routes={case['routes']} "
+              f"latency={case['latency_ms']}ms")
+    print(header)
+    for name, result in case['operations'].items():
+        line = (f"  {name:<17} p50 {result['p50_ms']:>9.2f}  p95 {result['p95_ms']:>9.2f}  "
+                f"p99 {result['p99_ms']:>9.2f} ms  {result['round_trips']:>6.1f} rt  "
+                f"{result['bytes']:>9} B")
+        if baseline is not None and name in baseline['operations']:
+            before = baseline['operations'][name]['p50_ms']
+            if before:
+                line += f"  ({(result['p50_ms'] - before) / before * 100:+.0f}% p50)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--quick', action='store_true', help='only the small cases')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON from a previous run to compare against')
+    args = parser.parse_args()
+
+    logging.getLogger("MikroTikRoutes").setLevel(logging.WARNING)
+    grid = QUICK if args.quick else {'links': LINKS, 'defaults': DEFAULTS, 'clients': CLIENTS,
+                                     'routes': ROUTES, 'latencies': LATENCIES}
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = {case_key(case): case for case in json.load(f)['cases']}
+
+    cases = []
+    for links, defaults, clients, routes, latency in itertools.product(
+            grid['links'], grid['defaults'], grid['clients'], grid['routes'], grid['latencies']):
+        case = {
+            'links': links, 'defaults': defaults, 'clients': clients, 'routes': routes,
+            'latency_ms': latency * 1000,
+            'operations': run_case(links, defaults, clients, routes, latency, args.iterations),
+        }
+        cases.append(case)
+        print_case(case, baseline.get(case_key(case)))
+
+    if args.output:
+        report = {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'iterations': args.iterations,
+            'cases': cases,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Benchmark: tempo do clique em um link até o switch ser confirmado.
+
+Mede switch_link + confirm_switch contra o roteador simulado, com o link alvo
+saudável e com o link alvo sem saída (ping em timeout), e compara com o piso
+da verificação antiga pelo IP público (1s de espera antes da primeira
+consulta HTTP; até LINK_VERIFICATION_TIMEOUT para declarar falha).
+
+    python scripts/bench_switch_confirm.py
+"""
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_router import FakeRouter  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.services.mikrotik_service import MikrotikService  # noqa: E402
+
+LATENCIES = (0.0, 0.005, 0.030)
+ROUNDS = 5
+
+
+def switch_and_confirm(service, links, target):
+    start = time.perf_counter()
+    service.switch_link(target, links)
+    result = service.confirm_switch(target, links)
+    elapsed = (time.perf_counter() - start) * 1000
+    service.enable_all_links(links)
+    return elapsed, result
+
+
+def main():
+    logging.getLogger("MikroTikRoutes").setLevel(logging.WARNING)
+    print(f"{'latency':>8} {'target':>8} {'confirmed':>10} {'stage':>6} {'best (ms)':>10} {'worst (ms)':>11}")
+    for latency in LATENCIES:
+        with FakeRouter.with_links(4, dead={3}, latency=latency) as router:
+            service = MikrotikService('127.0.0.1', 'admin', '', port=router.port)
+            links = service.discover_links()
+            for name, target in (('healthy', links[1]['comment']), ('dead', links[3]['comment'])):
+                samples = [switch_and_confirm(service, links, target) for _ in range(ROUNDS)]
+                times = [elapsed for elapsed, _ in samples]
+                result = samples[-1][1]
+                print(f"{latency * 1000:>6.0f}ms {name:>8} {str(result['confirmed']):>10} {result['stage']:>6} "
+                      f"{min(times):>10.1f} {max(times):>11.1f}")
+            service.close()
+    print(f"old HTTP check: >= 1000 ms to confirm, {settings.LINK_VERIFICATION_TIMEOUT * 1000} ms to declare failure")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,537 @@
+"""Servidor local que imita a API do RouterOS (porta 8728, ou 8729 com TLS).
+
+Usado pelos benchmarks em `scripts/` para medir o MikrotikService sem um
+roteador de verdade. Roda um event loop asyncio em uma thread própria, então
+pode ser usado tanto por código síncrono quanto assíncrono:
+
+    with FakeRouter.with_links(6, dead={4, 5}) as router:
+        service = MikrotikService('127.0.0.1', 'admin', '', port=router.port)
+
+Cenários suportados: TLS com certificado autoassinado (`tls=True`), latência
+e jitter por comando, quedas de conexão (`drop_rate`, `drop_connections()`),
+respostas de ping programadas (`10ms247us`, `00:00:00.012`, timeout, `Trap`),
+tabelas grandes (`extra_routes`, `extra_dhcp_clients`, `extra_addresses`) e
+linhas alteradas ou apagadas com o `listen` aberto (`update()`, `remove()`).
+"""
+import asyncio
+import os
+import random
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The client's own codec: one implementation, and the simulator exercises it
+from app.services.routeros_async import encode_sentence, read_sentence  # noqa: E402
+
+
+def make_self_signed_cert(directory, host='127.0.0.1'):
+    """Gera um certificado autoassinado com o `openssl` do sistema; retorna (cert, key)."""
+    openssl = shutil.which('openssl')
+    if openssl is None:
+        raise RuntimeError("TLS mode needs the openssl command line tool")
+    certfile = os.path.join(directory, 'router.crt')
+    keyfile = os.path.join(directory, 'router.key')
+    subprocess.run(
+        [openssl, 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-keyout', keyfile, '-out', certfile, '-subj', f'/CN={host}',
+         '-addext', f'subjectAltName=IP:{host}'],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return certfile, keyfile
+
+
+class Trap:
+    """Resposta `!trap` programada (ex.: ping com src-address inexistente)."""
+
+    def __init__(self, message, category=None):
+        self.message = message
+        self.category = category
+
+
+class _TrapReply(Exception):
+    def __init__(self, message, category=None):
+        super().__init__(message)
+        self.category = category
+
+
+class FakeRouter:
+    """Roteador RouterOS simulado com tabelas de rotas, DHCP e endereços."""
+
+    def __init__(self, routes=(), dhcp_clients=(), addresses=(), ping_replies=None,
+                 username='admin', password='', host='127.0.0.1', port=0,
+                 tls=False, certfile=None, keyfile=None,
+                 latency=0.0, jitter=0.0, drop_rate=0.0, seed=None, stall=()):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self._next_id = 1
+        self.tables = {
+            '/ip/route': [self._with_id(r) for r in routes],
+            '/ip/dhcp-client': [self._with_id(r) for r in dhcp_clients],
+            '/ip/address': [self._with_id(r) for r in addresses],
+            '/system/identity': [{'name': 'FakeRouter'}],
+            '/ip/cloud': [{'ddns-enabled': 'yes', 'public-address': '203.0.113.10', 'status': 'updated'}],
+        }
+        # Ping target (src-address, interface or address value) -> reply script.
+        # A reply is (delay_s, avg-rtt) where avg-rtt is a RouterOS duration
+        # ('10ms247us', '00:00:00.012'), None for a timeout or a Trap. A list of
+        # replies is played in order and its last entry repeats.
+        self.ping_replies = dict(ping_replies or {})
+        self.default_ping = (0.01, '10ms247us')
+        self._ping_cursor = {}
+
+        # Injected faults: every command waits latency + uniform(0, jitter)
+        # before answering, and is dropped (connection closed) with drop_rate.
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self._random = random.Random(seed)
+        # Commands starting with any of these prefixes ('/login', '/tool/ping',
+        # '/ip/route/print', ...) are read and never answered: a hung router.
+        self.stall = set(stall)
+
+        self.tls = tls
+        self.certfile = certfile
+        self.keyfile = keyfile
+        self._tempdir = None
+
+        self.stats = {'connections': 0, 'logins': 0, 'commands': 0, 'drops': 0,
+                      'bytes_in': 0, 'bytes_out': 0}
+
+        self._listeners = []  # (menu, tag, send, queries) of every open `listen`
+        self._writers = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._recompute_active()
+
+    def _with_id(self, row):
+        row = {k: str(v) for k, v in row.items()}
+        row.setdefault('.id', f'*{self._next_id:X}')
+        self._next_id += 1
+        return row
+
+    @classmethod
+    def with_links(cls, count, dead=(), ping_rtt='10ms247us', ping_delay=0.01,
+                   extra_routes=0, extra_default_routes=0, extra_commented_defaults=0,
+                   extra_dhcp_clients=0, extra_addresses=0, **kwargs):
+        """Monta um roteador com `count` links DHCP (`Link{i}_ISP{i}`).
+
+        Os índices em `dead` respondem ao ping com timeout depois de 1s,
+        como o RouterOS faz com `count=1`. `extra_*` acrescentam linhas que não
+        são links (rotas BGP, defaults BGP sem comentário, defaults comentadas
+        que não começam com `Link`, clientes DHCP em VLANs, endereços) para
+        simular roteadores de borda com tabelas grandes.
+        """
+        routes, dhcp, addresses, replies = [], [], [], {}
+        for i in range(count):
+            routes.append({
+                'dst-address': '0.0.0.0/0', 'gateway': f'10.{i}.0.1',
+                'gateway-status': f'10.{i}.0.1 reachable via ether{i + 1}',
+                'distance': str(i + 1), 'scope': '30', 'target-scope': '10',
+                'disabled': 'false', 'comment': f'Link{i + 1}_ISP{i + 1}',
+            })
+            dhcp.append({
+                'interface': f'ether{i + 1}', 'status': 'bound',
+                'address': f'10.{i}.0.2/24', 'gateway': f'10.{i}.0.1',
+                'add-default-route': 'no', 'use-peer-dns': 'yes', 'expires-after': '9m58s',
+            })
+            addresses.append({'address': f'10.{i}.0.2/24', 'network': f'10.{i}.0.0',
+                              'interface': f'ether{i + 1}', 'actual-interface': f'ether{i + 1}',
+                              'invalid': 'false', 'dynamic': 'true', 'disabled': 'false'})
+            replies[f'10.{i}.0.2'] = (1.0, None) if i in dead else (ping_delay, ping_rtt)
+
+        for n in range(extra_routes):
+            routes.append({
+                'dst-address': f'{1 + (n >> 16) % 223}.{(n >> 8) & 255}.{n & 255}.0/24',
+                'gateway': '10.0.0.1', 'gateway-status': '10.0.0.1 reachable via ether1',
+                'distance': '20', 'scope': '40', 'target-scope': '10',
+                'bgp-as-path': '64512,174,3356', 'bgp-local-pref': '100', 'bgp-origin': 'igp',
+                'received-from': 'upstream1', 'active': 'true', 'dynamic': 'true',
+                'bgp': 'true', 'disabled': 'false',
+            })
+        for n in range(extra_default_routes):
+            # Defaults learned from BGP peers: no comment, never preferred over the links
+            routes.append({
+                'dst-address': '0.0.0.0/0', 'gateway': f'100.64.{(n >> 8) & 255}.{n & 255}',
+                'gateway-status': f'100.64.{(n >> 8) & 255}.{n & 255} recursive via 10.0.0.1 ether1',
+                'distance': '200', 'scope': '40', 'target-scope': '30',
+                'bgp-as-path': f'{64600 + n}', 'bgp-local-pref': '100', 'bgp-origin': 'igp',
+                'received-from': f'peer{n}', 'dynamic': 'true', 'bgp': 'true', 'disabled': 'false',
+            })
+        for n in range(extra_commented_defaults):
+            # Pass the server-side "has a comment" filter, so the client has to skip them
+            routes.append({
+                'dst-address': '0.0.0.0/0', 'gateway': f'100.65.{(n >> 8) & 255}.{n & 255}',
+                'gateway-status': f'100.65.{(n >> 8) & 255}.{n & 255} reachable via ether1',
+                'distance': str(100 + n % 50), 'scope': '30', 'target-scope': '10',
+                'disabled': 'true', 'comment': f'Backup_peer{n}',
+            })
+        for n in range(extra_dhcp_clients):
+            dhcp.append({
+                'interface': f'vlan{n + 100}', 'status': 'bound' if n % 4 else 'searching...',
+                'address': f'172.{16 + (n >> 16) % 16}.{(n >> 8) & 255}.{n & 255}/32',
+                'gateway': f'172.{16 + (n >> 16) % 16}.{(n >> 8) & 255}.1',
+                'add-default-route': 'no', 'use-peer-dns': 'no', 'expires-after': '9m58s',
+            })
+        for n in range(extra_addresses):
+            addresses.append({'address': f'192.168.{(n >> 8) & 255}.{n & 255}/32',
+                              'network': f'192.168.{(n >> 8) & 255}.{n & 255}',
+                              'interface': f'vlan{n + 100}', 'actual-interface': f'vlan{n + 100}',
+                              'invalid': 'false', 'dynamic': 'false', 'disabled': 'false'})
+        return cls(routes=routes, dhcp_clients=dhcp, addresses=addresses, ping_replies=replies, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        if self.tls and self.certfile is None:
+            self._tempdir = tempfile.TemporaryDirectory()
+            self.certfile, self.keyfile = make_self_signed_cert(self._tempdir.name, self.host)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+        if self._tempdir is not None:
+            self._tempdir.cleanup()
+            self._tempdir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def client_ssl_context(self):
+        """Contexto TLS para clientes que confiam no certificado deste roteador."""
+        return ssl.create_default_context(cafile=self.certfile)
+
+    def update(self, menu, where, **changes):
+        """Altera linhas de uma tabela como se fosse o próprio roteador (ex.: gateway caiu).
+
+        Pode ser chamado de qualquer thread; quem estiver em `listen` é notificado.
+        Chaves com `_` viram `-` (gateway_status -> gateway-status).
+        """
+        changes = {k.replace('_', '-'): str(v) for k, v in changes.items()}
+
+        async def apply():
+            rows = [r for r in self.tables[menu] if all(r.get(k) == v for k, v in where.items())]
+            self._change_rows(menu, rows, changes)
+            return len(rows)
+        return asyncio.run_coroutine_threadsafe(apply(), self._loop).result()
+
+    def remove(self, menu, where):
+        """Apaga linhas de uma tabela; quem estiver em `listen` recebe `=.dead=yes`."""
+        async def apply():
+            rows = [r for r in self.tables[menu] if all(r.get(k) == v for k, v in where.items())]
+            self._remove_rows(menu, rows)
+            return len(rows)
+        return asyncio.run_coroutine_threadsafe(apply(), self._loop).result()
+
+    def drop_connections(self):
+        """Derruba todas as conexões abertas (como um reboot ou um link caindo)."""
+        async def drop():
+            writers = list(self._writers)
+            for writer in writers:
+                self._abort(writer)
+            return len(writers)
+        return asyncio.run_coroutine_threadsafe(drop(), self._loop).result()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        context = None
+        if self.tls:
+            context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            context.load_cert_chain(self.certfile, self.keyfile)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle_client, self.host, self.port, ssl=context))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            tasks = asyncio.all_tasks(self._loop)
+            for task in tasks:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self._loop.close()
+
+    def _abort(self, writer):
+        self.stats['drops'] += 1
+        self._writers.discard(writer)
+        transport = writer.transport
+        if not transport.is_closing():
+            transport.abort()
+
+    # ------------------------------------------------------------------
+    # Protocol
+    # ------------------------------------------------------------------
+    async def _handle_client(self, reader, writer):
+        self.stats['connections'] += 1
+        self._writers.add(writer)
+        write_lock = asyncio.Lock()
+        running = {}  # tag -> task of every command still executing, for /cancel
+
+        async def send(*sentences):
+            data = b''.join(encode_sentence(words) for words in sentences)
+            async with write_lock:
+                self.stats['bytes_out'] += len(data)
+                writer.write(data)
+                await writer.drain()
+
+        try:
+            while True:
+                words = await read_sentence(reader)
+                self.stats['bytes_in'] += len(encode_sentence(words))
+                if not words:
+                    continue
+                self.stats['commands'] += 1
+                if self.drop_rate and self._random.random() < self.drop_rate:
+                    self._abort(writer)
+                    break
+                # Every command runs on its own task so tagged commands overlap like on RouterOS
+                tag = next((w[5:] for w in words if w.startswith('.tag=')), None)
+                task = asyncio.ensure_future(self._dispatch(words, send, running))
+                if tag is not None:
+                    running[tag] = task
+                    task.add_done_callback(lambda _, tag=tag: running.pop(tag, None))
+        except (asyncio.IncompleteReadError, ConnectionError, ssl.SSLError, asyncio.CancelledError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            for task in list(running.values()):
+                task.cancel()
+            writer.close()
+
+    async def _dispatch(self, words, send, running):
+        command = words[0]
+        attrs, queries, tag = {}, [], None
+        for word in words[1:]:
+            if word.startswith('='):
+                key, _, value = word[1:].partition('=')
+                attrs[key] = value
+            elif word.startswith('?'):
+                queries.append(word[1:])
+            elif word.startswith('.tag='):
+                tag = word[5:]
+        suffix = [f'.tag={tag}'] if tag is not None else []
+
+        if command == '/cancel':
+            target = running.pop(attrs.get('tag'), None)
+            if target is not None:
+                target.cancel()
+                # RouterOS answers the interrupted command before confirming the cancel
+                target_suffix = [f".tag={attrs['tag']}"]
+                await send(['!trap', '=category=2', '=message=interrupted'] + target_suffix,
+                           ['!done'] + target_suffix)
+            await send(['!done'] + suffix)
+            return
+
+        await self._delay()
+        if any(command.startswith(prefix) for prefix in self.stall):
+            # Hangs until /cancel or the connection goes away
+            await asyncio.Event().wait()
+        if command.endswith('/listen'):
+            await self._listen(command[:-len('/listen')], tag, send, queries)
+            return
+        if command == '/tool/ping' and 'count' not in attrs:
+            await self._ping_stream(attrs, suffix, send)
+            return
+
+        try:
+            replies = await self._execute(command, attrs, queries)
+        except _TrapReply as e:
+            trap = ['!trap', f'=message={e.args[0]}']
+            if e.category is not None:
+                trap.insert(1, f'=category={e.category}')
+            await send(trap + suffix, ['!done'] + suffix)
+            return
+        sentences = [['!re'] + [f'={k}={v}' for k, v in row.items()] + suffix for row in replies]
+        sentences.append(['!done'] + suffix)
+        await send(*sentences)
+
+    async def _delay(self):
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def _execute(self, command, attrs, queries):
+        if command == '/login':
+            if attrs.get('name') != self.username or attrs.get('password', '') != self.password:
+                raise _TrapReply('invalid user name or password (6)')
+            self.stats['logins'] += 1
+            return []
+
+        if command == '/tool/ping':
+            return await self._ping(attrs)
+
+        menu, _, verb = command.rpartition('/')
+        table = self.tables.get(menu)
+        if table is None:
+            raise _TrapReply('no such command prefix')
+
+        if verb == 'print':
+            proplist = attrs.get('.proplist')
+            keys = proplist.split(',') if proplist else None
+            rows = [r for r in table if self._matches(r, queries)]
+            if keys:
+                return [{k: r[k] for k in keys if k in r} for r in rows]
+            return [dict(r) for r in rows]
+
+        if verb == 'set':
+            row = next((r for r in table if r['.id'] == attrs.get('.id')), None)
+            if row is None:
+                raise _TrapReply('no such item')
+            changes = {k: {'yes': 'true', 'no': 'false'}.get(v, v) for k, v in attrs.items() if k != '.id'}
+            self._change_rows(menu, [row], changes)
+            return []
+
+        if verb == 'remove':
+            row = next((r for r in table if r['.id'] == attrs.get('.id')), None)
+            if row is None:
+                raise _TrapReply('no such item')
+            self._remove_rows(menu, [row])
+            return []
+
+        raise _TrapReply('no such command')
+
+    async def _listen(self, menu, tag, send, queries=()):
+        if menu not in self.tables:
+            return
+        # Query words filter which changed rows are sent, as on `print`
+        entry = (menu, tag, send, queries)
+        self._listeners.append(entry)
+        try:
+            # Runs until /cancel (or the connection) cancels this task
+            await asyncio.get_running_loop().create_future()
+        finally:
+            self._listeners.remove(entry)
+
+    def _change_rows(self, menu, rows, changes):
+        # Only the touched rows (and, for routes, the defaults whose `active` may flip) can change
+        watched = list(rows)
+        if menu == '/ip/route':
+            watched += [r for r in self._default_routes() if not any(r is w for w in rows)]
+        before = [dict(r) for r in watched]
+        for row in rows:
+            row.update(changes)
+        if menu == '/ip/route':
+            self._recompute_active()
+        changed = [dict(r) for r, old in zip(watched, before) if old != r]
+        for l_menu, tag, send, queries in list(self._listeners):
+            if l_menu != menu:
+                continue
+            suffix = [f'.tag={tag}'] if tag is not None else []
+            for row in changed:
+                if not self._matches(row, queries):
+                    continue
+                asyncio.ensure_future(send(['!re'] + [f'={k}={v}' for k, v in row.items()] + suffix))
+
+    def _remove_rows(self, menu, rows):
+        table = self.tables[menu]
+        table[:] = [r for r in table if not any(r is row for row in rows)]
+        for l_menu, tag, send, queries in list(self._listeners):
+            if l_menu != menu:
+                continue
+            suffix = [f'.tag={tag}'] if tag is not None else []
+            for row in rows:
+                # Like RouterOS: only the id and the dead flag, to whoever was seeing the row
+                if self._matches(row, queries):
+                    asyncio.ensure_future(send(['!re', f"=.id={row['.id']}", '=.dead=yes'] + suffix))
+        if menu == '/ip/route':
+            # Another default route may take over as active
+            self._change_rows(menu, [], {})
+
+    @staticmethod
+    def _matches(row, queries):
+        for q in queries:
+            if q.startswith('-'):
+                if q[1:] in row:
+                    return False
+            elif '=' in q:
+                key, _, value = q.partition('=')
+                if row.get(key) != value:
+                    return False
+            elif q not in row:
+                return False
+        return True
+
+    def _next_ping_reply(self, target):
+        script = self.ping_replies.get(target, self.default_ping)
+        if not isinstance(script, list):
+            return script
+        step = self._ping_cursor.get(target, 0)
+        self._ping_cursor[target] = step + 1
+        return script[min(step, len(script) - 1)]
+
+    async def _ping(self, attrs):
+        target = attrs.get('src-address') or attrs.get('interface') or attrs.get('address', '')
+        delay, rtt = self._next_ping_reply(target)
+        count = int(attrs.get('count', '1'))
+        await asyncio.sleep(delay * count)
+        if isinstance(rtt, Trap):
+            raise _TrapReply(rtt.message, rtt.category)
+        row = {'seq': '0', 'host': attrs.get('address', ''), 'sent': str(count)}
+        if rtt is None:
+            row.update({'status': 'timeout', 'received': '0', 'packet-loss': '100'})
+        else:
+            row.update({'size': '56', 'ttl': '117', 'time': rtt, 'received': str(count),
+                        'packet-loss': '0', 'min-rtt': rtt, 'avg-rtt': rtt, 'max-rtt': rtt})
+        return [row]
+
+    async def _ping_stream(self, attrs, suffix, send):
+        """`/tool ping` sem `count`: uma resposta por `interval` até o /cancel.
+
+        O roteiro do alvo é tocado em ciclo (o último item não se repete), então
+        uma lista como [(0, '10ms'), (0, '30ms'), (0, None)] gera jitter e perda.
+        """
+        target = attrs.get('src-address') or attrs.get('interface') or attrs.get('address', '')
+        script = self.ping_replies.get(target, self.default_ping)
+        script = script if isinstance(script, list) else [script]
+        interval = float(attrs.get('interval', '1'))
+        sent = received = 0
+        while True:
+            await asyncio.sleep(interval)
+            _, rtt = script[sent % len(script)]
+            sent += 1
+            if isinstance(rtt, Trap):
+                trap = ['!trap', f'=message={rtt.message}']
+                await send(trap + suffix, ['!done'] + suffix)
+                return
+            row = {'seq': str(sent - 1), 'host': attrs.get('address', ''), 'sent': str(sent)}
+            if rtt is None:
+                row['status'] = 'timeout'
+            else:
+                received += 1
+                row.update({'size': '56', 'ttl': '117', 'time': rtt})
+            row.update({'received': str(received),
+                        'packet-loss': str(round(100 * (sent - received) / sent))})
+            await send(['!re'] + [f'={k}={v}' for k, v in row.items()] + suffix)
+
+    def _default_routes(self):
+        return [r for r in self.tables['/ip/route'] if r.get('dst-address') == '0.0.0.0/0']
+
+    def _recompute_active(self):
+        # The enabled default route with the lowest distance carries traffic
+        defaults = self._default_routes()
+        enabled = [r for r in defaults if r.get('disabled') != 'true']
+        best = min(enabled, key=lambda r: int(r.get('distance', '1')), default=None)
+        for r in defaults:
+            r['active'] = 'true' if r is best else 'false'
@@ -0,0 +1,63 @@
+import pytest
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def breaker(clock, monkeypatch):
+    monkeypatch.setattr(circuit_breaker, 'time', clock)
+    return CircuitBreaker('r1', threshold=3, base_delay=2, max_delay=10)
+
+
+def fail(breaker, times):
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_stays_closed_below_threshold(breaker):
+    fail(breaker, 2)
+    breaker.before_call()
+    assert breaker.state() == {'state': 'closed', 'failures': 2, 'trips': 0, 'rejected': 0}
+
+
+def test_opens_at_threshold_and_rejects_without_calling(breaker):
+    fail(breaker, 3)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.state()['state'] == 'open'
+    assert breaker.state()['rejected'] == 1
+
+
+def test_success_resets_the_count(breaker):
+    fail(breaker, 2)
+    breaker.record_success()
+    fail(breaker, 2)
+    breaker.before_call()
+    assert breaker.state()['state'] == 'closed'
+
+
+def test_half_open_lets_one_trial_through(breaker, clock):
+    fail(breaker, 3)
+    clock.advance(2)
+    assert breaker.state()['state'] == 'half-open'
+    breaker.before_call()
+    # A second caller waits for the trial's outcome
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+    assert breaker.state()['state'] == 'closed'
+
+
+def test_failed_trial_doubles_the_delay_up_to_the_maximum(breaker, clock):
+    fail(breaker, 3)
+    for delay in (2, 4, 8, 10, 10):
+        clock.advance(delay - 0.01)
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        clock.advance(0.01)
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state()['trips'] == 6
@@ -0,0 +1,72 @@
+from app.services.ping_tiers import PingTiers
+
+SIGNATURE = ('10.0.0.1', 'reachable', 'true', 'false', '10.0.0.2/24')
+
+
+def test_unknown_link_is_due():
+    assert PingTiers(default_interval=10).due('Link1', SIGNATURE, now=0)
+
+
+def test_link_repeats_its_result_until_the_interval_runs_out():
+    tiers = PingTiers(default_interval=10)
+    tiers.record('Link1', SIGNATURE, 12.5, now=0)
+    assert not tiers.due('Link1', SIGNATURE, now=9.9)
+    assert tiers.last('Link1') == 12.5
+    assert tiers.due('Link1', SIGNATURE, now=10)
+
+
+def test_per_link_interval():
+    tiers = PingTiers(default_interval=10, intervals={'Link_4G': 300})
+    tiers.record('Link_4G', SIGNATURE, 80.0, now=0)
+    assert not tiers.due('Link_4G', SIGNATURE, now=299)
+    assert tiers.due('Link_4G', SIGNATURE, now=300)
+
+
+def test_failed_ping_follows_the_same_interval():
+    tiers = PingTiers(default_interval=10, intervals={'Link_4G': 300})
+    tiers.record('Link_4G', SIGNATURE, "timeout", now=0)
+    assert not tiers.due('Link_4G', SIGNATURE, now=60)
+    assert tiers.last('Link_4G') == "timeout"
+
+
+def test_signature_change_pings_right_away():
+    tiers = PingTiers(default_interval=10)
+    tiers.record('Link1', SIGNATURE, "timeout", now=0)
+    renumbered = SIGNATURE[:-1] + ('10.0.0.7/24',)
+    assert tiers.due('Link1', renumbered, now=1)
+
+
+def test_invalidate_one_link_or_all():
+    tiers = PingTiers(default_interval=10)
+    tiers.record('Link1', SIGNATURE, 1.0, now=0)
+    tiers.record('Link2', SIGNATURE, 2.0, now=0)
+    tiers.invalidate('Link1')
+    assert tiers.due('Link1', SIGNATURE, now=1) and not tiers.due('Link2', SIGNATURE, now=1)
+    tiers.invalidate()
+    assert tiers.due('Link2', SIGNATURE, now=1)
+    assert tiers.last('Link2') is None
+
+
+def test_select_takes_due_links_and_those_past_half_their_interval():
+    tiers = PingTiers(default_interval=10, intervals={'Link_4G': 300})
+    for comment, measured_at in (('Link1', 0), ('Link2', 4), ('Link3', 6), ('Link_4G', 0)):
+        tiers.record(comment, SIGNATURE, 1.0, now=measured_at)
+    signatures = dict.fromkeys(('Link1', 'Link2', 'Link3', 'Link_4G'), SIGNATURE)
+    # Link1 is due; Link2 joins the round, Link3 and the metered link wait
+    assert tiers.select(signatures, now=10) == {'Link1', 'Link2'}
+
+
+def test_select_sends_nothing_when_nothing_is_due():
+    tiers = PingTiers(default_interval=10)
+    tiers.record('Link1', SIGNATURE, 1.0, now=0)
+    tiers.record('Link2', SIGNATURE, 1.0, now=5)
+    assert tiers.select(dict.fromkeys(('Link1', 'Link2'), SIGNATURE), now=9) == set()
+
+
+def test_next_due():
+    tiers = PingTiers(default_interval=10, intervals={'Link_4G': 300})
+    assert tiers.next_due(now=0) is None
+    tiers.record('Link_4G', SIGNATURE, 1.0, now=0)
+    tiers.record('Link1', SIGNATURE, 1.0, now=2)
+    assert tiers.next_due(now=5) == 7
+    assert tiers.next_due(now=20) == 0
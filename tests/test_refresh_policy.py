@@ -0,0 +1,91 @@
+import pytest
+
+from app.config import settings
+from app.models.status import LinkStatus, Mode, StatusSnapshot, ping_state
+from app.services.refresh_policy import RefreshPolicy, link_health
+
+
+def snapshot(link1=12.0, active='ISP1', reachable=True):
+    links = (LinkStatus('Link1_ISP1', 'ISP1', *ping_state(link1), active=active == 'ISP1', reachable=reachable),
+             LinkStatus('Link2_ISP2', 'ISP2', *ping_state(35.0), active=active == 'ISP2'))
+    return StatusSnapshot(links, active, Mode.AUTO)
+
+
+def settle(policy, status, cycles=settings.REFRESH_STABLE_CYCLES + settings.REFRESH_FAST_CYCLES + 1):
+    for _ in range(cycles):
+        policy.observe(status)
+
+
+@pytest.mark.parametrize('value, reachable, health', (
+    (12.0, True, 'ok'), (150.0, True, 'fair'), (250.0, True, 'slow'),
+    ("timeout", True, 'down'), (12.0, False, 'down'), ("checking", True, 'checking'),
+))
+def test_link_health(value, reachable, health):
+    assert link_health(LinkStatus('Link1', 'ISP1', *ping_state(value), reachable=reachable)) == health
+
+
+def test_polling_keeps_the_normal_interval_even_when_stable_or_hidden():
+    policy = RefreshPolicy()
+    settle(policy, snapshot())
+    assert policy.next_interval() == settings.REFRESH_INTERVAL
+    policy.hidden = True
+    assert policy.next_interval() == settings.REFRESH_INTERVAL
+
+
+def test_route_push_stretches_when_stable_and_more_when_hidden():
+    policy = RefreshPolicy()
+    policy.route_push = True
+    policy.observe(snapshot())
+    assert policy.next_interval() == settings.REFRESH_INTERVAL
+    settle(policy, snapshot())
+    assert policy.next_interval() == settings.REFRESH_INTERVAL_STABLE
+    policy.hidden = True
+    assert policy.next_interval() == settings.REFRESH_INTERVAL_HIDDEN
+
+
+def test_a_health_change_samples_fast_for_a_few_cycles():
+    policy = RefreshPolicy()
+    policy.route_push = True
+    settle(policy, snapshot())
+    policy.observe(snapshot(link1="timeout"))
+    intervals = []
+    for _ in range(settings.REFRESH_FAST_CYCLES + 1):
+        intervals.append(policy.next_interval())
+        policy.observe(snapshot(link1="timeout"))
+    assert intervals[:settings.REFRESH_FAST_CYCLES] == [settings.REFRESH_INTERVAL_FAST] * settings.REFRESH_FAST_CYCLES
+    assert intervals[-1] != settings.REFRESH_INTERVAL_FAST
+
+
+def test_a_link_that_stays_down_is_not_a_change():
+    policy = RefreshPolicy()
+    policy.route_push = True
+    settle(policy, snapshot(link1="timeout"))
+    assert policy.next_interval() == settings.REFRESH_INTERVAL_STABLE
+
+
+def test_rtt_jitter_within_a_health_class_is_not_a_change():
+    policy = RefreshPolicy()
+    policy.route_push = True
+    for cycle in range(settings.REFRESH_STABLE_CYCLES + 1):
+        policy.observe(snapshot(link1=10.0 + cycle))
+    assert policy.next_interval() == settings.REFRESH_INTERVAL_STABLE
+
+
+def test_boost_after_a_switch():
+    policy = RefreshPolicy()
+    settle(policy, snapshot())
+    policy.boost()
+    assert policy.next_interval() == settings.REFRESH_INTERVAL_FAST
+
+
+def test_a_due_ping_caps_the_long_intervals():
+    policy = RefreshPolicy()
+    policy.route_push = policy.hidden = True
+    settle(policy, snapshot())
+    policy.ping_due_in = 3200
+    assert policy.next_interval() == 3200
+    # Never faster than the fast interval, even for a ping already due
+    policy.ping_due_in = 0
+    assert policy.next_interval() == settings.REFRESH_INTERVAL_FAST
+    policy.ping_due_in = 600000
+    assert policy.next_interval() == settings.REFRESH_INTERVAL_HIDDEN
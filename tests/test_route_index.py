@@ -0,0 +1,32 @@
+from app.services.route_index import SnapshotIndex
+
+LINKS = [{'comment': 'Link1_ISP', 'label': 'ISP'}, {'comment': 'Link10_ISP', 'label': 'ISP10'}]
+
+
+def test_link_for_matches_the_exact_comment():
+    index = SnapshotIndex(LINKS)
+    assert index.link_for({'comment': 'Link1_ISP'}) is LINKS[0]
+    assert index.link_for({'comment': 'Link10_ISP'}) is LINKS[1]
+    assert index.link_for({'comment': 'Link1_ISP_old'}) is None
+    assert index.link_for({}) is None
+
+
+def test_only_bound_dhcp_clients_are_indexed_first_match_wins():
+    clients = [
+        {'interface': 'ether1', 'gateway': '10.0.0.1', 'status': 'searching'},
+        {'interface': 'ether1', 'gateway': '10.0.0.1', 'address': '10.0.0.2/24', 'status': 'bound'},
+        {'interface': 'ether1', 'gateway': '10.0.0.254', 'address': '10.0.0.3/24', 'status': 'bound'},
+        {'interface': 'ether2', 'status': 'bound'},
+    ]
+    index = SnapshotIndex(LINKS, clients)
+    assert index.dhcp_by_interface['ether1'] is clients[1]
+    assert index.dhcp_by_interface['ether2'] is clients[3]
+    assert index.dhcp_by_gateway == {'10.0.0.1': clients[1], '10.0.0.254': clients[2]}
+
+
+def test_first_address_per_interface():
+    addresses = [{'interface': 'pppoe-out1', 'address': '100.64.0.2/32'},
+                 {'interface': 'pppoe-out1', 'address': '100.64.0.9/32'},
+                 {'address': '192.168.88.1/24'}]
+    index = SnapshotIndex(LINKS, ip_addresses=addresses)
+    assert index.address_by_interface == {'pppoe-out1': addresses[0]}
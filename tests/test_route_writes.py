@@ -0,0 +1,32 @@
+from app.services.mikrotik_service import route_writes
+from app.services.route_index import SnapshotIndex
+
+LINKS = [{'comment': f'Link{i}_ISP{i}', 'label': f'ISP{i}'} for i in (1, 2, 3)]
+INDEX = SnapshotIndex(LINKS)
+
+
+def routes(*disabled):
+    """Default routes of the three links, plus one that is not a link."""
+    rows = [{'id': f'*{i}', 'comment': f'Link{i}_ISP{i}', 'disabled': 'true' if off else 'false'}
+            for i, off in zip((1, 2, 3), disabled)]
+    rows.append({'id': '*9', 'comment': 'Backup_peer', 'disabled': 'true'})
+    return rows
+
+
+def test_switch_enables_the_target_before_disabling_the_others():
+    assert route_writes(routes(False, True, True), INDEX, 'Link2_ISP2') == [('*2', 'no'), ('*1', 'yes')]
+
+
+def test_switch_to_the_active_link_writes_nothing():
+    assert route_writes(routes(False, True, True), INDEX, 'Link1_ISP1') == []
+
+
+def test_failover_enables_every_disabled_link():
+    assert route_writes(routes(False, True, True), INDEX) == [('*2', 'no'), ('*3', 'no')]
+    assert route_writes(routes(False, False, False), INDEX) == []
+
+
+def test_routes_that_are_not_links_are_never_touched():
+    writes = route_writes(routes(True, True, True), INDEX)
+    assert '*9' not in [route_id for route_id, _ in writes]
+
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from fake_router import FakeRouter  # noqa: E402
+from app.services.mikrotik_service import MikrotikService  # noqa: E402
+
+WAIT = 5
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + WAIT
+    while not condition():
+        assert time.monotonic() < deadline, "watcher did not catch up"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def watched():
+    """(fake router, live watcher, on_change calls) with three links."""
+    changes = []
+    with FakeRouter.with_links(3) as router:
+        service = MikrotikService('127.0.0.1', 'admin', '', port=router.port)
+        watcher = service.start_watching(lambda table, row: changes.append((table, row)))
+        try:
+            wait_for(lambda: watcher.live)
+            yield router, watcher, changes
+        finally:
+            service.close()
+
+
+def route_comments(watcher):
+    return sorted(route['comment'] for route in watcher.snapshot()[0])
+
+
+def test_initial_dump_mirrors_the_default_routes(watched):
+    router, watcher, _ = watched
+    assert route_comments(watcher) == ['Link1_ISP1', 'Link2_ISP2', 'Link3_ISP3']
+
+
+def test_a_changed_route_is_updated_in_place(watched):
+    router, watcher, changes = watched
+    router.update('/ip/route', {'comment': 'Link2_ISP2'}, gateway_status='10.1.0.1 unreachable')
+    wait_for(lambda: any(route.get('gateway-status') == '10.1.0.1 unreachable'
+                         for route in watcher.snapshot()[0]))
+    assert any(table == 'routes' for table, _ in changes)
+
+
+def test_a_removed_route_leaves_the_mirror(watched):
+    router, watcher, changes = watched
+    assert router.remove('/ip/route', {'comment': 'Link3_ISP3'}) == 1
+    wait_for(lambda: route_comments(watcher) == ['Link1_ISP1', 'Link2_ISP2'])
+    # No stub {'id', 'dead'} row is left behind
+    assert all('comment' in route for route in watcher.snapshot()[0])
+    assert any(table == 'routes' and row.get('dead') == 'yes' for table, row in changes)
+
+
+def test_a_removed_lease_leaves_the_mirror(watched):
+    router, watcher, _ = watched
+    before = len(watcher.snapshot()[1])
+    router.remove('/ip/dhcp-client', {'interface': 'ether1'})
+    wait_for(lambda: len(watcher.snapshot()[1]) == before - 1)
+    assert all(client.get('interface') != 'ether1' for client in watcher.snapshot()[1])
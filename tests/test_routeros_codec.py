@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from app.services.routeros_async import (RouterOsConnectionLost, encode_length, encode_sentence,
+                                         parse_reply, read_sentence)
+
+
+def read(data):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await read_sentence(reader)
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('length, size', (
+    (0, 1), (0x7F, 1), (0x80, 2), (0x3FFF, 2), (0x4000, 3), (0x1FFFFF, 3),
+    (0x200000, 4), (0xFFFFFFF, 4), (0x10000000, 5),
+))
+def test_length_prefix_sizes(length, size):
+    assert len(encode_length(length)) == size
+
+
+@pytest.mark.parametrize('length', (0x7F, 0x80, 0x3FFF, 0x4000, 0x200000))
+def test_sentence_round_trip(length):
+    words = ['/ip/route/print', '=comment=' + 'x' * length, '.tag=7']
+    assert read(encode_sentence(words)) == words
+
+
+def test_malformed_length_prefix_drops_the_session():
+    with pytest.raises(RouterOsConnectionLost):
+        read(b'\xF8\x00')
+
+
+def test_parse_reply_uses_the_routeros_api_key_names():
+    assert parse_reply(['!re', '.tag=3', '=.id=*1', '=comment=Link1', '=gateway=a=b']) == (
+        '!re', '3', {'id': '*1', 'comment': 'Link1', 'gateway': 'a=b'})
@@ -0,0 +1,51 @@
+import math
+
+import pytest
+
+from app.services.mikrotik_service import parse_ping_reply
+from app.services.rtt_parser import parse_rtt
+
+# (RouterOS text, expected ms): what parse_rtt must return for every format
+FORMATS = (
+    # single units
+    ('5ms', 5.0), ('247us', 0.247), ('1s', 1000.0), ('2m', 120000.0), ('1h', 3600000.0),
+    ('1d', 86400000.0), ('1w', 604800000.0), ('500ns', 0.0005),
+    # fractions
+    ('1.5ms', 1.5), ('0.5s', 500.0), ('2.25us', 0.00225),
+    # combined, as /tool ping and uptime print them
+    ('10ms247us', 10.247), ('1s5ms', 1005.0), ('1s5ms300us', 1005.3), ('1m2s', 62000.0),
+    ('1d2h3m4s', 93784000.0), ('1w1d', 691200000.0), ('3ms400us20ns', 3.40002),
+    # clock
+    ('00:00:00.012', 12.0), ('00:00:01.012345', 1012.345), ('01:00:00', 3600000.0),
+    ('00:01.5', 1500.0), ('00:00', 0.0),
+    # bare numbers are milliseconds
+    ('12', 12.0), ('0.8', 0.8), ('  10ms  ', 10.0), (7, 7.0), (1.25, 1.25),
+)
+# Not a duration
+INVALID = (
+    '', '   ', None, 'timeout', 'ms', '10 ms', '1.2.3ms', '10mss', '1:2:3', '-5', '-5ms',
+    'nan', 'inf', '-inf', float('nan'), float('inf'), -1,
+)
+
+
+@pytest.mark.parametrize('text, expected', FORMATS)
+def test_parse_rtt(text, expected):
+    assert parse_rtt(text) == pytest.approx(expected, abs=1e-9)
+
+
+@pytest.mark.parametrize('text', INVALID)
+def test_parse_rtt_rejects(text):
+    assert parse_rtt(text) is None
+
+
+def test_parse_rtt_is_finite():
+    assert all(math.isfinite(parse_rtt(text)) for text, _ in FORMATS)
+
+
+def test_ping_reply_uses_avg_rtt():
+    assert parse_ping_reply('Link1', {'address': '8.8.8.8'}, [{'avg-rtt': '10ms247us'}]) == pytest.approx(10.247)
+
+
+@pytest.mark.parametrize('reply', ([], [{}], [{'avg-rtt': ''}], [{'avg-rtt': 'nan'}]))
+def test_ping_reply_without_rtt_is_timeout(reply):
+    assert parse_ping_reply('Link1', {'address': '8.8.8.8'}, reply) == "timeout"
@@ -0,0 +1,122 @@
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+from app.services.task_scheduler import BACKGROUND, USER, TaskScheduler
+
+WAIT = 5
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = TaskScheduler()
+    yield scheduler
+    scheduler.shutdown()
+
+
+def blocking(result=None):
+    """A task that runs until `release` is set; `started` tells it is running."""
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        assert release.wait(WAIT)
+        return result
+    return fn, started, release
+
+
+def test_same_key_is_coalesced_while_in_flight(scheduler):
+    calls = []
+    fn, started, release = blocking('status')
+
+    def counted():
+        calls.append(1)
+        return fn()
+    first = scheduler.submit('status', counted)
+    assert started.wait(WAIT)
+    assert scheduler.submit('status', counted) is first
+    release.set()
+    assert first.result(WAIT) == 'status'
+    assert calls == [1]
+    assert scheduler.stats['coalesced'] == 1
+
+
+def test_finished_key_runs_again(scheduler):
+    first = scheduler.submit('status', lambda: 1)
+    assert first.result(WAIT) == 1
+    second = scheduler.submit('status', lambda: 2)
+    assert second is not first
+    assert second.result(WAIT) == 2
+
+
+def test_errors_reach_the_future(scheduler):
+    def boom():
+        raise ValueError('router said no')
+    with pytest.raises(ValueError):
+        scheduler.submit('status', boom).result(WAIT)
+
+
+def test_user_action_cancels_background_work(scheduler):
+    fn, started, release = blocking('old')
+    running = scheduler.submit('status', fn)
+    assert started.wait(WAIT)
+    queued = scheduler.submit('ip', lambda: 'queued')
+    switch = scheduler.submit('switch', lambda: 'switched', lane=USER)
+    assert queued.cancelled()
+    # The running poll is not coalesced onto: its result is already outdated
+    fresh = scheduler.submit('status', lambda: 'new')
+    assert fresh is not running
+    release.set()
+    assert switch.result(WAIT) == 'switched'
+    with pytest.raises(CancelledError):
+        running.result(WAIT)
+    assert fresh.result(WAIT) == 'new'
+
+
+def test_background_waits_for_the_user_lane(scheduler):
+    order = []
+    fn, started, release = blocking()
+
+    def user():
+        order.append('user')
+        return fn()
+    scheduler.submit('switch', user, lane=USER)
+    assert started.wait(WAIT)
+    poll = scheduler.submit('status', lambda: order.append('poll'))
+    assert not poll.done()
+    release.set()
+    poll.result(WAIT)
+    assert order == ['user', 'poll']
+
+
+def test_cancel_runs_the_callback_once_and_allows_resubmitting(scheduler):
+    fn, started, release = blocking()
+    scheduler.submit('switch', fn, lane=USER)
+    assert started.wait(WAIT)
+    resubmitted = []
+    callbacks = []
+
+    def on_done(future):
+        callbacks.append(future.cancelled())
+        # Runs with the scheduler lock released, so this must not deadlock
+        resubmitted.append(scheduler.submit('status', lambda: 'again'))
+    scheduler.submit('status', lambda: 'first', callback=on_done)
+    scheduler.submit('status', lambda: 'coalesced', callback=on_done)
+    scheduler.cancel(BACKGROUND)
+    assert callbacks == [True]
+    release.set()
+    assert resubmitted[0].result(WAIT) == 'again'
+
+
+def test_shutdown_cancels_the_queue_and_refuses_work():
+    scheduler = TaskScheduler()
+    fn, started, release = blocking()
+    scheduler.submit('switch', fn, lane=USER)
+    assert started.wait(WAIT)
+    queued = scheduler.submit('discover', lambda: None, lane=USER)
+    scheduler.shutdown()
+    release.set()
+    assert queued.cancelled()
+    with pytest.raises(RuntimeError):
+        scheduler.submit('status', lambda: None)